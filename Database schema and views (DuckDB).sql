@@ -0,0 +1,331 @@
+-- Embedded (DuckDB) edition of `Database schema and views.sql`: the same tables, lookups,
+-- materialized facts, summaries and views, for a single-file database the loader writes
+-- and the dashboard reads in-process (DB_BACKEND=duckdb, DB_PATH=<file>).
+-- Differences from the Azure SQL schema:
+--   * IDENTITY columns draw from sequences.
+--   * ##Artist_Nationalities is the ordinary table Artist_Nationalities_Staging.
+--   * sp_refresh_playlist_track_facts is embedded_backend.refresh_playlist_track_facts, which
+--     runs the procedure's INSERT statements as read from the Azure SQL schema.
+--   * Foreign keys are left out; the loader resolves every junction key before inserting it.
+--   * Secondary indexes are left out; columnar scans with zone maps serve these reads.
+--   * Azure SQL's default collation ignores case; DuckDB's does not, so every name the
+--     loader, the views or the dashboard compare (artist, nationality, country, genre and
+--     playlist owner) is declared COLLATE NOCASE. DuckDB's UNIQUE constraints ignore the
+--     collation, so unique names are enforced by UNIQUE indexes on lower(name) instead.
+-- Every statement is idempotent, so embedded_backend.ensure_schema runs it on every load.
+
+
+-- Main tables
+
+CREATE SEQUENCE IF NOT EXISTS Albums_Seq;
+CREATE TABLE IF NOT EXISTS Albums (
+    Album_ID         INTEGER PRIMARY KEY DEFAULT nextval('Albums_Seq'),
+    Album_Name       VARCHAR,
+    Spotify_Album_ID VARCHAR UNIQUE,
+    Release_Date     DATE
+);
+
+CREATE SEQUENCE IF NOT EXISTS Tracks_Seq;
+CREATE TABLE IF NOT EXISTS Tracks (
+    Track_ID           INTEGER PRIMARY KEY DEFAULT nextval('Tracks_Seq'),
+    Canonical_Track_ID VARCHAR UNIQUE,
+    Track_Name         VARCHAR,
+    Release_Date       DATE,
+    Is_Single          DOUBLE,
+    Spotify_Track_URL  VARCHAR,
+    Spotify_Track_URI  VARCHAR
+);
+
+CREATE SEQUENCE IF NOT EXISTS Playlists_Seq;
+CREATE TABLE IF NOT EXISTS Playlists (
+    Playlist_ID          INTEGER PRIMARY KEY DEFAULT nextval('Playlists_Seq'),
+    Spotify_Playlist_ID  VARCHAR UNIQUE,
+    Playlist_Name        VARCHAR,
+    Playlist_Owner       VARCHAR COLLATE NOCASE,
+    Number_Of_Tracks     INTEGER,
+    Number_Of_Followers  INTEGER,
+    Spotify_Playlist_URL VARCHAR,
+    Is_Public            DOUBLE
+);
+
+CREATE SEQUENCE IF NOT EXISTS Artists_Seq;
+CREATE TABLE IF NOT EXISTS Artists (
+    Artist_ID   INTEGER PRIMARY KEY DEFAULT nextval('Artists_Seq'),
+    Artist_Name VARCHAR COLLATE NOCASE NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS UX_Artists_Name ON Artists (lower(Artist_Name));
+
+CREATE SEQUENCE IF NOT EXISTS Nationalities_Seq;
+CREATE TABLE IF NOT EXISTS Nationalities (
+    Nationality_ID INTEGER PRIMARY KEY DEFAULT nextval('Nationalities_Seq'),
+    Nationality    VARCHAR COLLATE NOCASE,
+    Country_Name   VARCHAR COLLATE NOCASE,
+    Country_Code   VARCHAR COLLATE NOCASE
+);
+CREATE UNIQUE INDEX IF NOT EXISTS UX_Nationalities_Country_Name ON Nationalities (lower(Country_Name));
+CREATE UNIQUE INDEX IF NOT EXISTS UX_Nationalities_Country_Code ON Nationalities (lower(Country_Code));
+
+CREATE SEQUENCE IF NOT EXISTS Genres_Seq;
+CREATE TABLE IF NOT EXISTS Genres (
+    Genre_ID   INTEGER PRIMARY KEY DEFAULT nextval('Genres_Seq'),
+    Genre_Name VARCHAR COLLATE NOCASE
+);
+CREATE UNIQUE INDEX IF NOT EXISTS UX_Genres_Name ON Genres (lower(Genre_Name));
+
+
+-- Junction tables
+
+CREATE TABLE IF NOT EXISTS Artist_Tracks (
+    Artist_ID INTEGER NOT NULL,
+    Track_ID  INTEGER NOT NULL,
+    PRIMARY KEY (Artist_ID, Track_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Artist_Nationalities (
+    Artist_ID      INTEGER NOT NULL,
+    Nationality_ID INTEGER NOT NULL,
+    PRIMARY KEY (Artist_ID, Nationality_ID)
+);
+
+-- Names as they come from the source; embedded_backend.resolve_artist_nationalities turns
+-- them into Artist_Nationalities rows
+CREATE TABLE IF NOT EXISTS Artist_Nationalities_Staging (
+    Artist_Name VARCHAR COLLATE NOCASE,
+    Nationality VARCHAR COLLATE NOCASE
+);
+
+CREATE TABLE IF NOT EXISTS Playlist_Tracks (
+    Playlist_ID INTEGER NOT NULL,
+    Track_ID    INTEGER NOT NULL,
+    PRIMARY KEY (Playlist_ID, Track_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Album_Playlist (
+    Album_ID    INTEGER NOT NULL,
+    Playlist_ID INTEGER NOT NULL,
+    PRIMARY KEY (Album_ID, Playlist_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Tracks_Genre (
+    Track_ID INTEGER NOT NULL,
+    Genre_ID INTEGER NOT NULL,
+    PRIMARY KEY (Track_ID, Genre_ID)
+);
+
+
+-- Classification lookups (Is_African is 0/1, like the BIT columns on Azure SQL)
+
+CREATE TABLE IF NOT EXISTS Country_Regions (
+    Country_Code VARCHAR COLLATE NOCASE NOT NULL PRIMARY KEY,
+    Region_Name  VARCHAR NOT NULL,
+    Is_African   TINYINT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Genre_Families (
+    Genre_Name  VARCHAR COLLATE NOCASE NOT NULL PRIMARY KEY,
+    Family_Name VARCHAR NOT NULL,
+    Is_African  TINYINT NOT NULL
+);
+
+-- Seeding only adds missing rows, so re-running keeps any reclassification made since.
+-- Namibia is 'NAM' in the nationality source ('NA' would be read back as a missing value)
+INSERT OR IGNORE INTO Country_Regions (Country_Code, Region_Name, Is_African) VALUES
+    ('DZ', 'Africa', 1), ('AO', 'Africa', 1), ('BJ', 'Africa', 1), ('BW', 'Africa', 1), ('BF', 'Africa', 1), ('BI', 'Africa', 1),
+    ('CM', 'Africa', 1), ('CV', 'Africa', 1), ('CF', 'Africa', 1), ('TD', 'Africa', 1), ('KM', 'Africa', 1), ('CG', 'Africa', 1),
+    ('CD', 'Africa', 1), ('CI', 'Africa', 1), ('DJ', 'Africa', 1), ('EG', 'Africa', 1), ('GQ', 'Africa', 1), ('ER', 'Africa', 1),
+    ('SZ', 'Africa', 1), ('ET', 'Africa', 1), ('GA', 'Africa', 1), ('GM', 'Africa', 1), ('GH', 'Africa', 1), ('GN', 'Africa', 1),
+    ('GW', 'Africa', 1), ('KE', 'Africa', 1), ('LS', 'Africa', 1), ('LR', 'Africa', 1), ('LY', 'Africa', 1), ('MG', 'Africa', 1),
+    ('MW', 'Africa', 1), ('ML', 'Africa', 1), ('MR', 'Africa', 1), ('MU', 'Africa', 1), ('MA', 'Africa', 1), ('MZ', 'Africa', 1),
+    ('NAM', 'Africa', 1), ('NE', 'Africa', 1), ('NG', 'Africa', 1), ('RW', 'Africa', 1), ('ST', 'Africa', 1), ('SN', 'Africa', 1),
+    ('SC', 'Africa', 1), ('SL', 'Africa', 1), ('SO', 'Africa', 1), ('ZA', 'Africa', 1), ('SS', 'Africa', 1), ('SD', 'Africa', 1),
+    ('TZ', 'Africa', 1), ('TG', 'Africa', 1), ('TN', 'Africa', 1), ('UG', 'Africa', 1), ('ZM', 'Africa', 1), ('ZW', 'Africa', 1);
+
+INSERT OR IGNORE INTO Genre_Families (Genre_Name, Family_Name, Is_African) VALUES
+    ('afrobeats', 'African', 1), ('afropop', 'African', 1), ('afro r&b', 'African', 1), ('afrobeat', 'African', 1),
+    ('afropiano', 'African', 1), ('afro soul', 'African', 1), ('afroswing', 'African', 1), ('azonto', 'African', 1),
+    ('alté', 'African', 1), ('afro adura', 'African', 1), ('ghanaian hip hop', 'African', 1), ('amapiano', 'African', 1),
+    ('gqom', 'African', 1), ('rap', 'African', 1), ('french r&b', 'African', 1), ('pop urbaine', 'African', 1),
+    ('asakaa', 'African', 1), ('hiplife', 'African', 1), ('highlife', 'African', 1), ('gospel', 'African', 1),
+    ('bongo piano', 'African', 1), ('private school piano', 'African', 1), ('bacardi', 'African', 1), ('3 step', 'African', 1),
+    ('ndombolo', 'African', 1), ('rumba congolaise', 'African', 1), ('afro house', 'African', 1), ('bikutsi', 'African', 1),
+    ('gnawa', 'African', 1), ('kizomba', 'African', 1), ('sufi', 'African', 1), ('tribal house', 'African', 1),
+    ('afro tech', 'African', 1), ('ethiopian jazz', 'African', 1), ('coupé décalé', 'African', 1), ('traditional music', 'African', 1),
+    ('nigerian drill', 'African', 1), ('bongo flava', 'African', 1), ('singeli', 'African', 1), ('gengetone', 'African', 1),
+    ('gospel r&b', 'African', 1), ('fújì', 'African', 1), ('rap ivoire', 'African', 1), ('kuduro', 'African', 1),
+    ('african gospel', 'African', 1), ('alternative r&b', 'African', 1), ('maskandi', 'African', 1), ('moroccan pop', 'African', 1),
+    ('raï', 'African', 1), ('moroccan rap', 'African', 1), ('moroccan chaabi', 'African', 1), ('mahraganat', 'African', 1),
+    ('christian alternative rock', 'African', 1), ('lo-fi', 'African', 1), ('lo-fi beats', 'African', 1), ('bongo', 'African', 1),
+    ('jazz', 'African', 1);
+
+
+-- Materialized playlist/track facts and per-playlist distribution summaries,
+-- rebuilt by embedded_backend.refresh_playlist_track_facts
+
+CREATE TABLE IF NOT EXISTS Playlist_Track_Facts (
+    playlist_id            INTEGER NOT NULL,
+    playlist_name          VARCHAR,
+    playlist_type          VARCHAR NOT NULL,
+    track_id               INTEGER NOT NULL,
+    track_name             VARCHAR,
+    release_date           DATE,
+    artist_id              INTEGER NOT NULL,
+    artist_name            VARCHAR NOT NULL,
+    nationality            VARCHAR,
+    is_african_nationality VARCHAR NOT NULL,
+    genre_name             VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS Playlist_Nationality_Summary (
+    playlist_type          VARCHAR NOT NULL,
+    playlist_id            INTEGER NOT NULL,
+    playlist_name          VARCHAR,
+    nationality            VARCHAR,
+    is_african_nationality VARCHAR NOT NULL,
+    track_count            INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Playlist_Genre_Summary (
+    playlist_type VARCHAR NOT NULL,
+    playlist_id   INTEGER NOT NULL,
+    playlist_name VARCHAR,
+    genre_name    VARCHAR NOT NULL,
+    release_date  DATE,
+    track_count   INTEGER NOT NULL,
+    proportion    DOUBLE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Playlist_Artist_Summary (
+    playlist_type VARCHAR NOT NULL,
+    playlist_id   INTEGER NOT NULL,
+    playlist_name VARCHAR,
+    artist_id     INTEGER NOT NULL,
+    artist_name   VARCHAR NOT NULL,
+    track_count   INTEGER NOT NULL,
+    proportion    DOUBLE NOT NULL
+);
+
+
+-- Views for analysis (same definitions as on Azure SQL)
+
+CREATE OR REPLACE VIEW vw_all_playlists AS
+SELECT
+    playlist_id,
+    playlist_name,
+    playlist_owner,
+    CASE 
+  WHEN playlist_owner = 'Spotify' THEN 'Algorithmic'
+  ELSE 'User'
+END AS playlist_type
+FROM playlists;
+
+CREATE OR REPLACE VIEW vw_user_curated_playlists AS
+SELECT
+    playlist_id,
+    playlist_name,
+    playlist_owner
+FROM playlists
+WHERE LOWER(playlist_owner) <> 'spotify';
+
+CREATE OR REPLACE VIEW vw_playlist_track_facts AS
+SELECT
+    playlist_id,
+    playlist_name,
+    track_id,
+    track_name,
+    artist_id,
+    artist_name,
+    nationality,
+    release_date,
+    is_african_nationality,
+    genre_name
+FROM Playlist_Track_Facts
+WHERE playlist_type = 'User'
+    -- Same playlists as vw_user_curated_playlists, which leaves out those with no owner
+    AND playlist_id IN (SELECT playlist_id FROM vw_user_curated_playlists)
+;
+
+CREATE OR REPLACE VIEW vw_playlist_nationality_distribution AS
+SELECT
+    playlist_id,
+    playlist_name,
+    nationality,
+    track_count
+FROM Playlist_Nationality_Summary
+WHERE playlist_type = 'User'
+    AND playlist_id IN (SELECT playlist_id FROM vw_user_curated_playlists)
+;
+
+CREATE OR REPLACE VIEW vw_playlist_genre_distribution AS
+SELECT
+    playlist_id,
+    Playlist_name,
+    genre_name,
+    release_date,
+    track_count,
+    proportion
+FROM Playlist_Genre_Summary
+WHERE playlist_type = 'User'
+    AND playlist_id IN (SELECT playlist_id FROM vw_user_curated_playlists)
+;
+
+CREATE OR REPLACE VIEW vw_playlist_artist_exposure AS
+SELECT
+    playlist_id,
+    playlist_name,
+    artist_id,
+    artist_name,
+    track_count,
+    proportion
+FROM Playlist_Artist_Summary
+WHERE playlist_type = 'User'
+    AND playlist_id IN (SELECT playlist_id FROM vw_user_curated_playlists)
+;
+
+CREATE OR REPLACE VIEW vw_tracks AS
+SELECT
+    playlist_id,
+    playlist_name,
+    track_id,
+    track_name,
+    artist_id,
+    artist_name,
+    nationality,
+    playlist_type,
+    is_african_nationality,
+    genre_name
+FROM Playlist_Track_Facts
+;
+
+CREATE OR REPLACE VIEW vw_all_playlist_nationality_distribution AS
+SELECT
+    playlist_id,
+    playlist_name,
+    nationality,
+    track_count,
+    playlist_type
+FROM Playlist_Nationality_Summary
+where is_african_nationality= 'African'
+;
+
+CREATE OR REPLACE VIEW vw_all_playlist_genre_distribution AS
+SELECT
+    playlist_id,
+    Playlist_name,
+    genre_name,
+    track_count,
+    proportion,
+    playlist_type
+FROM Playlist_Genre_Summary
+;
+
+CREATE OR REPLACE VIEW vw_all_playlist_artist_exposure AS
+SELECT
+    playlist_id,
+    playlist_name,
+    artist_id,
+    artist_name,
+    track_count,
+    proportion,
+    playlist_type
+FROM Playlist_Artist_Summary
+;
@@ -99,7 +99,7 @@ CREATE TABLE ##Artist_Nationalities (
 );
 
 
--- 8.2) Load Artist_Nationalities table 
+-- 8.2) Load Artist_Nationalities table (Data_Load_Script.py runs this after filling ##Artist_Nationalities)
 INSERT INTO Artist_Nationalities (Artist_ID, Nationality_ID)
 SELECT
     A.Artist_ID,          
@@ -152,6 +152,69 @@ CREATE TABLE Tracks_Genre (
 );
 
 
+-- 11.1) NATURAL KEYS AND REVERSE JUNCTION INDEXES
+-- The loader merges every dimension on its natural key and the views join the junctions
+-- from both ends. Unique natural keys give the MERGE a seek and refuse duplicates; each
+-- junction's primary key covers one direction and these indexes cover the other (the
+-- clustered key rides along, so they cover the join without lookups).
+ALTER TABLE Albums ADD CONSTRAINT UQ_Albums_spotify_album_id UNIQUE (spotify_album_id);
+ALTER TABLE Tracks ADD CONSTRAINT UQ_Tracks_canonical_track_id UNIQUE (canonical_track_id);
+ALTER TABLE Playlists ADD CONSTRAINT UQ_Playlists_Spotify_Playlist_ID UNIQUE (Spotify_Playlist_ID);
+ALTER TABLE Genres ADD CONSTRAINT UQ_Genres_Genre_Name UNIQUE (Genre_Name);
+ALTER TABLE Nationalities ADD CONSTRAINT UQ_Nationalities_Country_Name UNIQUE (Country_Name);
+ALTER TABLE Nationalities ADD CONSTRAINT UQ_Nationalities_Country_Code UNIQUE (Country_Code);
+
+CREATE NONCLUSTERED INDEX IX_Nationalities_Nationality ON Nationalities (Nationality);
+
+CREATE NONCLUSTERED INDEX IX_Artist_Tracks_Track_ID ON Artist_Tracks (Track_ID);
+CREATE NONCLUSTERED INDEX IX_Tracks_Genre_GENRE_ID ON Tracks_Genre (GENRE_ID);
+CREATE NONCLUSTERED INDEX IX_Playlist_Tracks_Track_ID ON Playlist_Tracks (Track_ID);
+
+-- 11.2) CLASSIFICATION LOOKUPS
+-- Which country codes and genres count as African, kept as data: the facts refresh and the
+-- dashboard join these on their keys instead of repeating IN lists. Codes and genres not
+-- listed are non-African. To reclassify, update a row and run sp_refresh_playlist_track_facts.
+CREATE TABLE Country_Regions (
+    Country_Code VARCHAR (50) NOT NULL PRIMARY KEY,
+    Region_Name  VARCHAR (50) NOT NULL,
+    Is_African   BIT          NOT NULL
+);
+
+CREATE TABLE Genre_Families (
+    Genre_Name  VARCHAR (50) NOT NULL PRIMARY KEY,
+    Family_Name VARCHAR (50) NOT NULL,
+    Is_African  BIT          NOT NULL
+);
+
+-- Namibia is 'NAM' in the nationality source ('NA' would be read back as a missing value)
+INSERT INTO Country_Regions (Country_Code, Region_Name, Is_African) VALUES
+    ('DZ', 'Africa', 1), ('AO', 'Africa', 1), ('BJ', 'Africa', 1), ('BW', 'Africa', 1), ('BF', 'Africa', 1), ('BI', 'Africa', 1),
+    ('CM', 'Africa', 1), ('CV', 'Africa', 1), ('CF', 'Africa', 1), ('TD', 'Africa', 1), ('KM', 'Africa', 1), ('CG', 'Africa', 1),
+    ('CD', 'Africa', 1), ('CI', 'Africa', 1), ('DJ', 'Africa', 1), ('EG', 'Africa', 1), ('GQ', 'Africa', 1), ('ER', 'Africa', 1),
+    ('SZ', 'Africa', 1), ('ET', 'Africa', 1), ('GA', 'Africa', 1), ('GM', 'Africa', 1), ('GH', 'Africa', 1), ('GN', 'Africa', 1),
+    ('GW', 'Africa', 1), ('KE', 'Africa', 1), ('LS', 'Africa', 1), ('LR', 'Africa', 1), ('LY', 'Africa', 1), ('MG', 'Africa', 1),
+    ('MW', 'Africa', 1), ('ML', 'Africa', 1), ('MR', 'Africa', 1), ('MU', 'Africa', 1), ('MA', 'Africa', 1), ('MZ', 'Africa', 1),
+    ('NAM', 'Africa', 1), ('NE', 'Africa', 1), ('NG', 'Africa', 1), ('RW', 'Africa', 1), ('ST', 'Africa', 1), ('SN', 'Africa', 1),
+    ('SC', 'Africa', 1), ('SL', 'Africa', 1), ('SO', 'Africa', 1), ('ZA', 'Africa', 1), ('SS', 'Africa', 1), ('SD', 'Africa', 1),
+    ('TZ', 'Africa', 1), ('TG', 'Africa', 1), ('TN', 'Africa', 1), ('UG', 'Africa', 1), ('ZM', 'Africa', 1), ('ZW', 'Africa', 1);
+
+INSERT INTO Genre_Families (Genre_Name, Family_Name, Is_African) VALUES
+    ('afrobeats', 'African', 1), ('afropop', 'African', 1), ('afro r&b', 'African', 1), ('afrobeat', 'African', 1),
+    ('afropiano', 'African', 1), ('afro soul', 'African', 1), ('afroswing', 'African', 1), ('azonto', 'African', 1),
+    ('alté', 'African', 1), ('afro adura', 'African', 1), ('ghanaian hip hop', 'African', 1), ('amapiano', 'African', 1),
+    ('gqom', 'African', 1), ('rap', 'African', 1), ('french r&b', 'African', 1), ('pop urbaine', 'African', 1),
+    ('asakaa', 'African', 1), ('hiplife', 'African', 1), ('highlife', 'African', 1), ('gospel', 'African', 1),
+    ('bongo piano', 'African', 1), ('private school piano', 'African', 1), ('bacardi', 'African', 1), ('3 step', 'African', 1),
+    ('ndombolo', 'African', 1), ('rumba congolaise', 'African', 1), ('afro house', 'African', 1), ('bikutsi', 'African', 1),
+    ('gnawa', 'African', 1), ('kizomba', 'African', 1), ('sufi', 'African', 1), ('tribal house', 'African', 1),
+    ('afro tech', 'African', 1), ('ethiopian jazz', 'African', 1), ('coupé décalé', 'African', 1), ('traditional music', 'African', 1),
+    ('nigerian drill', 'African', 1), ('bongo flava', 'African', 1), ('singeli', 'African', 1), ('gengetone', 'African', 1),
+    ('gospel r&b', 'African', 1), ('fújì', 'African', 1), ('rap ivoire', 'African', 1), ('kuduro', 'African', 1),
+    ('african gospel', 'African', 1), ('alternative r&b', 'African', 1), ('maskandi', 'African', 1), ('moroccan pop', 'African', 1),
+    ('raï', 'African', 1), ('moroccan rap', 'African', 1), ('moroccan chaabi', 'African', 1), ('mahraganat', 'African', 1),
+    ('christian alternative rock', 'African', 1), ('lo-fi', 'African', 1), ('lo-fi beats', 'African', 1), ('bongo', 'African', 1),
+    ('jazz', 'African', 1);
+
 --- creation of views for analysis----
 GO
 CREATE VIEW vw_all_playlists AS
@@ -175,35 +238,218 @@ FROM playlists
 WHERE LOWER(playlist_owner) <> 'spotify';
 
 
+GO
+-- 12) MATERIALIZED PLAYLIST/TRACK FACTS
+-- One row per playlist, track, artist, nationality and genre: the eight-way join the
+-- analysis views used to repeat on every query. Rebuilt by sp_refresh_playlist_track_facts,
+-- which the loader runs after every load.
+CREATE TABLE Playlist_Track_Facts (
+    playlist_id            INT            NOT NULL,
+    playlist_name          VARCHAR (500)  NULL,
+    playlist_type          VARCHAR (11)   NOT NULL,
+    track_id               INT            NOT NULL,
+    track_name             NVARCHAR (255) NULL,
+    release_date           DATE           NULL,
+    artist_id              INT            NOT NULL,
+    artist_name            NVARCHAR (255) NOT NULL,
+    nationality            VARCHAR (50)   NULL,
+    is_african_nationality VARCHAR (11)   NOT NULL,
+    genre_name             VARCHAR (50)   NULL
+);
+
+CREATE CLUSTERED INDEX CIX_Playlist_Track_Facts
+    ON Playlist_Track_Facts (playlist_type, playlist_id, track_id);
+
+CREATE NONCLUSTERED INDEX IX_Playlist_Track_Facts_Genre
+    ON Playlist_Track_Facts (genre_name)
+    INCLUDE (playlist_name, release_date);
+
+CREATE NONCLUSTERED INDEX IX_Playlist_Track_Facts_Nationality
+    ON Playlist_Track_Facts (is_african_nationality, nationality)
+    INCLUDE (playlist_name);
+
+CREATE NONCLUSTERED INDEX IX_Playlist_Track_Facts_Artist
+    ON Playlist_Track_Facts (artist_id)
+    INCLUDE (artist_name, playlist_name);
+
+
+-- 13) PER-PLAYLIST DISTRIBUTION SUMMARIES
+-- The track counts and proportions the distribution views return, stored per playlist
+-- and kept current by sp_refresh_playlist_track_facts, so each view is a range read.
+-- Proportions are per playlist, so one table serves both the user and all scopes.
+CREATE TABLE Playlist_Nationality_Summary (
+    playlist_type          VARCHAR (11)   NOT NULL,
+    playlist_id            INT            NOT NULL,
+    playlist_name          VARCHAR (500)  NULL,
+    nationality            VARCHAR (50)   NULL,
+    is_african_nationality VARCHAR (11)   NOT NULL,
+    track_count            INT            NOT NULL
+);
+CREATE UNIQUE CLUSTERED INDEX CIX_Playlist_Nationality_Summary
+    ON Playlist_Nationality_Summary (playlist_type, playlist_id, nationality, is_african_nationality);
+
+CREATE TABLE Playlist_Genre_Summary (
+    playlist_type VARCHAR (11)  NOT NULL,
+    playlist_id   INT           NOT NULL,
+    playlist_name VARCHAR (500) NULL,
+    genre_name    VARCHAR (50)  NOT NULL,
+    release_date  DATE          NULL,
+    track_count   INT           NOT NULL,
+    proportion    FLOAT         NOT NULL
+);
+CREATE UNIQUE CLUSTERED INDEX CIX_Playlist_Genre_Summary
+    ON Playlist_Genre_Summary (playlist_type, playlist_id, genre_name);
+
+CREATE TABLE Playlist_Artist_Summary (
+    playlist_type VARCHAR (11)   NOT NULL,
+    playlist_id   INT            NOT NULL,
+    playlist_name VARCHAR (500)  NULL,
+    artist_id     INT            NOT NULL,
+    artist_name   NVARCHAR (255) NOT NULL,
+    track_count   INT            NOT NULL,
+    proportion    FLOAT          NOT NULL
+);
+CREATE UNIQUE CLUSTERED INDEX CIX_Playlist_Artist_Summary
+    ON Playlist_Artist_Summary (playlist_type, playlist_id, artist_id);
+
+
+GO
+-- Rebuilds the facts and summaries of the given playlists, plus every playlist holding one of
+-- the given tracks or a track by one of the given artists (comma-separated IDs). With no
+-- list at all, everything is rebuilt. The embedded (DuckDB) load runs the INSERT statements
+-- below as they are written here, so keep them to SQL both databases read.
+CREATE OR ALTER PROCEDURE sp_refresh_playlist_track_facts
+    @playlist_ids NVARCHAR(MAX) = NULL,
+    @track_ids    NVARCHAR(MAX) = NULL,
+    @artist_ids   NVARCHAR(MAX) = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @full BIT = CASE
+        WHEN @playlist_ids IS NULL AND @track_ids IS NULL AND @artist_ids IS NULL THEN 1 ELSE 0
+    END;
+
+    CREATE TABLE #affected (playlist_id INT PRIMARY KEY);
+    IF @full = 1
+        INSERT INTO #affected SELECT playlist_id FROM playlists;
+    ELSE
+        INSERT INTO #affected
+        SELECT CAST(value AS INT) FROM STRING_SPLIT(@playlist_ids, ',')
+        UNION
+        SELECT pt.playlist_id
+        FROM playlist_tracks pt
+        JOIN STRING_SPLIT(@track_ids, ',') changed ON pt.track_id = CAST(changed.value AS INT)
+        UNION
+        SELECT pt.playlist_id
+        FROM playlist_tracks pt
+        JOIN artist_tracks art ON art.track_id = pt.track_id
+        JOIN STRING_SPLIT(@artist_ids, ',') changed ON art.artist_id = CAST(changed.value AS INT);
+
+    BEGIN TRANSACTION;
+
+    IF @full = 1
+    BEGIN
+        TRUNCATE TABLE Playlist_Track_Facts;
+        TRUNCATE TABLE Playlist_Nationality_Summary;
+        TRUNCATE TABLE Playlist_Genre_Summary;
+        TRUNCATE TABLE Playlist_Artist_Summary;
+    END
+    ELSE
+    BEGIN
+        DELETE f FROM Playlist_Track_Facts f JOIN #affected af ON af.playlist_id = f.playlist_id;
+        DELETE s FROM Playlist_Nationality_Summary s JOIN #affected af ON af.playlist_id = s.playlist_id;
+        DELETE s FROM Playlist_Genre_Summary s JOIN #affected af ON af.playlist_id = s.playlist_id;
+        DELETE s FROM Playlist_Artist_Summary s JOIN #affected af ON af.playlist_id = s.playlist_id;
+    END;
+
+    INSERT INTO Playlist_Track_Facts (
+        playlist_id, playlist_name, playlist_type, track_id, track_name, release_date,
+        artist_id, artist_name, nationality, is_african_nationality, genre_name
+    )
+    SELECT
+        p.playlist_id,
+        p.playlist_name,
+        p.playlist_type,
+        t.track_id,
+        t.track_name,
+        t.release_date,
+        a.artist_id,
+        a.artist_name,
+        n.nationality,
+        CASE WHEN cr.Is_African = 1 THEN 'African' ELSE 'non_African' END AS is_african_nationality,
+        g.genre_name
+    FROM vw_all_playlists p
+    JOIN #affected af ON af.playlist_id = p.playlist_id
+    JOIN playlist_tracks pt ON pt.playlist_id = p.playlist_id
+    JOIN tracks t ON t.track_id = pt.track_id
+    JOIN artist_tracks art ON art.track_id = t.track_id
+    JOIN artists a ON a.artist_id = art.artist_id
+    LEFT JOIN artist_nationalities an ON an.artist_id = a.artist_id
+    LEFT JOIN nationalities n ON n.nationality_id = an.nationality_id
+    LEFT JOIN country_regions cr ON cr.country_code = n.country_code
+    LEFT JOIN tracks_genre tg ON tg.track_id = t.track_id
+    LEFT JOIN genres g ON g.genre_id = tg.genre_id;
+
+    INSERT INTO Playlist_Nationality_Summary (
+        playlist_type, playlist_id, playlist_name, nationality, is_african_nationality, track_count
+    )
+    SELECT f.playlist_type, f.playlist_id, f.playlist_name, f.nationality, f.is_african_nationality, COUNT(*)
+    FROM Playlist_Track_Facts f
+    JOIN #affected af ON af.playlist_id = f.playlist_id
+    GROUP BY f.playlist_type, f.playlist_id, f.playlist_name, f.nationality, f.is_african_nationality;
+
+    INSERT INTO Playlist_Genre_Summary (
+        playlist_type, playlist_id, playlist_name, genre_name, release_date, track_count, proportion
+    )
+    SELECT
+        f.playlist_type,
+        f.playlist_id,
+        f.playlist_name,
+        f.genre_name,
+        MAX(f.release_date),
+        COUNT(DISTINCT f.track_id),
+        CAST(COUNT(f.track_id) AS FLOAT) / SUM(COUNT(f.track_id)) OVER (PARTITION BY f.playlist_id)
+    FROM Playlist_Track_Facts f
+    JOIN #affected af ON af.playlist_id = f.playlist_id
+    JOIN genre_families gf ON gf.genre_name = f.genre_name AND gf.is_african = 1
+    GROUP BY f.playlist_type, f.playlist_id, f.playlist_name, f.genre_name;
+
+    INSERT INTO Playlist_Artist_Summary (
+        playlist_type, playlist_id, playlist_name, artist_id, artist_name, track_count, proportion
+    )
+    SELECT
+        f.playlist_type,
+        f.playlist_id,
+        f.playlist_name,
+        f.artist_id,
+        f.artist_name,
+        COUNT(DISTINCT f.track_id),
+        CAST(COUNT(*) AS FLOAT) / SUM(COUNT(*)) OVER (PARTITION BY f.playlist_id)
+    FROM Playlist_Track_Facts f
+    JOIN #affected af ON af.playlist_id = f.playlist_id
+    GROUP BY f.playlist_type, f.playlist_id, f.playlist_name, f.artist_id, f.artist_name;
+
+    COMMIT TRANSACTION;
+END;
+
+
 GO
 CREATE VIEW vw_playlist_track_facts AS
 SELECT
-    p.playlist_id,
-    p.playlist_name,
-    t.track_id,
-    t.track_name,
-    a.artist_id,
-    a.artist_name,
-    n.nationality,
-    t.release_date,
-    CASE 
-        WHEN n.country_code IN (
-            'DZ','AO','BJ','BW','BF','BI','CM','CV','CF','TD','KM','CG','CD','CI','DJ','EG','GQ','ER','ET',
-            'GA','GM','GH','GN','GW','KE','LS','LR','LY','MG','MW','ML','MR','MU','MA','MZ','NA','NE','NG',
-            'RW','ST','SN','SC','SL','SO','ZA','SS','SD','TZ','TG','TN','UG','ZM','ZW'
-        ) THEN 'African'
-        ELSE 'non_African' 
-    END AS is_african_nationality,
-    g.genre_name
-FROM vw_user_curated_playlists p
-JOIN playlist_tracks pt ON pt.playlist_id = p.playlist_id
-JOIN tracks t ON t.track_id = pt.track_id
-JOIN artist_tracks at ON at.track_id = t.track_id
-JOIN artists a ON a.artist_id = at.artist_id
-LEFT JOIN artist_nationalities an ON an.artist_id = a.artist_id
-LEFT JOIN nationalities n ON n.nationality_id = an.nationality_id
-LEFT JOIN tracks_genre tg ON tg.track_id = t.track_id
-LEFT JOIN genres g ON g.genre_id = tg.genre_id
+    playlist_id,
+    playlist_name,
+    track_id,
+    track_name,
+    artist_id,
+    artist_name,
+    nationality,
+    release_date,
+    is_african_nationality,
+    genre_name
+FROM Playlist_Track_Facts
+WHERE playlist_type = 'User'
+    -- Same playlists as vw_user_curated_playlists, which leaves out those with no owner
+    AND playlist_id IN (SELECT playlist_id FROM vw_user_curated_playlists)
 ;
 
 
@@ -213,38 +459,26 @@ SELECT
     playlist_id,
     playlist_name,
     nationality,
-    COUNT(*) AS track_count
-FROM vw_playlist_track_facts
-GROUP BY playlist_id, nationality,playlist_name
+    track_count
+FROM Playlist_Nationality_Summary
+WHERE playlist_type = 'User'
+    AND playlist_id IN (SELECT playlist_id FROM vw_user_curated_playlists)
 ;
 
 
-
-
 GO
 CREATE VIEW vw_playlist_genre_distribution AS
-With african_genres as (select genre_id,genre_name from genres where genre_name in
- (('afrobeats'),('afropop'),('afro r&b'),('afrobeat'),('afropiano'),('afro soul'),('afroswing'),
- ('azonto'),('alté'),('afro adura'),('ghanaian hip hop'),('amapiano'),
-('gqom'),('rap'),('french r&b'),('pop urbaine'),('asakaa'),('hiplife'),('highlife'),
-('gospel'),('bongo piano'),('private school piano'),('bacardi'),('3 step'),('ndombolo'),
-('rumba congolaise'),('afro house'),('bikutsi'),('gnawa'),('kizomba'),('sufi'),('tribal house'),
-('afro tech'),('ethiopian jazz'),('coupé décalé'),('traditional music'),('nigerian drill'),
-('bongo flava'),('singeli'),('gengetone'),('gospel r&b'),('fújì'),('rap ivoire'),('kuduro'),
-('african gospel'),('alternative r&b'),('maskandi'),('moroccan pop'),('raï'),('moroccan rap'),
-('moroccan chaabi'),('mahraganat'),('christian alternative rock'),('lo-fi'),('lo-fi beats'),('gospel'),
-'bongo','rumba congolaise','singeli','ndombolo','hiplife','nigerian drill','jazz'))
 SELECT
     playlist_id,
     Playlist_name,
-    ag.genre_name,
-    a.release_date,
-    COUNT(distinct(track_id)) AS track_count,
-    CAST(COUNT(track_id) AS FLOAT)
-      / SUM(COUNT(track_id)) OVER (PARTITION BY playlist_id) AS proportion
-FROM vw_playlist_track_facts a
-join african_genres ag on ag.genre_name= a.genre_name
-GROUP BY playlist_id,playlist_name, ag.genre_name;
+    genre_name,
+    release_date,
+    track_count,
+    proportion
+FROM Playlist_Genre_Summary
+WHERE playlist_type = 'User'
+    AND playlist_id IN (SELECT playlist_id FROM vw_user_curated_playlists)
+;
 
 
 GO
@@ -254,41 +488,27 @@ SELECT
     playlist_name,
     artist_id,
     artist_name,
-    COUNT(distinct(track_id)) AS track_count,
-    CAST(COUNT(*) AS FLOAT)
-      / SUM(COUNT(*)) OVER (PARTITION BY playlist_id) AS proportion
-FROM vw_playlist_track_facts
-GROUP BY playlist_id,playlist_name, artist_id, artist_name;
+    track_count,
+    proportion
+FROM Playlist_Artist_Summary
+WHERE playlist_type = 'User'
+    AND playlist_id IN (SELECT playlist_id FROM vw_user_curated_playlists)
+;
 
 GO
 CREATE VIEW vw_tracks AS
 SELECT
-    p.playlist_id,
-    p.playlist_name,
-    t.track_id,
-    t.track_name,
-    a.artist_id,
-    a.artist_name,
-    n.nationality,
-    p.playlist_type,
-    CASE 
-        WHEN n.country_code IN (
-            'DZ','AO','BJ','BW','BF','BI','CM','CV','CF','TD','KM','CG','CD','CI','DJ','EG','GQ','ER','ET',
-            'GA','GM','GH','GN','GW','KE','LS','LR','LY','MG','MW','ML','MR','MU','MA','MZ','NA','NE','NG',
-            'RW','ST','SN','SC','SL','SO','ZA','SS','SD','TZ','TG','TN','UG','ZM','ZW'
-        ) THEN 'African'
-        ELSE 'non_African' 
-    END AS is_african_nationality,
-    g.genre_name
-FROM vw_all_playlists p
-JOIN playlist_tracks pt ON pt.playlist_id = p.playlist_id
-JOIN tracks t ON t.track_id = pt.track_id
-JOIN artist_tracks at ON at.track_id = t.track_id
-JOIN artists a ON a.artist_id = at.artist_id
-LEFT JOIN artist_nationalities an ON an.artist_id = a.artist_id
-LEFT JOIN nationalities n ON n.nationality_id = an.nationality_id
-LEFT JOIN tracks_genre tg ON tg.track_id = t.track_id
-LEFT JOIN genres g ON g.genre_id = tg.genre_id
+    playlist_id,
+    playlist_name,
+    track_id,
+    track_name,
+    artist_id,
+    artist_name,
+    nationality,
+    playlist_type,
+    is_african_nationality,
+    genre_name
+FROM Playlist_Track_Facts
 ;
 
 
@@ -298,40 +518,24 @@ SELECT
     playlist_id,
     playlist_name,
     nationality,
-    COUNT(*) AS track_count,
+    track_count,
     playlist_type
-FROM vw_tracks
+FROM Playlist_Nationality_Summary
 where is_african_nationality= 'African'
-GROUP BY playlist_id, nationality,playlist_name,playlist_type 
 ;
 
 
-
 GO
 CREATE VIEW vw_all_playlist_genre_distribution AS
-With african_genres as (select genre_id,genre_name from genres where genre_name in
- (('afrobeats'),('afropop'),('afro r&b'),('afrobeat'),('afropiano'),('afro soul'),('afroswing'),
- ('azonto'),('alté'),('afro adura'),('ghanaian hip hop'),('amapiano'),
-('gqom'),('rap'),('french r&b'),('pop urbaine'),('asakaa'),('hiplife'),('highlife'),
-('gospel'),('bongo piano'),('private school piano'),('bacardi'),('3 step'),('ndombolo'),
-('rumba congolaise'),('afro house'),('bikutsi'),('gnawa'),('kizomba'),('sufi'),('tribal house'),
-('afro tech'),('ethiopian jazz'),('coupé décalé'),('traditional music'),('nigerian drill'),
-('bongo flava'),('singeli'),('gengetone'),('gospel r&b'),('fújì'),('rap ivoire'),('kuduro'),
-('african gospel'),('alternative r&b'),('maskandi'),('moroccan pop'),('raï'),('moroccan rap'),
-('moroccan chaabi'),('mahraganat'),('christian alternative rock'),('lo-fi'),('lo-fi beats'),('gospel'),
-'bongo','rumba congolaise','singeli','ndombolo','hiplife','nigerian drill','jazz'))
 SELECT
     playlist_id,
     Playlist_name,
-    ag.genre_name,
-    COUNT(distinct(track_id)) AS track_count,
-    CAST(COUNT(track_id) AS FLOAT)
-      / SUM(COUNT(track_id)) OVER (PARTITION BY playlist_id) AS proportion,
-      playlist_type
-FROM vw_tracks a
-join african_genres ag on ag.genre_name= a.genre_name
-GROUP BY playlist_id,playlist_name, ag.genre_name,playlist_type;
-
+    genre_name,
+    track_count,
+    proportion,
+    playlist_type
+FROM Playlist_Genre_Summary
+;
 
 
 GO
@@ -341,13 +545,8 @@ SELECT
     playlist_name,
     artist_id,
     artist_name,
-    COUNT(distinct(track_id)) AS track_count,
-    CAST(COUNT(*) AS FLOAT)
-      / SUM(COUNT(*)) OVER (PARTITION BY playlist_id) AS proportion,
-      playlist_type
-FROM vw_tracks
-GROUP BY playlist_id,playlist_name, artist_id, artist_name,playlist_type;
-
-
-
-
+    track_count,
+    proportion,
+    playlist_type
+FROM Playlist_Artist_Summary
+;
\ No newline at end of file
@@ -0,0 +1,432 @@
+import os
+import queue
+import random
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+
+
+# --------------------------------------------------
+# Configuration (environment only; nothing secret lives in the code)
+# --------------------------------------------------
+# DB_BACKEND        mssql (default), sqlite or duckdb
+# DB_CONNECTION_STRING  full ODBC string; overrides the DB_* parts below
+# DB_DRIVER, DB_SERVER, DB_NAME, DB_USER, DB_PASSWORD  Azure SQL connection parts
+# DB_PATH           database file for sqlite/duckdb; ":memory:" is one in-process database
+#                   shared by the whole duckdb pool, and needs DB_POOL_SIZE=1 with sqlite
+# DB_POOL_SIZE      connections kept open per process
+# DB_POOL_TIMEOUT   seconds to wait for a free pooled connection before giving up
+# DB_RETRIES        attempts for transient Azure SQL errors
+def load_config():
+    return {
+        "backend": os.getenv("DB_BACKEND", "mssql").lower(),
+        "connection_string": os.getenv("DB_CONNECTION_STRING"),
+        "driver": os.getenv("DB_DRIVER", "ODBC Driver 18 for SQL Server"),
+        "server": os.getenv("DB_SERVER", "masters2025.database.windows.net"),
+        "database": os.getenv("DB_NAME", "Spotify_data"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+        "path": os.getenv("DB_PATH", "spotify.db"),
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "8")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "60")),
+        "retries": int(os.getenv("DB_RETRIES", "5")),
+        "timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "30"))
+    }
+
+
+def odbc_connection_string(config):
+    if config["connection_string"]:
+        return config["connection_string"]
+    if not config["user"] or not config["password"]:
+        raise RuntimeError("Set DB_USER and DB_PASSWORD (or DB_CONNECTION_STRING) to connect to Azure SQL")
+    return (
+        f"DRIVER={{{config['driver']}}};"
+        f"SERVER={config['server']};"
+        f"DATABASE={config['database']};"
+        f"UID={config['user']};"
+        f"PWD={config['password']};"
+        f"Encrypt=yes;TrustServerCertificate=no;Connection Timeout={config['timeout']};"
+    )
+
+
+# --------------------------------------------------
+# Transient errors
+# --------------------------------------------------
+# Azure SQL reconfiguration, throttling and failover errors that succeed on retry
+TRANSIENT_ERROR_CODES = {
+    64, 233, 1205, 4060, 4221, 10053, 10054, 10060, 10928, 10929,
+    40143, 40197, 40501, 40540, 40613, 49918, 49919, 49920
+}
+TRANSIENT_SQLSTATES = {"08S01", "08001", "08004", "HYT00", "HYT01", "40001"}
+
+
+def is_transient(error):
+    args = getattr(error, "args", ())
+    if args and args[0] in TRANSIENT_SQLSTATES:
+        return True
+    codes = re.findall(r"\((\d+)\)", " ".join(str(a) for a in args))
+    return any(int(code) in TRANSIENT_ERROR_CODES for code in codes)
+
+
+def backoff(attempt, base=0.5, cap=30.0):
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def with_retries(fn, retries, on_retry=None):
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == retries or not is_transient(e):
+                raise
+            delay = backoff(attempt)
+            print(f"Transient database error ({e}); retrying in {delay:.1f}s")
+            if on_retry is not None:
+                on_retry(e)
+            time.sleep(delay)
+
+
+# --------------------------------------------------
+# Latency histograms
+# --------------------------------------------------
+class LatencyHistogram:
+    """Counts of query latencies in fixed millisecond buckets."""
+
+    BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def record(self, seconds):
+        self.counts[bisect_left(self.BOUNDS_MS, seconds * 1000)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def percentile(self, p):
+        """Upper bound (ms) of the bucket holding the p-th percentile."""
+        target = p / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.BOUNDS_MS + [float("inf")], self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def statement_label(sql):
+    # Group by statement shape: first keyword and target, not by literal text
+    words = " ".join(sql.split()).split(" ")
+    return " ".join(words[:3])[:60]
+
+
+def record_latency(sql, seconds):
+    label = statement_label(sql)
+    with _histograms_lock:
+        _histograms.setdefault(label, LatencyHistogram()).record(seconds)
+
+
+def latency_histograms():
+    with _histograms_lock:
+        return dict(_histograms)
+
+
+def latency_report():
+    print("\nQuery latency (ms, bucket upper bounds)")
+    for label, histogram in sorted(latency_histograms().items(), key=lambda item: -item[1].total):
+        print(f"  {label:<60} {histogram.count:>7} calls  {histogram.total:8.2f}s  "
+              f"p50 {histogram.percentile(50):>6}  p95 {histogram.percentile(95):>6}  "
+              f"p99 {histogram.percentile(99):>6}")
+
+
+# --------------------------------------------------
+# Timed, retrying connection wrappers
+# --------------------------------------------------
+def _is_read(sql):
+    words = sql.split(None, 1)
+    # SELECT ... INTO creates a table, so it is a write
+    return bool(words) and words[0].upper() in ("SELECT", "WITH") and not _SELECT_INTO.search(sql)
+
+
+_SELECT_INTO = re.compile(r"\bINTO\s+[#\w\[]", re.IGNORECASE)
+_TEMP_TABLE_CREATED = re.compile(r"(?:CREATE\s+TABLE|INTO)\s+(#+\w+)", re.IGNORECASE)
+_TEMP_TABLE_DROPPED = re.compile(r"DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?(#+\w+)", re.IGNORECASE)
+# A whole-transaction COMMIT or ROLLBACK; ROLLBACK TRANSACTION <savepoint> leaves it open
+_TRANSACTION_ENDED = re.compile(r"\b(?:COMMIT|ROLLBACK)(?:\s+TRAN(?:SACTION)?)?\s*;?\s*$", re.IGNORECASE)
+
+
+class TimedCursor:
+    """DB-API cursor that records every statement's latency and retries transient read errors."""
+
+    def __init__(self, connection, cursor):
+        object.__setattr__(self, "_connection", connection)
+        object.__setattr__(self, "_cursor", cursor)
+        object.__setattr__(self, "_settings", {})
+
+    def execute(self, sql, *params):
+        # Parameters come pyodbc style, positionally or as one sequence; sqlite3 and duckdb take a sequence
+        args = params
+        if params and self._connection._pool.config["backend"] != "mssql":
+            args = params if len(params) == 1 and isinstance(params[0], (list, tuple)) else (params,)
+
+        def run():
+            started = time.perf_counter()
+            result = self._cursor.execute(sql, *args)
+            record_latency(sql, time.perf_counter() - started)
+            return result
+
+        # Writes may be inside a transaction the server has already lost, so only reads are
+        # retried, and only while a fresh connection would lose nothing: no open transaction,
+        # temp tables or SET options
+        retry = _is_read(sql) and not self._connection._has_session_state()
+        try:
+            if not retry:
+                run()
+                return self
+            with_retries(run, self._connection._pool.config["retries"], on_retry=self._reconnect)
+            return self
+        finally:
+            self._connection._track(sql)
+
+    def executemany(self, sql, rows):
+        started = time.perf_counter()
+        self._cursor.executemany(sql, rows)
+        record_latency(sql, time.perf_counter() - started)
+        self._connection._track(sql)
+        return self
+
+    def _reconnect(self, error):
+        self._connection._reconnect()
+        cursor = self._connection._raw.cursor()
+        for name, value in self._settings.items():
+            setattr(cursor, name, value)
+        object.__setattr__(self, "_cursor", cursor)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        # e.g. fast_executemany; kept so a reconnected cursor gets it again
+        setattr(self._cursor, name, value)
+        self._settings[name] = value
+
+
+class PooledConnection:
+    """A pooled connection; `close()` or leaving a `with` block returns it to the pool.
+
+    It follows what the statements run on it leave behind in the session (an
+    open transaction, temp tables, SET options), so a transient error is only
+    answered with a fresh connection when that would lose none of it.
+    """
+
+    def __init__(self, pool, raw):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_raw", raw)
+        object.__setattr__(self, "_settings", {})
+        object.__setattr__(self, "_in_transaction", False)
+        object.__setattr__(self, "_temp_tables", set())
+        object.__setattr__(self, "_session_options", False)
+
+    def cursor(self):
+        return TimedCursor(self, self._raw.cursor())
+
+    def execute(self, sql, *params):
+        return self.cursor().execute(sql, *params)
+
+    def commit(self):
+        self._raw.commit()
+        object.__setattr__(self, "_in_transaction", False)
+
+    def rollback(self):
+        self._raw.rollback()
+        object.__setattr__(self, "_in_transaction", False)
+
+    def _track(self, sql):
+        first = sql.split(None, 1)[0].upper() if sql.strip() else ""
+        if _TRANSACTION_ENDED.search(sql):
+            object.__setattr__(self, "_in_transaction", False)
+        elif first == "BEGIN" or (not _is_read(sql) and self._implicit_transactions()):
+            object.__setattr__(self, "_in_transaction", True)
+        if first == "SET":
+            object.__setattr__(self, "_session_options", True)
+        self._temp_tables.update(_TEMP_TABLE_CREATED.findall(sql))
+        self._temp_tables.difference_update(_TEMP_TABLE_DROPPED.findall(sql))
+
+    def _implicit_transactions(self):
+        # Without autocommit, pyodbc and sqlite3 open a transaction at the first write;
+        # DuckDB commits every statement outside an explicit BEGIN on its own
+        return self._pool.config["backend"] != "duckdb" and not getattr(self._raw, "autocommit", False)
+
+    def _has_session_state(self):
+        return self._in_transaction or bool(self._temp_tables) or self._session_options
+
+    def _reconnect(self):
+        try:
+            self._raw.close()
+        except Exception:
+            pass
+        raw = self._pool.open()
+        for name, value in self._settings.items():
+            setattr(raw, name, value)
+        object.__setattr__(self, "_raw", raw)
+
+    def close(self):
+        raw = self._raw
+        if raw is not None:
+            object.__setattr__(self, "_raw", None)
+            self._pool.release(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Same contract as pyodbc: commit on success, roll back on error. A DuckDB connection
+        # has nothing to end (each cursor runs its own transactions), and its rollback with
+        # none open raises, which would hide the error being raised
+        try:
+            if self._raw is not None and self._implicit_transactions():
+                (self._raw.rollback if exc_type else self._raw.commit)()
+        finally:
+            self.close()
+
+    def __del__(self):
+        # Dashboard pages call get_connection() without closing; hand the connection back anyway
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __setattr__(self, name, value):
+        # e.g. autocommit; kept so a reconnected session gets it again
+        setattr(self._raw, name, value)
+        self._settings[name] = value
+
+
+class ConnectionPool:
+    """Up to `pool_size` open connections of one backend, reused across callers and threads.
+
+    A DuckDB pool opens the database once and hands out cursors on it, so
+    every connection sees the same tables, in a file or in memory.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or load_config()
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._database = None
+
+    def open(self):
+        backend = self.config["backend"]
+        if backend == "sqlite":
+            if self.config["path"] == ":memory:" and self.config["pool_size"] > 1:
+                raise ValueError("Every sqlite :memory: connection is a separate empty database; "
+                                 "use a file, or DB_POOL_SIZE=1")
+            return sqlite3.connect(self.config["path"], check_same_thread=False)
+        if backend == "duckdb":
+            import duckdb
+            with self._lock:
+                if self._database is None:
+                    self._database = duckdb.connect(self.config["path"])
+                return self._database.cursor()
+        if backend == "mssql":
+            import pyodbc
+            connection_string = odbc_connection_string(self.config)
+            return with_retries(lambda: pyodbc.connect(connection_string), self.config["retries"])
+        raise ValueError(f"Unknown DB_BACKEND {backend!r} (expected mssql, sqlite or duckdb)")
+
+    def connection(self, timeout=None):
+        """A pooled connection, waiting up to `timeout` (default DB_POOL_TIMEOUT) seconds for one to be free."""
+        if timeout is None:
+            timeout = self.config["pool_timeout"]
+        try:
+            raw = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.config["pool_size"]
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    raw = self.open()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                try:
+                    raw = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(
+                        f"No pooled connection was free within {timeout}s "
+                        f"(DB_POOL_SIZE={self.config['pool_size']}); is a connection not being closed?"
+                    ) from None
+        return PooledConnection(self, raw)
+
+    def release(self, raw):
+        if self.config["backend"] == "mssql":
+            try:
+                # Leave no open transaction or loader settings behind for the next user. A loader
+                # opens its transactions with BEGIN TRANSACTION under autocommit, which rollback()
+                # does not see, so end them in T-SQL whatever the autocommit flag says.
+                raw.execute("IF @@TRANCOUNT > 0 ROLLBACK TRANSACTION")
+                raw.rollback()
+                raw.autocommit = False
+            except Exception:
+                raw.close()
+                with self._lock:
+                    self._opened -= 1
+                return
+        self._idle.put(raw)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._opened = 0
+            if self._database is not None:
+                self._database.close()
+                self._database = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
+
+
+def configure(**overrides):
+    """Replace the process-wide pool, e.g. `configure(pool_size=7)` or `configure(backend="sqlite")`."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool({**load_config(), **overrides})
+        return _pool
+
+
+def get_connection():
+    return get_pool().connection()
@@ -3,7 +3,6 @@ from pathlib import Path
 import streamlit as st
 import pandas as pd
 import altair as alt
-import pyodbc
 import base64
 from scipy.stats import chisquare
 from scipy.spatial.distance import jensenshannon
@@ -168,27 +167,24 @@ def artists_without_nationality_annotation() -> int:
     return int(df.iloc[0, 0]) if not df.empty else 0
 
 
-AFRICA_CODES = (
-    "'DZ','AO','BJ','BW','BF','BI','CM','CV','CF','TD','KM','CG','CD','CI','DJ','EG','GQ','ER','ET',"
-    "'GA','GM','GH','GN','GW','KE','LS','LR','LY','MG','MW','ML','MR','MU','MA','MZ','NAM','NE','NG',"
-    "'RW','ST','SN','SC','SL','SO','ZA','SS','SD','TZ','TG','TN','UG','ZM','ZW'"
-)
-
 
 # --------------------------------------------------
 # 1) Artists: African vs Non-African
 # --------------------------------------------------
 @st.cache_data(show_spinner=True, ttl=CACHE_TTL)
 def get_artists_africa_split() -> dict:
-    query = f"""
+    query = """
     WITH ArtistCategorization AS (
         SELECT
             an.artist_id,
-            MAX(CASE WHEN n.country_code IN ({AFRICA_CODES}) THEN 1 ELSE 0 END) AS is_african,
-            MAX(CASE WHEN n.country_code NOT IN ({AFRICA_CODES}) THEN 1 ELSE 0 END) AS is_non_african
+            MAX(CASE WHEN cr.is_african = 1 THEN 1 ELSE 0 END) AS is_african,
+            MAX(CASE WHEN n.country_code IS NOT NULL AND COALESCE(cr.is_african, 0) = 0 THEN 1 ELSE 0 END)
+                AS is_non_african
         FROM artist_nationalities an
         JOIN nationalities n
             ON n.nationality_id = an.nationality_id
+        LEFT JOIN country_regions cr
+            ON cr.country_code = n.country_code
         GROUP BY an.artist_id
     )
     SELECT
@@ -238,18 +234,20 @@ except Exception as e:
 
 @st.cache_data(show_spinner=True, ttl=CACHE_TTL)
 def get_african_country_distribution() -> pd.DataFrame:
-    query = f"""
-    SELECT TOP 10
+    # TOP/LIMIT differ between Azure SQL and DuckDB, so the row cap is applied here
+    query = """
+    SELECT
         n.country_name,
         COUNT(DISTINCT a.artist_id) AS artists
     FROM artists a
     JOIN artist_nationalities an ON an.artist_id = a.artist_id
     JOIN nationalities n ON n.nationality_id = an.nationality_id
-    WHERE n.country_code IN ({AFRICA_CODES})
+    JOIN country_regions cr ON cr.country_code = n.country_code
+    WHERE cr.is_african = 1
     GROUP BY n.country_name
     ORDER BY artists DESC;
     """
-    return run_query(query)
+    return run_query(query).head(10)
 
 
 # 2.1) Country distribution among African artists (Top 10)
@@ -277,27 +275,29 @@ except Exception as e:
 
 @st.cache_data(show_spinner=True, ttl=CACHE_TTL)
 def get_playlists_african_presence() -> dict:
-    query = f"""
+    query = """
     WITH african_artists AS (
         SELECT DISTINCT an.artist_id
         FROM artist_nationalities an
         JOIN nationalities n
             ON n.nationality_id = an.nationality_id
-        WHERE n.country_code IN ({AFRICA_CODES})
+        JOIN country_regions cr
+            ON cr.country_code = n.country_code
+        WHERE cr.is_african = 1
     ),
     african_tracks AS (
-        SELECT DISTINCT at.track_id
-        FROM artist_tracks at
+        SELECT DISTINCT art.track_id
+        FROM artist_tracks art
         JOIN african_artists aa
-            ON aa.artist_id = at.artist_id
+            ON aa.artist_id = art.artist_id
     )
     SELECT
         COUNT(DISTINCT p.playlist_id) AS total_playlists,
-        COUNT(DISTINCT CASE WHEN at.track_id IS NOT NULL THEN p.playlist_id END)
+        COUNT(DISTINCT CASE WHEN art.track_id IS NOT NULL THEN p.playlist_id END)
             AS playlists_with_african_tracks
     FROM playlists p
     LEFT JOIN playlist_tracks pt ON pt.playlist_id = p.playlist_id
-    LEFT JOIN african_tracks at ON at.track_id = pt.track_id;
+    LEFT JOIN african_tracks art ON art.track_id = pt.track_id;
     """
     df = run_query(query)
     return df.iloc[0].to_dict()
@@ -396,13 +396,14 @@ def get_tracks_by_year() -> pd.DataFrame:
 
 @st.cache_data(show_spinner=True, ttl=CACHE_TTL)
 def get_african_tracks_by_year() -> pd.DataFrame:
-    query = f"""
+    query = """
     WITH african_tracks AS (
-        SELECT DISTINCT at.track_id
-        FROM artist_tracks at
-        JOIN artist_nationalities an ON an.artist_id = at.artist_id
+        SELECT DISTINCT art.track_id
+        FROM artist_tracks art
+        JOIN artist_nationalities an ON an.artist_id = art.artist_id
         JOIN nationalities n ON n.nationality_id = an.nationality_id
-        WHERE n.country_code IN ({AFRICA_CODES})
+        JOIN country_regions cr ON cr.country_code = n.country_code
+        WHERE cr.is_african = 1
     )
     SELECT YEAR(t.release_date) AS year, COUNT(*) AS african_tracks
     FROM tracks t
@@ -466,20 +467,20 @@ st.subheader("Top 20 Artists by Playlist Presence")
 @st.cache_data(show_spinner=True)
 def get_artist_popularity_top20():
     query = """
-    SELECT TOP 20
+    SELECT
       a.artist_name,
       COUNT(DISTINCT p.playlist_id) AS playlists_with_artist,
       nationality
     FROM artists a
-    LEFT JOIN artist_tracks at ON at.artist_id = a.artist_id
-    LEFT JOIN playlist_tracks pt ON pt.track_id = at.track_id
+    LEFT JOIN artist_tracks art ON art.artist_id = a.artist_id
+    LEFT JOIN playlist_tracks pt ON pt.track_id = art.track_id
     LEFT JOIN playlists p ON p.playlist_id = pt.playlist_id
     LEFT JOIN Artist_Nationalities an ON an.artist_id = a.artist_id
     LEFT JOIN Nationalities N ON N.NATIONALITY_ID = an.NATIONALITY_ID
     GROUP BY a.artist_id, a.artist_name, nationality
     ORDER BY playlists_with_artist DESC;
     """
-    return run_query(query)
+    return run_query(query).head(20)
 
 # 6.1) Artist popularity visualization
 try:
@@ -507,18 +508,15 @@ except Exception as e:
 
 @st.cache_data(show_spinner=True)
 def tracks_per_genre():
-    query ="""With african_genres as (select genre_id,genre_name from genres where genre_name in (('afrobeats'),('afropop'),('afro r&b'),('afrobeat'),('afropiano'),('afro soul'),('afroswing'),('azonto'),('alté'),('afro adura'),('ghanaian hip hop'),('amapiano'),
-('gqom'),('rap'),('french r&b'),('pop urbaine'),('asakaa'),('hiplife'),('highlife'),('gospel'),('bongo piano'),('private school piano'),('bacardi'),('3 step'),('ndombolo'),('rumba congolaise'),
-('afro house'),('bikutsi'),('gnawa'),('kizomba'),('sufi'),('tribal house'),('afro tech'),('ethiopian jazz'),('coupé décalé'),('traditional music'),('nigerian drill'),('bongo flava'),('singeli'),('gengetone'),('gospel r&b'),
-('fújì'),('rap ivoire'),('kuduro'),('african gospel'),('alternative r&b'),('maskandi'),('moroccan pop'),('raï'),('moroccan rap'),('moroccan chaabi'),('mahraganat'),('christian alternative rock'),('lo-fi'),('lo-fi beats'),('gospel'),'bongo','rumba congolaise','singeli',
-'ndombolo','hiplife'))
-select top 20 count(t.track_id) no_of_tracks,genre_name from tracks_genre tg 
-join african_genres ag on tg.genre_id=ag.genre_id 
+    query = """
+select count(t.track_id) no_of_tracks, g.genre_name from tracks_genre tg
+join genres g on g.genre_id = tg.genre_id
+join genre_families gf on gf.genre_name = g.genre_name and gf.is_african = 1
 join tracks t on t.track_id= tg.track_id
-group by genre_name
+group by g.genre_name
 order by count(t.track_id) desc;
 """
-    return run_query(query)
+    return run_query(query).head(20)
 
 # 7.1) Tracks per Genre visualization
 st.subheader("Tracks per Genre (Top 20 African Genres)")
@@ -1,15 +1,9 @@
-import pyodbc
+from db import get_connection, latency_report, load_config
 
-conn = pyodbc.connect(
-    "DRIVER={ODBC Driver 17 for SQL Server};"
-    "SERVER=masters2025.database.windows.net;"
-    "DATABASE=Spotify_db;"
-    "UID=precious;"
-    "PWD=tomboystuff2025!;"
-    "Encrypt=yes;"
-    "TrustServerCertificate=no;"
-    "Connection Timeout=30;"
-)
+# Connection settings come from the DB_* environment variables (see db.py)
+config = load_config()
+with get_connection() as conn:
+    conn.cursor().execute("SELECT 1").fetchone()
 
-print("Connected successfully")
-conn.close()
\ No newline at end of file
+print(f"Connected successfully ({config['backend']})")
+latency_report()
@@ -1,8 +1,21 @@
 from dotenv import load_dotenv
 import os
+import time
+import argparse
+import asyncio
+import threading
+from collections import Counter
+from contextlib import asynccontextmanager
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth, SpotifyClientCredentials
 import pandas as pd
+from artist_cache import get_artist_cache
+from crawl_checkpoint import CrawlCheckpoint
+from snapshot_store import SnapshotStore, diff_tracks
+from crawl_sinks import SINKS, TRACK_FIELDS, export_excel
+from rate_limit import RateLimiter
+from spotify_async import AsyncSpotify, open_session
+from spotify_stub import RecordingSpotify
 
 
 # Load environment variables
@@ -36,73 +49,262 @@ sp_public = spotipy.Spotify(
 
 print("Authentication successful")
 
+# API calls made by this process, reported at the end of a crawl
+api_calls = Counter()
+_api_calls_lock = threading.Lock()
+
+# One request budget shared by every in-flight request; it backs off on 429s
+limiter = RateLimiter(
+    rate=float(os.getenv("SPOTIFY_RATE_LIMIT", "10")),
+    max_rate=float(os.getenv("SPOTIFY_MAX_RATE_LIMIT", "30"))
+)
+
+
+async def call_api(endpoint, request):
+    with _api_calls_lock:
+        api_calls[endpoint] += 1
+    return await request
+
+
+# Set to a directory to save every API response as a replayable fixture
+RECORD_DIR = os.getenv("SPOTIFY_RECORD_DIR")
+
+
+@asynccontextmanager
+async def spotify_clients(max_connections=20):
+    """Public and user clients sharing one keep-alive connection pool and rate limit."""
+    def client(auth_manager):
+        if RECORD_DIR:
+            return RecordingSpotify(RECORD_DIR, auth_manager, session=session, limiter=limiter)
+        return AsyncSpotify(auth_manager, session=session, limiter=limiter)
+
+    async with open_session(max_connections) as session:
+        yield {
+            True: client(sp_public.auth_manager),
+            False: client(sp_user.auth_manager)
+        }
+
+
 #  get genres for artists
 
-def get_artist_genres(artist_ids):
-    if not artist_ids:
-        return "Unknown"
+async def fetch_artists_async(client, artist_ids, checkpoint=None):
+    """Return {artist_id: artist} for the given IDs, calling the API only for cache misses."""
+    cache = get_artist_cache()
+    if checkpoint is not None:
+        cache.put_many(checkpoint.artists.values())
+    missing = cache.missing(artist_ids)
+
+    async def fetch(batch):
+        artists = (await call_api("artists", client.artists(batch)))["artists"]
+        cache.put_many(artists)
+        if checkpoint is not None:
+            checkpoint.record_artists(artists)
+
+    # Spotify API allows up to 50 artists per call; the batches go out together
+    await asyncio.gather(*(
+        fetch(missing[i:i + 50]) for i in range(0, len(missing), 50)
+    ))
+
+    return cache.get_many(list(dict.fromkeys(artist_ids)))
 
-    genres = set()
-    try:
-        # Spotify API allows up to 50 artists per call
-        for i in range(0, len(artist_ids), 50):
-            batch = artist_ids[i:i + 50]
-            artists = sp_public.artists(batch)["artists"]
-            for artist in artists:
-                genres.update(artist.get("genres", []))
-    except Exception as e:
-        print(f"Error fetching genres for {artist_ids}: {e}")
 
-    return ", ".join(sorted(genres)) if genres else "Unknown"
+def fetch_artists(artist_ids, checkpoint=None):
+    async def run():
+        async with spotify_clients() as clients:
+            return await fetch_artists_async(clients[True], artist_ids, checkpoint=checkpoint)
+    return asyncio.run(run())
+
+
+def add_genres(tracks, artists):
+    """Join genres onto tracks from an {artist_id: artist} map already in memory."""
+    for track in tracks:
+        genres = set()
+        for artist_id in track["artist_ids"].split(", "):
+            genres.update(artists.get(artist_id, {}).get("genres", []))
+        track["genres"] = ", ".join(sorted(genres)) if genres else "Unknown"
+
+    return tracks
 
 
 #  get playlist tracks
 
-def get_playlist_tracks(playlist_id, is_public=False):
-    sp = sp_public if is_public else sp_user
-    all_tracks = []
+def parse_page(results, playlist_id):
+    page = []
+    for item in results["items"]:
+        track = item.get("track")
+        if not track:
+            continue
+
+        artist_ids = [a["id"] for a in track["artists"] if a.get("id")]
+
+        track_info = {
+            "track_id": track.get("id"),
+            "track_name": track.get("name"),
+            "artist_ids": ", ".join(artist_ids),
+            "artist_names": ", ".join(a["name"] for a in track["artists"]),
+            "album_id": track["album"]["id"],
+            "album_name": track["album"]["name"],
+            "release_date": track["album"]["release_date"],
+            "spotify_url": track["external_urls"]["spotify"],
+            "track_uri": track["uri"],
+            "genres": None,
+            "playlist_id": playlist_id
+        }
 
-    results = sp.playlist_items(
-        playlist_id,
-        fields="items(track(id,name,artists(id,name),album(id,name,release_date),external_urls,uri)),next",
-        additional_types=["track"],
-        market="from_token" if not is_public else None
-    )
+        page.append(track_info)
+    return page
+
+
+async def iter_playlist_pages(client, playlist_id, is_public=False, checkpoint=None):
+    """Yield one list of track dicts per playlist page, following `next` until the end.
+
+    With a checkpoint, pages already in the journal are replayed and the crawl
+    continues from the recorded cursor instead of the first page.
+    """
+    if checkpoint is not None and playlist_id in checkpoint.page_offsets:
+        for page in checkpoint.read_pages(playlist_id):
+            yield page
+        cursor = checkpoint.cursors[playlist_id]
+        if cursor is None:
+            return
+        results = await call_api("next", client.next({"next": cursor}))
+    else:
+        results = await call_api("playlist_items", client.playlist_items(
+            playlist_id,
+            fields="items(track(id,name,artists(id,name),album(id,name,release_date),external_urls,uri)),next",
+            additional_types=["track"],
+            market="from_token" if not is_public else None
+        ))
 
     while results:
-        for item in results["items"]:
-            track = item.get("track")
-            if not track:
-                continue
-
-            artist_ids = [a["id"] for a in track["artists"] if a.get("id")]
-
-            track_info = {
-                "track_id": track.get("id"),
-                "track_name": track.get("name"),
-                "artist_ids": ", ".join(artist_ids),
-                "artist_names": ", ".join(a["name"] for a in track["artists"]),
-                "album_id": track["album"]["id"],
-                "album_name": track["album"]["name"],
-                "release_date": track["album"]["release_date"],
-                "spotify_url": track["external_urls"]["spotify"],
-                "track_uri": track["uri"],
-                "genres": get_artist_genres(artist_ids),
-                "playlist_id": playlist_id
-            }
-
-            all_tracks.append(track_info)
+        page = parse_page(results, playlist_id)
+        if checkpoint is not None:
+            checkpoint.record_page(playlist_id, page, results["next"])
+
+        yield page
 
         if results["next"]:
-            results = sp.next(results)
+            results = await call_api("next", client.next(results))
         else:
             break
 
+
+async def fetch_playlist_tracks(client, playlist_id, is_public=False, checkpoint=None):
+    # Tracks come back without genres; main() enriches all playlists in one pass
+    all_tracks = []
+    async for page in iter_playlist_pages(client, playlist_id, is_public=is_public,
+                                          checkpoint=checkpoint):
+        all_tracks.extend(page)
     return all_tracks
 
+
+def get_playlist_tracks(playlist_id, is_public=False):
+    """One playlist's tracks with genres joined on, as before the crawl was split in two phases."""
+    async def run():
+        async with spotify_clients() as clients:
+            tracks = await fetch_playlist_tracks(clients[is_public], playlist_id, is_public)
+            artist_ids = sorted({a for track in tracks for a in track["artist_ids"].split(", ") if a})
+            artists = await fetch_artists_async(clients[True], artist_ids)
+            return add_genres(tracks, artists)
+    return asyncio.run(run())
+
+
+async def crawl_playlists_async(clients, playlist_ids, workers=1, checkpoint=None, sink=None):
+    """Fetch up to `workers` playlists at once and return their tracks in `playlist_ids` order.
+
+    With a sink, each page is written out as it arrives and nothing is returned.
+    """
+    slots = asyncio.Semaphore(workers)
+
+    async def fetch(name, info):
+        tracks = []
+        found = 0
+        async with slots:
+            print(f"\nFetching playlist: {name}")
+            async for page in iter_playlist_pages(
+                clients[info["is_public"]], info["id"], is_public=info["is_public"],
+                checkpoint=checkpoint
+            ):
+                for track in page:
+                    track["playlist_name"] = name
+                found += len(page)
+                if sink is not None:
+                    sink.write_page(info["id"], page)
+                else:
+                    tracks.extend(page)
+        print(f"Found {found} tracks in '{name}'")
+        return tracks
+
+    results = await asyncio.gather(*(
+        fetch(name, info) for name, info in playlist_ids.items()
+    ))
+    # gather keeps input order, so output never depends on request timing
+    return [track for tracks in results for track in tracks]
+
+
+def crawl_playlists(playlist_ids, workers=1, checkpoint=None, sink=None):
+    async def run():
+        async with spotify_clients(max_connections=max(workers, 10)) as clients:
+            return await crawl_playlists_async(clients, playlist_ids, workers=workers,
+                                               checkpoint=checkpoint, sink=sink)
+    return asyncio.run(run())
+
+
+async def check_snapshots_async(clients, playlist_ids, store, workers=1):
+    """Return {name: snapshot_id} for the playlists whose snapshot differs from the stored one."""
+    slots = asyncio.Semaphore(workers)
+
+    async def check(name, info):
+        async with slots:
+            meta = await call_api("playlist", clients[info["is_public"]].playlist(
+                info["id"], fields="snapshot_id"
+            ))
+        return name, meta["snapshot_id"]
+
+    results = await asyncio.gather(*(
+        check(name, info) for name, info in playlist_ids.items()
+    ))
+    changed = {}
+    for name, snapshot_id in results:
+        if snapshot_id == store.snapshot_id(playlist_ids[name]["id"]):
+            print(f"Unchanged since last crawl: {name}")
+        else:
+            changed[name] = snapshot_id
+    return changed
+
+
+def check_snapshots(playlist_ids, store, workers=1):
+    async def run():
+        async with spotify_clients(max_connections=max(workers, 10)) as clients:
+            return await check_snapshots_async(clients, playlist_ids, store, workers=workers)
+    return asyncio.run(run())
+
 #main function 
 
 def main():
+    parser = argparse.ArgumentParser(description="Crawl Spotify playlist tracks")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of playlists fetched concurrently")
+    parser.add_argument("--rate", type=float, default=limiter.rate,
+                        help="starting requests per second shared by all workers")
+    parser.add_argument("--max-rate", type=float, default=limiter.max_rate,
+                        help="ceiling the rate limiter may climb back up to")
+    parser.add_argument("--checkpoint", default=None,
+                        help="JSONL journal to resume an interrupted crawl from")
+    parser.add_argument("--incremental", default=None,
+                        help="snapshot store; only changed playlists are crawled and only "
+                             "added/removed tracks are exported")
+    parser.add_argument("--format", choices=["excel", *SINKS], default="excel",
+                        help="parquet/arrow stream each page to disk instead of "
+                             "building one DataFrame")
+    parser.add_argument("--output", default=None,
+                        help="Excel file, or dataset directory for parquet/arrow")
+    parser.add_argument("--excel", action="store_true",
+                        help="with parquet/arrow, also export the dataset to Excel afterwards")
+    args = parser.parse_args()
+    limiter.rate = args.rate
+    limiter.max_rate = max(args.rate, args.max_rate)
+
     playlist_ids = {
         "Popular African Songs": {
             "id": "3fgsVcazA1P9NBvYkIlhv6",
@@ -110,26 +312,113 @@ def main():
         }
     }
 
-    all_data = []
+    checkpoint = CrawlCheckpoint(args.checkpoint) if args.checkpoint else None
+    if checkpoint is not None and checkpoint.page_offsets:
+        print(f"Resuming from {args.checkpoint}: "
+              f"{sum(map(len, checkpoint.page_offsets.values()))} pages journaled")
+
+    started = time.perf_counter()
+
+    # Incremental runs pay one metadata call per playlist and skip unchanged ones
+    store = SnapshotStore(args.incremental) if args.incremental else None
+    if store is not None:
+        snapshots = check_snapshots(playlist_ids, store, workers=args.workers)
+        playlist_ids = {
+            name: info for name, info in playlist_ids.items() if name in snapshots
+        }
+
+    sink = None
+    if args.format != "excel":
+        # Incremental runs mark each exported track as added or removed
+        fields = TRACK_FIELDS if store is None else TRACK_FIELDS + ["change"]
+        sink = SINKS[args.format](args.output or "spotify_tracks_data", fields=fields)
+    # Incremental runs need every track in memory to diff, so only the delta goes to the sink
+    stream = sink if store is None else None
+
+    # Phase one: page through every playlist and collect the unique artists
+    all_data = crawl_playlists(playlist_ids, workers=args.workers,
+                               checkpoint=checkpoint, sink=stream)
+    if stream is not None:
+        artist_ids = stream.artist_ids
+    else:
+        artist_ids = {
+            a for track in all_data for a in track["artist_ids"].split(", ") if a
+        }
 
-    for name, info in playlist_ids.items():
-        print(f"\nFetching playlist: {name}")
+    crawled = time.perf_counter()
 
-        tracks = get_playlist_tracks(
-            info["id"],
-            is_public=info["is_public"]
-        )
+    # Phase two: fetch every artist in full batches of 50 and join genres in memory
+    print(f"\nEnriching {len(artist_ids)} unique artists")
+    artists = fetch_artists(sorted(artist_ids), checkpoint=checkpoint)
+    if stream is None:
+        add_genres(all_data, artists)
 
-        for track in tracks:
-            track["playlist_name"] = name
+    enriched = time.perf_counter()
 
-        all_data.extend(tracks)
-        print(f"Found {len(tracks)} tracks in '{name}'")
+    # The per-track path made one artists call for every track with artists
+    if stream is not None:
+        per_track_calls = stream.rows_with_artists
+    else:
+        per_track_calls = sum(1 for track in all_data if track["artist_ids"])
+    print(
+        f"API calls: {api_calls['playlist_items'] + api_calls['next']} playlist pages, "
+        f"{api_calls['artists']} artists (per-track enrichment would make {per_track_calls})"
+    )
+    print(
+        f"Wall time: {crawled - started:.2f}s crawl, "
+        f"{enriched - crawled:.2f}s enrichment, {enriched - started:.2f}s total"
+    )
+    print(
+        f"Rate limiter: {limiter.stats['throttled']} throttled, "
+        f"{limiter.stats['retried']} retried, final rate {limiter.rate:.1f} req/s"
+    )
 
-    # Export to Excel
-    df = pd.DataFrame(all_data)
-    df.to_excel("spotify_tracks_data_test1.xlsx", index=False)
-    print("Exported to spotify_tracks_data_test1.xlsx")
+    # Incremental runs export only what changed since the stored snapshot
+    if store is not None:
+        crawled_tracks = {info["id"]: [] for info in playlist_ids.values()}
+        for track in all_data:
+            crawled_tracks[track["playlist_id"]].append(track)
+
+        all_data = []
+        for playlist_id, tracks in crawled_tracks.items():
+            added, removed = diff_tracks(store.tracks(playlist_id), tracks)
+            all_data.extend({**track, "change": "added"} for track in added)
+            all_data.extend({**track, "change": "removed"} for track in removed)
+            print(f"Delta for {playlist_id}: {len(added)} added, {len(removed)} removed")
+
+    excel_file = "spotify_tracks_data_test1.xlsx"
+    if sink is None:
+        # Export to Excel
+        excel_file = args.output or excel_file
+        df = pd.DataFrame(all_data)
+        df.to_excel(excel_file, index=False)
+        print(f"Exported to {excel_file}")
+    else:
+        if stream is None:
+            delta = {}
+            for track in all_data:
+                delta.setdefault(track["playlist_id"], []).append(track)
+            for playlist_id, tracks in delta.items():
+                sink.write_page(playlist_id, tracks)
+        sink.write_artists(artists.values())
+        sink.close()
+        print(f"Wrote {sink.rows} tracks to {sink.directory}")
+
+        # Excel is an optional post-step over the finished dataset
+        if args.excel:
+            rows = export_excel(sink.directory, excel_file, type(sink),
+                                playlist_ids=[info["id"] for info in playlist_ids.values()])
+            print(f"Exported {rows} tracks to {excel_file}")
+
+    # The export is the durable copy now, so the next run starts a fresh crawl
+    if checkpoint is not None:
+        checkpoint.discard()
+
+    # Only move the stored snapshots forward once their delta has been exported
+    if store is not None:
+        for name, info in playlist_ids.items():
+            store.save(info["id"], snapshots[name], crawled_tracks[info["id"]])
+        store.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,124 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+# Artist metadata rarely changes between crawls, so a week is a safe default
+DEFAULT_CACHE_PATH = os.getenv("ARTIST_CACHE_PATH", ".spotify_cache/artists.sqlite")
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+
+class ArtistCache:
+    """Artist metadata keyed by Spotify artist ID.
+
+    Lookups hit an in-process dict first and fall back to a SQLite file, so
+    artists fetched by one crawl are reused by the next until they expire.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._memory = {}
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS artists (
+                artist_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._db.commit()
+
+    def get_many(self, artist_ids):
+        """Return {artist_id: artist} for every ID that is cached and fresh."""
+        found = {}
+        to_load = []
+        now = time.time()
+
+        with self._lock:
+            for artist_id in artist_ids:
+                entry = self._memory.get(artist_id)
+                if entry and now - entry[1] < self.ttl:
+                    found[artist_id] = entry[0]
+                else:
+                    to_load.append(artist_id)
+
+            # SQLite caps bound parameters, so read the disk tier in chunks
+            for i in range(0, len(to_load), 500):
+                batch = to_load[i:i + 500]
+                placeholders = ", ".join("?" * len(batch))
+                rows = self._db.execute(
+                    f"SELECT artist_id, payload, fetched_at FROM artists "
+                    f"WHERE artist_id IN ({placeholders}) AND fetched_at > ?",
+                    [*batch, now - self.ttl]
+                ).fetchall()
+                for artist_id, payload, fetched_at in rows:
+                    artist = json.loads(payload)
+                    self._memory[artist_id] = (artist, fetched_at)
+                    found[artist_id] = artist
+
+        return found
+
+    def missing(self, artist_ids):
+        """Return the unique IDs that have to be fetched from the API."""
+        unique_ids = list(dict.fromkeys(a for a in artist_ids if a))
+        cached = self.get_many(unique_ids)
+        return [a for a in unique_ids if a not in cached]
+
+    def put_many(self, artists):
+        now = time.time()
+        rows = []
+
+        with self._lock:
+            for artist in artists:
+                if not artist or not artist.get("id"):
+                    continue
+                entry = {
+                    "id": artist["id"],
+                    "name": artist.get("name"),
+                    "genres": artist.get("genres", [])
+                }
+                self._memory[artist["id"]] = (entry, now)
+                rows.append((artist["id"], json.dumps(entry), now))
+
+            self._db.executemany(
+                "INSERT OR REPLACE INTO artists (artist_id, payload, fetched_at) VALUES (?, ?, ?)",
+                rows
+            )
+            self._db.commit()
+
+    def evict_expired(self):
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            self._memory = {
+                k: v for k, v in self._memory.items() if v[1] > cutoff
+            }
+            deleted = self._db.execute(
+                "DELETE FROM artists WHERE fetched_at <= ?", (cutoff,)
+            ).rowcount
+            self._db.commit()
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_artist_cache = None
+_artist_cache_lock = threading.Lock()
+
+
+def get_artist_cache():
+    """Process-wide cache shared by every crawler in this interpreter."""
+    global _artist_cache
+    with _artist_cache_lock:
+        if _artist_cache is None:
+            _artist_cache = ArtistCache()
+            _artist_cache.evict_expired()
+        return _artist_cache
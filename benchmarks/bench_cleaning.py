@@ -0,0 +1,143 @@
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# --------------------------------------------------
+# Ensure project root is on path
+# --------------------------------------------------
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from cleaning import explode_genres, explode_nationalities, normalize_release_date
+
+
+GENRES = ["afrobeats", "Afropop", " amapiano", "highlife ", "gqom", "bongo flava", "Unknown", ""]
+NATIONALITIES = ["Nigerian", "Ghanaian", " South African", "American ", "Kenyan", ""]
+
+
+def synthetic_tracks(rows, seed=0):
+    rng = random.Random(seed)
+    dates = []
+    for _ in range(rows):
+        year = rng.randint(1960, 2025)
+        dates.append(rng.choice([
+            f"{year}", f"{year}-{rng.randint(1, 12):02d}",
+            f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", "not a date"
+        ]))
+    return pd.DataFrame({
+        "Canonical_Track_ID": [f"tr{i:07d}" for i in range(rows)],
+        "Release_Date": dates,
+        "Genre_Name": [", ".join(rng.sample(GENRES, rng.randint(1, 3))) for _ in range(rows)]
+    })
+
+
+def synthetic_nationalities(rows, seed=0):
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "Artist_Name": [f" artist {i} " for i in range(rows)],
+        "Nationality": ["/".join(rng.sample(NATIONALITIES, rng.randint(1, 2))) for _ in range(rows)]
+    })
+
+
+# The per-row implementations the loader used before cleaning.py
+
+
+def legacy_release_date(dates):
+    dates = pd.to_datetime(dates, format='%Y-%m-%d', errors='coerce').dt.date
+    dates = dates.astype(str).str.strip().replace(r'^\s*$', None, regex=True)
+
+    def normalize(val):
+        if val is None:
+            return None
+        val = str(val).strip()
+        if len(val) == 4:
+            return f"{val}-01-01"
+        elif len(val) == 7:
+            return f"{val}-01"
+        return val
+
+    parsed = pd.to_datetime(dates.apply(normalize), errors="coerce").dt.date
+    return parsed.where(pd.notnull(parsed), None)
+
+
+def legacy_genres(df, genre_col="Genre_Name", delimiter=","):
+    df = df.copy()
+    df[genre_col] = (
+        df[genre_col].astype(str).replace('nan', '')
+        .str.split(delimiter).apply(lambda x: [item.strip() for item in x if item.strip()])
+    )
+    df[genre_col] = df[genre_col].apply(lambda genres: [genre.lower() for genre in genres])
+    df = df.explode(genre_col)
+    return df[df[genre_col] != ''].reset_index(drop=True)
+
+
+def legacy_nationalities(df):
+    df = df.copy().astype(object)
+    df = df.replace(r'^\s*$', None, regex=True)
+    df = df.where(pd.notnull(df), None)
+    df["Artist_Name"] = df["Artist_Name"].str.strip().str.title()
+    # astype(str) on pandas 2 turned a missing nationality into the text 'None'; map(str) does on any version
+    df["Nationality"] = df["Nationality"].map(str)
+    df["Nationality"] = df["Nationality"].str.split("/").apply(lambda x: [item.strip() for item in x if item.strip()])
+    return df.explode("Nationality").reset_index(drop=True)
+
+
+def documented_changes(label, expected, data):
+    """The legacy output with the behaviour changes cleaning.py made on purpose."""
+    if label == "release dates":
+        # The strict first parse nulled YYYY and YYYY-MM before the padding ran; they are now padded
+        text = data.str.strip()
+        partial = text.str.fullmatch(r"\d{4}(-\d{2})?").fillna(False).astype(bool)
+        padded = pd.to_datetime(text[partial] + text[partial].str.len().map({4: "-01-01", 7: "-01"}),
+                                format="%Y-%m-%d", errors="coerce").dt.date
+        expected = expected.copy().astype(object)
+        expected[partial] = padded.where(pd.notnull(padded), None)
+    if label == "nationalities":
+        # A missing nationality is now missing, not the text 'None'; neither matches a Nationalities row
+        expected = expected.copy()
+        expected["Nationality"] = expected["Nationality"].replace("None", None)
+    return expected
+
+
+def same(left, right):
+    if isinstance(left, pd.Series):
+        left, right = left.to_frame(), right.to_frame()
+    left = left.reset_index(drop=True).astype(object).where(pd.notnull(left.reset_index(drop=True)), None)
+    right = right.reset_index(drop=True).astype(object).where(pd.notnull(right.reset_index(drop=True)), None)
+    return left.equals(right)
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized cleaning against the per-row versions")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    tracks = synthetic_tracks(args.rows)
+    nationalities = synthetic_nationalities(args.rows)
+    print(f"{args.rows} synthetic rows\n")
+
+    cases = [
+        ("release dates", legacy_release_date, normalize_release_date, tracks["Release_Date"]),
+        ("genres", legacy_genres, explode_genres, tracks),
+        ("nationalities", legacy_nationalities, explode_nationalities, nationalities)
+    ]
+    for label, legacy, vectorized, data in cases:
+        legacy_seconds, expected = timed(legacy, data)
+        vectorized_seconds, result = timed(vectorized, data)
+        print(f"{label:<16} per-row {legacy_seconds:7.2f}s  vectorized {vectorized_seconds:7.2f}s  "
+              f"{legacy_seconds / vectorized_seconds:5.1f}x  "
+              f"{'identical' if same(documented_changes(label, expected, data), result) else 'OUTPUT DIFFERS'}")
+
+
+if __name__ == "__main__":
+    main()
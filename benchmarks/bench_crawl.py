@@ -0,0 +1,150 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+# --------------------------------------------------
+# Ensure project root is on path
+# --------------------------------------------------
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+# The crawler builds its spotipy auth managers at import; the stub never checks them
+os.environ.setdefault("CLIENT_ID", "stub")
+os.environ.setdefault("CLIENT_SECRET", "stub")
+os.environ.setdefault("SPOTIPY_REDIRECT_URI", "http://127.0.0.1:8888/callback")
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import Spotify_Track_API as crawler
+import artist_cache
+from artist_cache import ArtistCache
+from playlist_sweep import sweep_keywords
+from rate_limit import RateLimiter
+from spotify_async import AsyncSpotify, open_session
+from spotify_stub import StubSpotifyServer, SyntheticLibrary
+
+
+def fresh_state(rate):
+    crawler.api_calls.clear()
+    artist_cache._artist_cache = ArtistCache(":memory:")
+    return RateLimiter(rate=rate, burst=int(rate), max_rate=rate)
+
+
+async def crawl(base_url, playlist_ids, workers, limiter):
+    async with open_session(max(workers, 10)) as session:
+        client = AsyncSpotify(token="stub", base_url=base_url, session=session, limiter=limiter)
+        clients = {True: client, False: client}
+        tracks = await crawler.crawl_playlists_async(clients, playlist_ids, workers=workers)
+        artist_ids = {a for t in tracks for a in t["artist_ids"].split(", ") if a}
+        artists = await crawler.fetch_artists_async(client, sorted(artist_ids))
+        crawler.add_genres(tracks, artists)
+        return tracks
+
+
+async def crawl_per_track(base_url, playlist_ids, limiter):
+    """The original pipeline: one playlist at a time, one artists call per track."""
+    async with open_session(10) as session:
+        client = AsyncSpotify(token="stub", base_url=base_url, session=session, limiter=limiter)
+        tracks = []
+        for info in playlist_ids.values():
+            tracks.extend(await crawler.fetch_playlist_tracks(client, info["id"], is_public=True))
+        for track in tracks:
+            artist_ids = [a for a in track["artist_ids"].split(", ") if a]
+            if artist_ids:
+                await crawler.call_api("artists", client.artists(artist_ids))
+        return tracks
+
+
+async def parse_search_page(client, keyword, limit=50, offset=0):
+    results = await client.search(q=keyword, type="playlist", limit=limit, offset=offset)
+    return [{"id": p["id"], "name": p["name"]} for p in results["playlists"]["items"] if p]
+
+
+async def search_sequential(base_url, keywords, limiter):
+    async with AsyncSpotify(token="stub", base_url=base_url, limiter=limiter) as client:
+        found = {}
+        for word in keywords:
+            for offset in range(0, 1000, 50):
+                playlists = await parse_search_page(client, word, limit=50, offset=offset)
+                if not playlists:
+                    break
+                for playlist in playlists:
+                    found.setdefault(playlist["id"], playlist)
+        return list(found.values())
+
+
+async def search_sweep(base_url, keywords, limiter):
+    async with AsyncSpotify(token="stub", base_url=base_url, limiter=limiter) as client:
+        return await sweep_keywords(client, keywords, parse_search_page)
+
+
+def report(label, started, rows, limiter):
+    calls = sum(crawler.api_calls.values()) or limiter.stats["requests"]
+    print(f"{label:<32} {time.perf_counter() - started:8.2f}s  {rows:6d} rows  "
+          f"{calls:6d} calls  {limiter.stats['throttled']:4d} throttled  "
+          f"{limiter.stats['retried']:4d} retried")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the crawlers against the local stub server")
+    parser.add_argument("--playlists", type=int, default=57)
+    parser.add_argument("--tracks", type=int, default=100, help="tracks per playlist")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per stub response")
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--rate", type=float, default=500.0, help="limiter rate for every run")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--keywords", type=int, default=20)
+    parser.add_argument("--baseline", action="store_true",
+                        help="also time the original per-track enrichment (slow)")
+    args = parser.parse_args()
+
+    library = SyntheticLibrary(playlists=args.playlists, tracks_per_playlist=args.tracks)
+    playlist_ids = {
+        f"Playlist {playlist_id}": {"id": playlist_id, "is_public": True}
+        for playlist_id in library.playlists
+    }
+    keywords = [f"keyword {i}" for i in range(args.keywords)]
+
+    with StubSpotifyServer(library=library, latency=args.latency,
+                           throttle_every=args.throttle_every, retry_after=0) as stub:
+        print(f"Stub at {stub.base_url}: {args.playlists} playlists x {args.tracks} tracks, "
+              f"{args.latency * 1000:.0f} ms latency\n")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            runs = []
+            if args.baseline:
+                limiter = fresh_state(args.rate)
+                started = time.perf_counter()
+                rows = len(asyncio.run(crawl_per_track(stub.base_url, playlist_ids, limiter)))
+                runs.append(("per-track enrichment, 1 worker", started, rows, limiter,
+                             time.perf_counter(), dict(crawler.api_calls)))
+
+            for workers in args.workers:
+                limiter = fresh_state(args.rate)
+                started = time.perf_counter()
+                rows = len(asyncio.run(crawl(stub.base_url, playlist_ids, workers, limiter)))
+                runs.append((f"two-phase, {workers} workers", started, rows, limiter,
+                             time.perf_counter(), dict(crawler.api_calls)))
+
+        for label, started, rows, limiter, finished, calls in runs:
+            print(f"{label:<32} {finished - started:8.2f}s  {rows:6d} rows  "
+                  f"{sum(calls.values()):6d} calls ({calls.get('artists', 0)} artists)  "
+                  f"{limiter.stats['throttled']:4d} throttled")
+
+        print()
+        crawler.api_calls.clear()
+        for label, search in (("search, sequential offsets", search_sequential),
+                              ("search, offset fan-out", search_sweep)):
+            limiter = fresh_state(args.rate)
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                rows = len(asyncio.run(search(stub.base_url, keywords, limiter)))
+            report(label, started, rows, limiter)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import argparse
+import json
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+# --------------------------------------------------
+# Ensure project root and dashboard are on path
+# --------------------------------------------------
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+sys.path.append(str(ROOT_DIR / "Masters_dashboard"))
+
+import db
+
+
+SHOWPLAN_NS = {"p": "http://schemas.microsoft.com/sqlserver/2004/07/showplan"}
+# Operators worth counting: scans read a whole index, seeks and lookups touch a range
+OPERATORS = ("Table Scan", "Clustered Index Scan", "Index Scan", "Index Seek", "Clustered Index Seek",
+             "Key Lookup", "RID Lookup", "Hash Match", "Sort")
+
+# The loader's natural-key probes and the dashboard's queries over base tables and views.
+# Literals stand in for parameters; the plan shape, not the value, is what is compared.
+QUERIES = {
+    "probe album": "SELECT album_id FROM albums WHERE spotify_album_id = N'0'",
+    "probe track": "SELECT track_id FROM tracks WHERE canonical_track_id = '0'",
+    "probe playlist": "SELECT playlist_id FROM playlists WHERE spotify_playlist_id = '0'",
+    "probe genre": "SELECT genre_id FROM genres WHERE genre_name = 'afrobeats'",
+    "probe nationality": "SELECT nationality_id FROM nationalities WHERE nationality = 'Nigerian'",
+    "tracks of genre": """
+        SELECT t.track_id, t.track_name
+        FROM genres g
+        JOIN tracks_genre tg ON tg.genre_id = g.genre_id
+        JOIN tracks t ON t.track_id = tg.track_id
+        WHERE g.genre_name = 'afrobeats'
+    """,
+    "playlists with african tracks": """
+        WITH african_tracks AS (
+            SELECT DISTINCT at.track_id
+            FROM artist_tracks at
+            JOIN artist_nationalities an ON an.artist_id = at.artist_id
+            JOIN nationalities n ON n.nationality_id = an.nationality_id
+            JOIN country_regions cr ON cr.country_code = n.country_code
+            WHERE cr.is_african = 1
+        )
+        SELECT COUNT(DISTINCT p.playlist_id) AS total_playlists,
+               COUNT(DISTINCT CASE WHEN at.track_id IS NOT NULL THEN p.playlist_id END) AS with_african
+        FROM playlists p
+        LEFT JOIN playlist_tracks pt ON pt.playlist_id = p.playlist_id
+        LEFT JOIN african_tracks at ON at.track_id = pt.track_id
+    """,
+    "artist popularity": """
+        SELECT TOP 20 a.artist_name, COUNT(DISTINCT pt.playlist_id) AS playlists_with_artist
+        FROM artists a
+        LEFT JOIN artist_tracks at ON at.artist_id = a.artist_id
+        LEFT JOIN playlist_tracks pt ON pt.track_id = at.track_id
+        GROUP BY a.artist_id, a.artist_name
+        ORDER BY playlists_with_artist DESC
+    """,
+    "tracks per genre": """
+        SELECT g.genre_name, COUNT(*) AS no_of_tracks
+        FROM genres g
+        JOIN tracks_genre tg ON tg.genre_id = g.genre_id
+        GROUP BY g.genre_name
+    """,
+    "vw_playlist_track_facts": "SELECT * FROM vw_playlist_track_facts",
+    "vw_playlist_genre_distribution": "SELECT * FROM vw_playlist_genre_distribution",
+    "vw_all_playlist_nationality_distribution": "SELECT * FROM vw_all_playlist_nationality_distribution",
+    "vw_all_playlist_artist_exposure": "SELECT * FROM vw_all_playlist_artist_exposure"
+}
+
+
+def estimated_plan(cursor, sql):
+    """Estimated cost and operator counts from SHOWPLAN_XML, without running the query."""
+    cursor.execute("SET SHOWPLAN_XML ON")
+    try:
+        cursor.execute(sql)
+        plan = ET.fromstring(cursor.fetchone()[0])
+    finally:
+        cursor.execute("SET SHOWPLAN_XML OFF")
+
+    statements = plan.findall(".//p:StmtSimple", SHOWPLAN_NS)
+    cost = sum(float(s.get("StatementSubTreeCost", 0)) for s in statements)
+    operators = {}
+    for op in plan.findall(".//p:RelOp", SHOWPLAN_NS):
+        name = op.get("PhysicalOp")
+        if name in OPERATORS:
+            operators[name] = operators.get(name, 0) + 1
+    return cost, operators
+
+
+def measure(conn, repeat):
+    cursor = conn.cursor()
+    results = {}
+    for name, sql in QUERIES.items():
+        cost, operators = estimated_plan(cursor, sql)
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            cursor.execute(sql).fetchall()
+            best = min(best, time.perf_counter() - started)
+        results[name] = {"cost": cost, "seconds": best, "operators": operators}
+        print(f"  {name:<42} cost {cost:10.4f}  {best * 1000:9.1f} ms  {format_operators(operators)}")
+    cursor.close()
+    return results
+
+
+def format_operators(operators):
+    return ", ".join(f"{name} x{count}" for name, count in sorted(operators.items()))
+
+
+def apply_migration(conn, path):
+    # The migration is written for SSMS/sqlcmd; GO separates batches and is not T-SQL
+    batches = re.split(r"^\s*GO\s*$", Path(path).read_text(encoding="utf-8"), flags=re.MULTILINE)
+    cursor = conn.cursor()
+    for batch in batches:
+        if batch.strip():
+            cursor.execute(batch)
+            while cursor.nextset():
+                pass
+    conn.commit()
+    cursor.close()
+
+
+def compare(before, after):
+    print(f"\n{'query':<42} {'cost before':>12} {'after':>10} {'ms before':>10} {'after':>9}  speedup")
+    for name in QUERIES:
+        if name not in before or name not in after:
+            continue
+        b, a = before[name], after[name]
+        print(f"{name:<42} {b['cost']:12.4f} {a['cost']:10.4f} {b['seconds'] * 1000:10.1f} "
+              f"{a['seconds'] * 1000:9.1f}  {b['seconds'] / a['seconds']:6.1f}x")
+        if b["operators"] != a["operators"]:
+            print(f"    plan: {format_operators(b['operators'])}  ->  {format_operators(a['operators'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Estimated plan cost, plan operators and best-of-N latency of the dashboard queries (Azure SQL)"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs per query")
+    parser.add_argument("--migration", help="apply this migration between a before and an after measurement")
+    parser.add_argument("--save", help="write the (last) measurement to this JSON file")
+    parser.add_argument("--baseline", help="compare against a measurement saved earlier with --save")
+    args = parser.parse_args()
+
+    with db.get_connection() as conn:
+        print("Before" if args.migration else "Measurement")
+        before = measure(conn, args.repeat)
+        after = None
+        if args.migration:
+            print(f"\nApplying {args.migration}")
+            apply_migration(conn, args.migration)
+            print("\nAfter")
+            after = measure(conn, args.repeat)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(after or before, indent=2), encoding="utf-8")
+    if after is not None:
+        compare(before, after)
+    elif args.baseline:
+        compare(json.loads(Path(args.baseline).read_text(encoding="utf-8")), before)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# --------------------------------------------------
+# Ensure project root is on path
+# --------------------------------------------------
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from source_cache import DATA_DIR, SOURCES, load_sources
+
+
+def timed(load, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        frames = load()
+        best = min(best, time.perf_counter() - started)
+    return best, sum(len(df) for df in frames.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time loader startup: raw Excel vs cold and warm source cache")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs for each case")
+    args = parser.parse_args()
+
+    cache_dir = Path(tempfile.mkdtemp(prefix="source-cache-"))
+    try:
+        def excel():
+            return {name: pd.read_excel(Path(args.data_dir) / filename)
+                    for name, (filename, _) in SOURCES.items()}
+
+        def cold():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            return load_sources(data_dir=args.data_dir, cache_dir=cache_dir)
+
+        def warm():
+            return load_sources(data_dir=args.data_dir, cache_dir=cache_dir)
+
+        results = [("pd.read_excel x6", *timed(excel, args.repeat)),
+                   ("cold cache (parse + write)", *timed(cold, args.repeat)),
+                   ("warm cache (Feather)", *timed(warm, args.repeat))]
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    baseline = results[0][1]
+    for label, seconds, rows in results:
+        print(f"{label:<28} {seconds:8.3f}s  {rows:7d} rows  {baseline / seconds:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+import json
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+
+
+# Rows per transaction before the loader commits; bounds log growth on large loads
+DEFAULT_BATCH_SIZE = int(os.getenv("LOAD_BATCH_SIZE", "50000"))
+# Per-table overrides as "Table=rows,Table=rows"; the large junction tables commit less often
+DEFAULT_TABLE_BATCH_SIZES = os.getenv("LOAD_TABLE_BATCH_SIZES", "Playlist_Tracks=100000,Tracks_Genre=100000")
+DEFAULT_REJECTS_PATH = os.getenv("LOAD_REJECTS_PATH", "rejected_rows.jsonl")
+
+# Azure SQL errors for a row whose primary key / unique key is already in the table
+DUPLICATE_KEY_ERRORS = {2601, 2627}
+
+
+def parse_batch_sizes(text):
+    """{table: rows} from a "Table=rows,Table=rows" setting."""
+    sizes = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        table, _, size = item.partition("=")
+        if not size.strip().isdigit():
+            raise ValueError(f"Expected Table=rows in the table batch sizes, got {item!r}")
+        sizes[table.strip()] = int(size)
+    return sizes
+
+
+def to_rows(df, columns):
+    """DataFrame columns as a list of parameter tuples, with NaN/NaT sent as NULL."""
+    values = df[columns].astype(object)
+    values = values.where(pd.notnull(values), None)
+    return list(values.itertuples(index=False, name=None))
+
+
+class CommitPolicy:
+    """How many rows go into one transaction, overall and per table.
+
+    The loader commits whenever a table has written `batch_size` rows since
+    the last commit, and at the end of every table, so a failed load keeps
+    every batch finished before it.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, table_batch_sizes=None):
+        if table_batch_sizes is None:
+            table_batch_sizes = parse_batch_sizes(DEFAULT_TABLE_BATCH_SIZES)
+        self.batch_size = batch_size
+        self.table_batch_sizes = {
+            self._name(table): size for table, size in table_batch_sizes.items()
+        }
+
+    @staticmethod
+    def _name(table):
+        return table.split('.')[-1].lower()
+
+    def batch_size_for(self, table):
+        return self.table_batch_sizes.get(self._name(table), self.batch_size)
+
+
+class RejectedRows:
+    """Append-only JSONL file of rows the database refused, with the error for each.
+
+    One sink can be shared by loaders running on different threads.
+    """
+
+    def __init__(self, path=DEFAULT_REJECTS_PATH):
+        self.path = path
+        self.counts = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+    def write(self, table, columns, row, error):
+        entry = {"table": table, "row": dict(zip(columns, row)), "error": str(error)}
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(entry, default=str) + "\n")
+            self.counts[table] = self.counts.get(table, 0) + 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class BulkLoader:
+    """Set-based INSERTs through pyodbc's fast_executemany, in chunks.
+
+    Each chunk is one round trip inside a savepoint named after its table.
+    If a chunk fails (e.g. a duplicate key) it is rolled back to the
+    savepoint and its rows retried one by one, so only the bad rows are
+    skipped. A row whose key is already in the table counts as already
+    present; any other failure goes to the rejected-rows file instead of
+    the console.
+    Transactions are committed per `CommitPolicy`, and rows, rejects,
+    commits and time are recorded per table. With a `DeltaTracker`, upserts
+    and keyed inserts send only rows that are new or changed since the last
+    load.
+    """
+
+    def __init__(self, conn, chunk_size=1000, policy=None, rejects=None, delta=None):
+        self.conn = conn
+        self.chunk_size = chunk_size
+        self.policy = policy or CommitPolicy()
+        self.rejects = rejects or RejectedRows()
+        self.delta = delta
+        self.cursor = self._open_cursor(conn)
+        self.stats = {}
+        self._in_transaction = False
+        self._uncommitted = 0
+
+    def _open_cursor(self, conn):
+        # Transactions are opened and committed explicitly so savepoints are available
+        conn.autocommit = True
+        cursor = conn.cursor()
+        cursor.fast_executemany = True
+        return cursor
+
+    def _target(self, table):
+        """The table `table` is written to; stats, rejects and delta hashes keep the given name."""
+        return table
+
+    def _table_stats(self, table):
+        return self.stats.setdefault(table, new_stats())
+
+    def _begin(self):
+        if not self._in_transaction:
+            self.cursor.execute("BEGIN TRANSACTION")
+            self._in_transaction = True
+
+    def commit(self, table=None):
+        if self._in_transaction:
+            self.cursor.execute("COMMIT TRANSACTION")
+            self._in_transaction = False
+            if table is not None:
+                self._table_stats(table)["commits"] += 1
+        self._uncommitted = 0
+
+    def rollback(self):
+        """Discard everything written since the last commit."""
+        if self._in_transaction:
+            self.cursor.execute("IF @@TRANCOUNT > 0 ROLLBACK TRANSACTION")
+            self._in_transaction = False
+        self._uncommitted = 0
+
+    def _savepoint(self, table):
+        # Savepoint names are identifiers of at most 32 characters
+        name = "sp_" + "".join(c for c in table.split('.')[-1] if c.isalnum())[:29]
+        self.cursor.execute(f"SAVE TRANSACTION {name}")
+        return name
+
+    def _rollback_to(self, savepoint):
+        try:
+            self.cursor.execute(f"ROLLBACK TRANSACTION {savepoint}")
+        except Exception:
+            # The error doomed the whole transaction; everything since the last commit is lost
+            self.cursor.execute("IF @@TRANCOUNT > 0 ROLLBACK TRANSACTION")
+            self._in_transaction = False
+            raise
+
+    def _is_duplicate_key(self, error):
+        codes = re.findall(r"\((\d+)\)", " ".join(str(a) for a in getattr(error, "args", ())))
+        return any(int(code) in DUPLICATE_KEY_ERRORS for code in codes)
+
+    def _written(self, table, count):
+        self._uncommitted += count
+        if self._uncommitted >= self.policy.batch_size_for(table):
+            self.commit(table)
+
+    def insert(self, table, columns, rows, delta_key=None):
+        """INSERT rows in chunks; `delta_key` names the row's natural key for delta loads."""
+        hashes = None
+        if self.delta is not None and delta_key is not None:
+            rows, hashes = self.delta.changed(self.cursor, table, rows, delta_key, columns)
+
+        stats = self._table_stats(table)
+        started = time.perf_counter()
+        rejected, present = self._write_rows(table, columns, rows)
+
+        self.commit(table)
+        if hashes is not None:
+            positions = pd.Series(range(len(hashes)))
+            # Rows already in the table are loaded as far as the delta goes; rejected rows are
+            # not recorded, so the next delta load tries them again
+            recorded = ~positions.isin(rejected).to_numpy()
+            self.delta.record(self, table, hashes[recorded])
+            self.delta.loaded[table] = rows[recorded & ~positions.isin(present).to_numpy()]
+        stats["seconds"] += time.perf_counter() - started
+        print(f"{table}: {stats['rows']} rows inserted, {stats['present']} already present, "
+              f"{stats['errors']} rejected")
+        return stats["rows"]
+
+    def _write_rows(self, table, columns, rows):
+        """Write `rows` chunk by chunk.
+
+        Returns the positions of the rows that were rejected and of those
+        whose key was already in the table.
+        """
+        if isinstance(rows, pd.DataFrame):
+            rows = to_rows(rows, columns)
+
+        sql = f"INSERT INTO {self._target(table)} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+        stats = self._table_stats(table)
+        rejected = []
+        present = []
+
+        for i in range(0, len(rows), self.chunk_size):
+            chunk = rows[i:i + self.chunk_size]
+            self._begin()
+            savepoint = self._savepoint(table)
+            try:
+                self.cursor.executemany(sql, chunk)
+                stats["rows"] += len(chunk)
+                self._written(table, len(chunk))
+                continue
+            except Exception:
+                # Part of the chunk may already be in; start the retry from a clean slate
+                self._rollback_to(savepoint)
+
+            inserted = 0
+            for position, row in enumerate(chunk, start=i):
+                savepoint = self._savepoint(table)
+                try:
+                    self.cursor.execute(sql, row)
+                    inserted += 1
+                except Exception as e:
+                    self._rollback_to(savepoint)
+                    if self._is_duplicate_key(e):
+                        stats["present"] += 1
+                        present.append(position)
+                        continue
+                    stats["errors"] += 1
+                    rejected.append(position)
+                    self.rejects.write(table, columns, row, e)
+            stats["rows"] += inserted
+            self._written(table, inserted)
+        return rejected, present
+
+    def upsert(self, table, key_column, columns, rows, id_column):
+        """MERGE rows into `table` on `key_column` and return the key -> ID mapping.
+
+        Rows are deduplicated on the key, bulk inserted into a session temp
+        table and merged in one statement: new keys are inserted, existing ones
+        have their other columns updated. OUTPUT returns the surrogate ID of
+        every merged row, so the round trips do not grow with the row count and
+        running the load again changes nothing. In a delta load only new and
+        changed rows are merged, and only their IDs are returned.
+        """
+        hashes = None
+        if isinstance(rows, pd.DataFrame):
+            # A NULL key never matches, so it would be inserted again on every run
+            rows = rows[rows[key_column].notna()].drop_duplicates(subset=[key_column], keep='first')
+            if self.delta is not None:
+                rows, hashes = self.delta.changed(self.cursor, table, rows, [key_column], columns)
+                changed = rows
+            rows = to_rows(rows, columns)
+
+        staging = f"#{table.split('.')[-1]}_Staging"
+        column_list = ', '.join(columns)
+        updates = ', '.join(f"target.{c} = source.{c}" for c in columns if c != key_column)
+
+        self.cursor.execute(f"IF OBJECT_ID('tempdb..{staging}') IS NOT NULL DROP TABLE {staging}")
+        # Copy the target's column types without its rows or IDENTITY
+        self.cursor.execute(f"SELECT TOP 0 {column_list} INTO {staging} FROM {table}")
+        self.insert(staging, columns, rows)
+
+        stats = self._table_stats(table)
+        started = time.perf_counter()
+        self._begin()
+        self.cursor.execute(f"""
+            MERGE {table} AS target
+            USING {staging} AS source
+            ON target.{key_column} = source.{key_column}
+            WHEN MATCHED THEN UPDATE SET {updates or f"target.{key_column} = source.{key_column}"}
+            WHEN NOT MATCHED THEN INSERT ({column_list})
+                VALUES ({', '.join(f"source.{c}" for c in columns)})
+            OUTPUT $action, inserted.{id_column}, inserted.{key_column};
+        """)
+        mapping = pd.DataFrame.from_records(
+            [tuple(row) for row in self.cursor.fetchall()], columns=['Action', id_column, key_column]
+        )
+        self.commit(table)
+        self.cursor.execute(f"DROP TABLE {staging}")
+        if hashes is not None:
+            self.delta.record(self, table, hashes)
+            self.delta.loaded[table] = changed
+        stats["rows"] += len(mapping)
+        stats["seconds"] += time.perf_counter() - started
+
+        inserted = (mapping['Action'] == 'INSERT').sum()
+        print(f"{table}: {inserted} rows inserted, {len(mapping) - inserted} already present")
+        return mapping.drop(columns=['Action'])
+
+    def close(self, commit=True):
+        """Commit whatever is still open, or roll it back after a failure, and close the rejected-rows file."""
+        if commit:
+            self.commit()
+        else:
+            self.rollback()
+        self.rejects.close()
+
+    def report(self):
+        print_report(self.stats, self.rejects)
+
+
+def new_stats():
+    return {"rows": 0, "present": 0, "errors": 0, "commits": 0, "seconds": 0.0}
+
+
+def merge_stats(total, stats_by_table):
+    """Add one loader's per-table stats into `total`; several stages may write the same table."""
+    for table, stats in stats_by_table.items():
+        merged = total.setdefault(table, new_stats())
+        for name, value in stats.items():
+            merged[name] += value
+    return total
+
+
+def print_report(stats_by_table, rejects=None):
+    """Print rows, rows already present, rejects, commits and throughput per table for one or more loaders."""
+    print("\nLoad throughput")
+    for table, stats in stats_by_table.items():
+        rate = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+        print(f"  {table:<28} {stats['rows']:>8} rows  {stats['present']:>6} present  "
+              f"{stats['errors']:>5} rejected  {stats['commits']:>4} commits  "
+              f"{stats['seconds']:8.2f}s  {rate:10.0f} rows/s")
+    if rejects is not None and rejects.counts:
+        print(f"Rejected rows written to {rejects.path}")
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+
+# The crawler joins genres with ", "; splitting on "," and stripping also copes with hand edits
+GENRE_DELIMITER = ","
+
+
+def blank_to_none(df):
+    """Replace empty/whitespace strings and NaNs with None."""
+    df = df.replace(r'^\s*$', None, regex=True)
+    return df.astype(object).where(pd.notnull(df), None)
+
+
+def normalize_release_date(dates):
+    """Release dates as `datetime.date`, padding year/month precision to the first day.
+
+    Spotify sends YYYY, YYYY-MM or YYYY-MM-DD, and Excel may append a time;
+    pandas' ISO 8601 parser reads all of them in one pass. Anything else
+    becomes None. The result keeps the input's index and name.
+
+    The original loader parsed strictly as YYYY-MM-DD before padding, so
+    its padding never ran and year or month precision dates were loaded
+    as NULL; they now load as the first day of the year or month.
+    """
+    parsed = pd.to_datetime(dates.astype("string").str.strip(), format="ISO8601", errors="coerce")
+    return parsed.dt.date.astype(object).where(parsed.notna(), None)
+
+
+def add_is_single_flag(df):
+    df = df.copy()
+    df["Is_Single"] = (
+        df["Track_Name"].str.strip().str.lower()
+        == df["Album_Name"].str.strip().str.lower()
+    )
+    return df
+
+
+def split_explode(df, column, delimiter):
+    """One row per delimited item in `column`, items stripped and blanks dropped.
+
+    Rows with no items at all are kept once with a missing value, as
+    `DataFrame.explode` does for an empty list.
+    """
+    df = df.reset_index(drop=True)
+    items = (
+        df[column].astype("string").str.split(delimiter, regex=False)
+        .explode().str.strip()
+        .replace("", pd.NA)
+    )
+    has_items = items.notna().groupby(level=0).transform("any")
+    keep = items.notna() | (~has_items & ~items.index.duplicated())
+    items = items[keep]
+
+    out = df.loc[items.index].copy()
+    out[column] = items.astype(object).where(items.notna(), np.nan).to_numpy()
+    return out.reset_index(drop=True)
+
+
+def explode_genres(df, genre_col="Genre_Name", delimiter=GENRE_DELIMITER):
+    """One row per lower-cased genre of each track.
+
+    This is the only genre tokenizer: the Genres dimension is the distinct
+    values of its output and Tracks_Genre is its rows, so every genre a
+    track is linked to is guaranteed to exist.
+    """
+    if genre_col not in df.columns:
+        raise KeyError(f"The specified genre column '{genre_col}' was not found in the input DataFrame.")
+    df = split_explode(df, genre_col, delimiter)
+    df[genre_col] = df[genre_col].str.lower()
+    print(f"Final number of rows (exploded genres): {len(df)}")
+    return df
+
+
+def explode_nationalities(df, delimiter="/"):
+    """One row per nationality of each artist, with artist names stripped and title-cased."""
+    df = blank_to_none(df)
+    df["Artist_Name"] = df["Artist_Name"].str.strip().str.title()
+    df = split_explode(df, "Nationality", delimiter)
+    print(f"Number of rows after exploding nationalities: {len(df)}")
+    return df
@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+
+
+class CrawlCheckpoint:
+    """Append-only JSONL journal of a crawl, so a restarted run resumes where it stopped.
+
+    Each finished playlist page is written with the `next` URL that follows it,
+    and each batch of enriched artists is written as it arrives. Replaying the
+    journal gives back the cursor to continue each playlist from; only the
+    journal offsets of its completed pages stay in memory, and `read_pages`
+    reads the tracks back from disk when they are needed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.page_offsets = {}   # playlist_id -> journal offsets of page 0, page 1, ...
+        self.cursors = {}        # playlist_id -> `next` URL after the last recorded page
+        self.artists = {}        # artist_id -> artist
+        self._size = 0
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            self._replay()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "ab")
+
+    def _replay(self):
+        with open(self.path, "rb") as f:
+            for line in iter(f.readline, b""):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A half-written last line from a killed process; its page is re-fetched
+                    break
+                self._index(entry, self._size)
+                self._size += len(line)
+
+        # Drop the partial line so new entries start on a clean one
+        with open(self.path, "rb+") as f:
+            f.truncate(self._size)
+
+    def _index(self, entry, offset):
+        if entry["kind"] == "page":
+            self.page_offsets.setdefault(entry["playlist_id"], []).append(offset)
+            self.cursors[entry["playlist_id"]] = entry["next"]
+        elif entry["kind"] == "artists":
+            for artist in entry["artists"]:
+                self.artists[artist["id"]] = artist
+
+    def _append(self, entry):
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._index(entry, self._size)
+            self._size += len(line)
+
+    def read_pages(self, playlist_id):
+        """Yield the tracks of each journaled page of `playlist_id`, in crawl order."""
+        with self._lock:
+            offsets = list(self.page_offsets.get(playlist_id, []))
+        with open(self.path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield json.loads(f.readline())["tracks"]
+
+    def record_page(self, playlist_id, tracks, next_url):
+        self._append({"kind": "page", "playlist_id": playlist_id, "tracks": tracks, "next": next_url})
+
+    def record_artists(self, artists):
+        artists = [a for a in artists if a and a.get("id")]
+        self._append({"kind": "artists", "artists": artists})
+
+    def close(self):
+        self._file.close()
+
+    def discard(self):
+        """Remove the journal once its crawl has been exported."""
+        self.close()
+        os.remove(self.path)
@@ -0,0 +1,156 @@
+import os
+from abc import ABC, abstractmethod
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+
+# The fields parse_page gives every crawled track plus the playlist name the crawl adds,
+# in the workbook's column order
+TRACK_FIELDS = ["track_id", "track_name", "artist_ids", "artist_names", "album_id", "album_name",
+                "release_date", "spotify_url", "track_uri", "genres", "playlist_id", "playlist_name"]
+
+
+class TrackSink(ABC):
+    """Writes crawled tracks page by page so the crawl never holds them all in memory.
+
+    Tracks are partitioned by playlist (`playlist_id=<id>/`), one file per
+    playlist with one row group / record batch per page, so row order within
+    a playlist is preserved however many playlists are crawled at once.
+    Every partition has the same schema, one text column per name in
+    `fields`; a track with any other field is refused rather than written
+    without it. Artist metadata goes to a separate `artists` file written
+    after enrichment.
+    """
+
+    extension = None
+
+    def __init__(self, directory, fields=TRACK_FIELDS):
+        self.directory = directory
+        self.artist_ids = set()
+        self.rows = 0
+        self.rows_with_artists = 0
+        self._writers = {}
+        self._schema = pa.schema([(field, pa.string()) for field in fields])
+        os.makedirs(directory, exist_ok=True)
+
+    def write_page(self, playlist_id, tracks):
+        if not tracks:
+            return
+        unknown = set().union(*tracks) - set(self._schema.names)
+        if unknown:
+            raise ValueError(f"Tracks of playlist {playlist_id} have fields the sink has no column for: "
+                             f"{', '.join(sorted(unknown))}")
+        for track in tracks:
+            artist_ids = [a for a in track["artist_ids"].split(", ") if a]
+            self.artist_ids.update(artist_ids)
+            self.rows_with_artists += bool(artist_ids)
+        self.rows += len(tracks)
+
+        table = pa.Table.from_pylist(tracks, schema=self._schema)
+
+        writer = self._writers.get(playlist_id)
+        if writer is None:
+            partition = os.path.join(self.directory, f"playlist_id={playlist_id}")
+            os.makedirs(partition, exist_ok=True)
+            writer = self._open(os.path.join(partition, f"part-0.{self.extension}"), self._schema)
+            self._writers[playlist_id] = writer
+        writer.write_table(table)
+
+    def write_artists(self, artists):
+        table = pa.Table.from_pylist([
+            {
+                "artist_id": artist["id"],
+                "artist_name": artist.get("name"),
+                "genres": ", ".join(sorted(artist.get("genres", [])))
+            }
+            for artist in artists
+        ], schema=pa.schema([
+            ("artist_id", pa.string()),
+            ("artist_name", pa.string()),
+            ("genres", pa.string())
+        ]))
+        writer = self._open(os.path.join(self.directory, f"artists.{self.extension}"), table.schema)
+        writer.write_table(table)
+        writer.close()
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+    @abstractmethod
+    def _open(self, path, schema):
+        """A writer for one file of `schema` with `write_table` and `close`."""
+
+    @classmethod
+    @abstractmethod
+    def read(cls, path):
+        """The pyarrow Table in the file at `path`."""
+
+
+class ParquetSink(TrackSink):
+    extension = "parquet"
+
+    def _open(self, path, schema):
+        return pq.ParquetWriter(path, schema)
+
+    @classmethod
+    def read(cls, path):
+        return pq.read_table(path)
+
+
+class ArrowSink(TrackSink):
+    extension = "arrow"
+
+    def _open(self, path, schema):
+        return ipc.new_file(path, schema)
+
+    @classmethod
+    def read(cls, path):
+        with pa.memory_map(path) as source:
+            return ipc.open_file(source).read_all()
+
+
+SINKS = {"parquet": ParquetSink, "arrow": ArrowSink}
+
+
+def export_excel(directory, excel_file, sink_class=ParquetSink, playlist_ids=None):
+    """Join genres onto a sink's tracks and write them to one Excel workbook.
+
+    `playlist_ids` sets the sheet's playlist order; by default partitions are
+    read in name order.
+    """
+    if playlist_ids is None:
+        playlist_ids = sorted(
+            name.split("=", 1)[1] for name in os.listdir(directory)
+            if name.startswith("playlist_id=")
+        )
+
+    artists_path = os.path.join(directory, f"artists.{sink_class.extension}")
+    genres = {}
+    if os.path.exists(artists_path):
+        for artist in sink_class.read(artists_path).to_pylist():
+            genres[artist["artist_id"]] = [g for g in artist["genres"].split(", ") if g]
+
+    frames = []
+    for playlist_id in playlist_ids:
+        path = os.path.join(directory, f"playlist_id={playlist_id}", f"part-0.{sink_class.extension}")
+        if os.path.exists(path):
+            frames.append(sink_class.read(path).to_pandas())
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    if "genres" in df.columns:
+        def track_genres(artist_ids):
+            found = set()
+            for artist_id in artist_ids.split(", "):
+                found.update(genres.get(artist_id, []))
+            return ", ".join(sorted(found)) if found else "Unknown"
+
+        missing = df["genres"].isna()
+        df.loc[missing, "genres"] = df.loc[missing, "artist_ids"].map(track_genres)
+
+    df.to_excel(excel_file, index=False)
+    return len(df)
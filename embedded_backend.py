@@ -0,0 +1,258 @@
+import re
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from bulk_loader import BulkLoader
+from load_delta import DeltaTracker
+
+
+SCHEMA_PATH = Path(__file__).resolve().parent / "Database schema and views (DuckDB).sql"
+# Tables the Azure SQL load writes under another name
+TABLE_NAMES = {"##Artist_Nationalities": "Artist_Nationalities_Staging"}
+# Upsert keys declared COLLATE NOCASE in the DuckDB schema
+NOCASE_KEYS = {"Artist_Name", "Country_Name", "Genre_Name"}
+
+
+def ensure_schema(conn):
+    """Create whatever is missing of the embedded schema, its lookups and its views."""
+    cursor = conn.cursor()
+    cursor.execute(SCHEMA_PATH.read_text(encoding="utf-8"))
+    cursor.close()
+
+
+class EmbeddedLoader(BulkLoader):
+    """`BulkLoader` for a DuckDB file: same stats, rejects, delta and commit policy.
+
+    A DataFrame is inserted with one INSERT ... SELECT straight from the
+    frame instead of parameter batches. DuckDB has no savepoints, so when
+    that statement fails each chunk (and each row of a failing chunk) gets
+    a transaction of its own, and only the bad rows are rejected as before.
+    """
+
+    def _open_cursor(self, conn):
+        return conn.cursor()
+
+    def _target(self, table):
+        # There is no dbo schema; every table lives in the file's default schema
+        return TABLE_NAMES.get(table, table.split('.')[-1])
+
+    def _savepoint(self, table):
+        self.commit()
+        self._begin()
+
+    def rollback(self):
+        if self._in_transaction:
+            self.cursor.execute("ROLLBACK")
+            self._in_transaction = False
+        self._uncommitted = 0
+
+    def _rollback_to(self, savepoint):
+        self.rollback()
+        self._begin()
+
+    def _is_duplicate_key(self, error):
+        # A UNIQUE constraint says "Duplicate key", a unique index may say "duplicate key"
+        return "duplicate key" in str(error).lower()
+
+    def _write_rows(self, table, columns, rows):
+        if not isinstance(rows, pd.DataFrame) or rows.empty:
+            return super()._write_rows(table, columns, rows)
+
+        column_list = ', '.join(columns)
+        self.commit()
+        self._begin()
+        self.cursor.register("insert_source", rows[columns])
+        try:
+            self.cursor.execute(
+                f"INSERT INTO {self._target(table)} ({column_list}) SELECT {column_list} FROM insert_source"
+            )
+            self.commit(table)
+            self._table_stats(table)["rows"] += len(rows)
+            return [], []
+        except Exception as e:
+            self._rollback_to(None)
+            print(f"{table}: set-based insert failed ({e}); retrying in chunks")
+        finally:
+            self.cursor.unregister("insert_source")
+        return super()._write_rows(table, columns, rows)
+
+    def upsert(self, table, key_column, columns, rows, id_column):
+        """Same contract as `BulkLoader.upsert`, as an UPDATE ... FROM and an INSERT ... SELECT."""
+        # A NULL key never matches, so it would be inserted again on every run
+        rows = rows[rows[key_column].notna()]
+        # Names compare without case, so keys that differ only in case are one row
+        dedupe_key = rows[key_column].str.casefold() if key_column in NOCASE_KEYS else rows[key_column]
+        rows = rows[~dedupe_key.duplicated(keep='first')]
+        hashes = None
+        if self.delta is not None:
+            rows, hashes = self.delta.changed(self.cursor, table, rows, [key_column], columns)
+
+        target = self._target(table)
+        column_list = ', '.join(columns)
+        updates = ', '.join(f"{c} = s.{c}" for c in columns if c != key_column)
+
+        stats = self._table_stats(table)
+        started = time.perf_counter()
+        self.commit()
+        self._begin()
+        self.cursor.register("upsert_source", rows[columns])
+        try:
+            if updates:
+                self.cursor.execute(
+                    f"UPDATE {target} SET {updates} FROM upsert_source AS s WHERE {target}.{key_column} = s.{key_column}"
+                )
+            self.cursor.execute(f"""
+                INSERT INTO {target} ({column_list})
+                SELECT {column_list} FROM upsert_source AS s
+                WHERE NOT EXISTS (SELECT 1 FROM {target} AS t WHERE t.{key_column} = s.{key_column})
+            """)
+            inserted = self.cursor.fetchone()[0]
+            self.cursor.execute(f"""
+                SELECT t.{id_column}, t.{key_column}
+                FROM {target} AS t JOIN upsert_source AS s ON t.{key_column} = s.{key_column}
+            """)
+            mapping = pd.DataFrame.from_records(
+                [tuple(row) for row in self.cursor.fetchall()], columns=[id_column, key_column]
+            )
+            self.commit(table)
+        except Exception:
+            self.cursor.execute("ROLLBACK")
+            self._in_transaction = False
+            raise
+        finally:
+            self.cursor.unregister("upsert_source")
+        if hashes is not None:
+            self.delta.record(self, table, hashes)
+            self.delta.loaded[table] = rows
+        stats["rows"] += len(mapping)
+        stats["seconds"] += time.perf_counter() - started
+
+        print(f"{table}: {inserted} rows inserted, {len(mapping) - inserted} already present")
+        return mapping
+
+
+class EmbeddedDeltaTracker(DeltaTracker):
+    """`DeltaTracker` whose `Load_Hashes` table lives in the DuckDB file."""
+
+    def ensure_table(self, conn):
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                Table_Name  VARCHAR     NOT NULL,
+                Natural_Key VARCHAR     NOT NULL,
+                Row_Hash    BIGINT      NOT NULL,
+                Loaded_At   TIMESTAMPTZ NOT NULL,
+                PRIMARY KEY (Table_Name, Natural_Key)
+            )
+        """)
+        cursor.close()
+
+    def record(self, loader, table, hashes):
+        if hashes.empty:
+            return
+        started = time.perf_counter()
+        loader.commit()
+        loader._begin()
+        loader.cursor.register("hash_source", hashes.drop_duplicates("Natural_Key"))
+        try:
+            loader.cursor.execute(f"""
+                INSERT OR REPLACE INTO {self.TABLE} (Table_Name, Natural_Key, Row_Hash, Loaded_At)
+                SELECT ?, Natural_Key, Row_Hash, now() FROM hash_source
+            """, table)
+            loader.commit(table)
+        finally:
+            loader.cursor.unregister("hash_source")
+        loader._table_stats(self.TABLE)["seconds"] += time.perf_counter() - started
+
+
+def resolve_artist_nationalities(loader):
+    """Turn the staged (artist name, nationality) pairs into Artist_Nationalities rows.
+
+    The embedded counterpart of step 8.2 of the Azure SQL schema; the staging
+    table is emptied afterwards, as the loader empties the global temp table.
+    """
+    loader.commit()
+    loader._begin()
+    loader.cursor.execute("""
+        INSERT OR IGNORE INTO Artist_Nationalities (Artist_ID, Nationality_ID)
+        SELECT DISTINCT a.Artist_ID, n.Nationality_ID
+        FROM Artist_Nationalities_Staging s
+        JOIN Artists a ON s.Artist_Name = a.Artist_Name
+        JOIN Nationalities n ON s.Nationality = n.Nationality
+    """)
+    loader.cursor.execute("DELETE FROM Artist_Nationalities_Staging")
+    loader.commit("Artist_Nationalities")
+
+
+FACT_TABLES = ["Playlist_Track_Facts", "Playlist_Nationality_Summary", "Playlist_Genre_Summary",
+               "Playlist_Artist_Summary"]
+
+AZURE_SCHEMA_PATH = Path(__file__).resolve().parent / "Database schema and views.sql"
+# What sp_refresh_playlist_track_facts says in T-SQL and DuckDB says otherwise
+TSQL_TO_DUCKDB = {"#affected": "affected", "AS FLOAT)": "AS DOUBLE)"}
+
+
+def refresh_statements(path=AZURE_SCHEMA_PATH):
+    """The fact and summary INSERTs of sp_refresh_playlist_track_facts, in DuckDB's dialect.
+
+    They are read from the Azure SQL schema, so both databases rebuild the
+    facts from one definition.
+    """
+    text = Path(path).read_text(encoding="utf-8")
+    body = text[text.index("CREATE OR ALTER PROCEDURE sp_refresh_playlist_track_facts"):]
+    body = body[:body.index("COMMIT TRANSACTION;")]
+    statements = re.findall(r"^\s*(INSERT INTO Playlist_\w+ \(.*?);", body, re.DOTALL | re.MULTILINE)
+    for tsql, duckdb in TSQL_TO_DUCKDB.items():
+        statements = [statement.replace(tsql, duckdb) for statement in statements]
+    return statements
+
+
+REFRESH_STATEMENTS = refresh_statements()
+
+
+def _id_list(ids):
+    return sorted(int(i) for i in ids or [])
+
+
+def refresh_playlist_track_facts(loader, playlist_ids=None, track_ids=None, artist_ids=None):
+    """The embedded counterpart of sp_refresh_playlist_track_facts, with the same arguments.
+
+    Rebuilds the facts and summaries of the given playlists, plus every
+    playlist holding one of the given tracks or a track by one of the given
+    artists, in one transaction. With no IDs at all, everything is rebuilt.
+    """
+    full = playlist_ids is None and track_ids is None and artist_ids is None
+    loader.commit()
+    loader._begin()
+    try:
+        if full:
+            loader.cursor.execute("CREATE OR REPLACE TEMP TABLE affected AS SELECT playlist_id FROM playlists")
+        else:
+            loader.cursor.execute("""
+                CREATE OR REPLACE TEMP TABLE affected AS
+                SELECT UNNEST(?::INTEGER[]) AS playlist_id
+                UNION
+                SELECT pt.playlist_id FROM playlist_tracks pt
+                WHERE pt.track_id IN (SELECT UNNEST(?::INTEGER[]))
+                UNION
+                SELECT pt.playlist_id FROM playlist_tracks pt
+                JOIN artist_tracks art ON art.track_id = pt.track_id
+                WHERE art.artist_id IN (SELECT UNNEST(?::INTEGER[]))
+            """, _id_list(playlist_ids), _id_list(track_ids), _id_list(artist_ids))
+
+        for table in FACT_TABLES:
+            loader.cursor.execute(
+                f"DELETE FROM {table}" if full
+                else f"DELETE FROM {table} WHERE playlist_id IN (SELECT playlist_id FROM affected)"
+            )
+        for statement in REFRESH_STATEMENTS:
+            loader.cursor.execute(statement)
+        loader.commit("Playlist_Track_Facts")
+    except Exception:
+        loader.cursor.execute("ROLLBACK")
+        loader._in_transaction = False
+        raise
+    finally:
+        loader.cursor.execute("DROP TABLE IF EXISTS affected")
@@ -0,0 +1,58 @@
+import threading
+
+import pandas as pd
+
+
+class KeyResolver:
+    """Natural key -> surrogate key lookups, each read from the database at most once per run.
+
+    Maps are either registered up front and fetched on first use, or added
+    directly from an upsert's OUTPUT rows. They are kept as dicts, so
+    resolving a junction table is a hashed lookup per row rather than a
+    merge against a freshly read table. Maps are shared by every load stage,
+    so loading one is guarded by a lock.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._sources = {}
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, table, natural_key, surrogate_key):
+        self._sources[name] = (table, natural_key, surrogate_key)
+
+    def add(self, name, mapping, natural_key, surrogate_key, complete=True):
+        """Merge rows that already carry both keys (e.g. MERGE ... OUTPUT) into a map.
+
+        With `complete=False` the rows are only a subset of the table (a delta
+        load), so they extend a map that is already loaded and otherwise the
+        map is still read from the database on first use.
+        """
+        with self._lock:
+            if not complete and name not in self._maps:
+                return
+            lookup = self._maps.setdefault(name, {})
+            lookup.update(zip(mapping[natural_key], mapping[surrogate_key].astype(int)))
+
+    def lookup(self, name):
+        with self._lock:
+            if name not in self._maps:
+                table, natural_key, surrogate_key = self._sources[name]
+                df = pd.read_sql(f"SELECT {natural_key}, {surrogate_key} FROM {table}", self.conn)
+                self._maps[name] = dict(zip(df.iloc[:, 0], df.iloc[:, 1].astype(int)))
+                print(f"Loaded {len(self._maps[name])} {name} keys from {table}")
+            return self._maps[name]
+
+    def resolve(self, df, name, on, into):
+        """Add surrogate key column `into` for `df[on]`, dropping rows whose key is unknown."""
+        df = df.copy()
+        df[into] = df[on].map(self.lookup(name))
+        df = df[df[into].notna()]
+        df[into] = df[into].astype(int)
+        return df
+
+    def forget(self, name):
+        """Drop a cached map so the next lookup re-reads it, e.g. after inserting new keys."""
+        with self._lock:
+            self._maps.pop(name, None)
@@ -0,0 +1,91 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class Stage:
+    """One unit of the load: a callable plus the stages whose rows it needs."""
+
+    def __init__(self, name, run, depends_on=()):
+        self.name = name
+        self.run = run
+        self.depends_on = tuple(depends_on)
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, depends_on={self.depends_on!r})"
+
+
+def select_stages(stages, names=None, with_dependencies=False):
+    """The stages to run, in declaration order.
+
+    `names=None` selects every stage. Otherwise only the named stages run,
+    plus everything they depend on when `with_dependencies` is set; a stage
+    whose dependencies are not selected assumes they are already loaded.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    if names is None:
+        return list(stages)
+    unknown = set(names) - set(by_name)
+    if unknown:
+        raise KeyError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+
+    wanted = set(names)
+    if with_dependencies:
+        pending = list(wanted)
+        while pending:
+            for dependency in by_name[pending.pop()].depends_on:
+                if dependency not in wanted:
+                    wanted.add(dependency)
+                    pending.append(dependency)
+    return [stage for stage in stages if stage.name in wanted]
+
+
+def run_stages(stages, execute, workers=4):
+    """Run `execute(stage)` for every stage as soon as its dependencies have finished.
+
+    Independent stages run concurrently on up to `workers` threads. A stage
+    whose dependency failed is skipped. Returns {name: (status, seconds, result)}
+    and prints one timing line per stage as it finishes.
+    """
+    selected = {stage.name for stage in stages}
+    results = {}
+    remaining = list(stages)
+    running = {}
+    started = time.perf_counter()
+
+    def timed(stage):
+        stage_started = time.perf_counter()
+        result = execute(stage)
+        return result, time.perf_counter() - stage_started
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while remaining or running:
+            for stage in list(remaining):
+                dependencies = [d for d in stage.depends_on if d in selected]
+                if any(d in results and results[d][0] != "ok" for d in dependencies):
+                    results[stage.name] = ("skipped", 0.0, None)
+                    print(f"[{stage.name}] skipped: a dependency failed")
+                    remaining.remove(stage)
+                elif all(d in results for d in dependencies):
+                    running[pool.submit(timed, stage)] = stage
+                    remaining.remove(stage)
+
+            if not running:
+                if remaining:
+                    raise ValueError(f"Dependency cycle among: {', '.join(s.name for s in remaining)}")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    result, seconds = future.result()
+                    results[stage.name] = ("ok", seconds, result)
+                    print(f"[{stage.name}] done in {seconds:.2f}s")
+                except Exception as e:
+                    results[stage.name] = ("failed", 0.0, e)
+                    print(f"[{stage.name}] failed: {e}")
+
+    print(f"\nStage timings (wall {time.perf_counter() - started:.2f}s)")
+    for stage in stages:
+        status, seconds, _ = results[stage.name]
+        print(f"  {stage.name:<24} {status:<8} {seconds:8.2f}s")
+    return results
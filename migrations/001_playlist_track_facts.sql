@@ -0,0 +1,232 @@
+-- Migration 001: materialize the playlist/track fact join.
+-- Creates Playlist_Track_Facts and its refresh procedure, fills it, and points the
+-- analysis views at it. Safe to re-run.
+use Spotify_data;
+
+GO
+IF OBJECT_ID('dbo.Playlist_Track_Facts') IS NULL
+BEGIN
+    CREATE TABLE Playlist_Track_Facts (
+        playlist_id            INT            NOT NULL,
+        playlist_name          VARCHAR (500)  NULL,
+        playlist_type          VARCHAR (11)   NOT NULL,
+        track_id               INT            NOT NULL,
+        track_name             NVARCHAR (255) NULL,
+        release_date           DATE           NULL,
+        artist_id              INT            NOT NULL,
+        artist_name            NVARCHAR (255) NOT NULL,
+        nationality            VARCHAR (50)   NULL,
+        is_african_nationality VARCHAR (11)   NOT NULL,
+        genre_name             VARCHAR (50)   NULL
+    );
+
+    CREATE CLUSTERED INDEX CIX_Playlist_Track_Facts
+        ON Playlist_Track_Facts (playlist_type, playlist_id, track_id);
+
+    CREATE NONCLUSTERED INDEX IX_Playlist_Track_Facts_Genre
+        ON Playlist_Track_Facts (genre_name)
+        INCLUDE (playlist_name, release_date);
+
+    CREATE NONCLUSTERED INDEX IX_Playlist_Track_Facts_Nationality
+        ON Playlist_Track_Facts (is_african_nationality, nationality)
+        INCLUDE (playlist_name);
+
+    CREATE NONCLUSTERED INDEX IX_Playlist_Track_Facts_Artist
+        ON Playlist_Track_Facts (artist_id)
+        INCLUDE (artist_name, playlist_name);
+END;
+
+GO
+CREATE OR ALTER PROCEDURE sp_refresh_playlist_track_facts AS
+BEGIN
+    SET NOCOUNT ON;
+    BEGIN TRANSACTION;
+
+    TRUNCATE TABLE Playlist_Track_Facts;
+
+    INSERT INTO Playlist_Track_Facts (
+        playlist_id, playlist_name, playlist_type, track_id, track_name, release_date,
+        artist_id, artist_name, nationality, is_african_nationality, genre_name
+    )
+    SELECT
+        p.playlist_id,
+        p.playlist_name,
+        p.playlist_type,
+        t.track_id,
+        t.track_name,
+        t.release_date,
+        a.artist_id,
+        a.artist_name,
+        n.nationality,
+        CASE 
+            WHEN n.country_code IN (
+                'DZ','AO','BJ','BW','BF','BI','CM','CV','CF','TD','KM','CG','CD','CI','DJ','EG','GQ','ER','ET',
+                'GA','GM','GH','GN','GW','KE','LS','LR','LY','MG','MW','ML','MR','MU','MA','MZ','NA','NE','NG',
+                'RW','ST','SN','SC','SL','SO','ZA','SS','SD','TZ','TG','TN','UG','ZM','ZW'
+            ) THEN 'African'
+            ELSE 'non_African' 
+        END AS is_african_nationality,
+        g.genre_name
+    FROM vw_all_playlists p
+    JOIN playlist_tracks pt ON pt.playlist_id = p.playlist_id
+    JOIN tracks t ON t.track_id = pt.track_id
+    JOIN artist_tracks at ON at.track_id = t.track_id
+    JOIN artists a ON a.artist_id = at.artist_id
+    LEFT JOIN artist_nationalities an ON an.artist_id = a.artist_id
+    LEFT JOIN nationalities n ON n.nationality_id = an.nationality_id
+    LEFT JOIN tracks_genre tg ON tg.track_id = t.track_id
+    LEFT JOIN genres g ON g.genre_id = tg.genre_id;
+
+    COMMIT TRANSACTION;
+END;
+
+
+GO
+CREATE OR ALTER VIEW vw_playlist_track_facts AS
+SELECT
+    playlist_id,
+    playlist_name,
+    track_id,
+    track_name,
+    artist_id,
+    artist_name,
+    nationality,
+    release_date,
+    is_african_nationality,
+    genre_name
+FROM Playlist_Track_Facts
+WHERE playlist_type = 'User'
+;
+
+
+GO
+CREATE OR ALTER VIEW vw_playlist_nationality_distribution AS
+SELECT
+    playlist_id,
+    playlist_name,
+    nationality,
+    COUNT(*) AS track_count
+FROM Playlist_Track_Facts
+WHERE playlist_type = 'User'
+GROUP BY playlist_id, nationality,playlist_name
+;
+
+
+
+
+GO
+CREATE OR ALTER VIEW vw_playlist_genre_distribution AS
+With african_genres as (select genre_id,genre_name from genres where genre_name in
+ (('afrobeats'),('afropop'),('afro r&b'),('afrobeat'),('afropiano'),('afro soul'),('afroswing'),
+ ('azonto'),('alté'),('afro adura'),('ghanaian hip hop'),('amapiano'),
+('gqom'),('rap'),('french r&b'),('pop urbaine'),('asakaa'),('hiplife'),('highlife'),
+('gospel'),('bongo piano'),('private school piano'),('bacardi'),('3 step'),('ndombolo'),
+('rumba congolaise'),('afro house'),('bikutsi'),('gnawa'),('kizomba'),('sufi'),('tribal house'),
+('afro tech'),('ethiopian jazz'),('coupé décalé'),('traditional music'),('nigerian drill'),
+('bongo flava'),('singeli'),('gengetone'),('gospel r&b'),('fújì'),('rap ivoire'),('kuduro'),
+('african gospel'),('alternative r&b'),('maskandi'),('moroccan pop'),('raï'),('moroccan rap'),
+('moroccan chaabi'),('mahraganat'),('christian alternative rock'),('lo-fi'),('lo-fi beats'),('gospel'),
+'bongo','rumba congolaise','singeli','ndombolo','hiplife','nigerian drill','jazz'))
+SELECT
+    playlist_id,
+    Playlist_name,
+    ag.genre_name,
+    MAX(a.release_date) AS release_date,
+    COUNT(distinct(track_id)) AS track_count,
+    CAST(COUNT(track_id) AS FLOAT)
+      / SUM(COUNT(track_id)) OVER (PARTITION BY playlist_id) AS proportion
+FROM Playlist_Track_Facts a
+join african_genres ag on ag.genre_name= a.genre_name
+WHERE a.playlist_type = 'User'
+GROUP BY playlist_id,playlist_name, ag.genre_name;
+
+
+GO
+CREATE OR ALTER VIEW vw_playlist_artist_exposure AS
+SELECT
+    playlist_id,
+    playlist_name,
+    artist_id,
+    artist_name,
+    COUNT(distinct(track_id)) AS track_count,
+    CAST(COUNT(*) AS FLOAT)
+      / SUM(COUNT(*)) OVER (PARTITION BY playlist_id) AS proportion
+FROM Playlist_Track_Facts
+WHERE playlist_type = 'User'
+GROUP BY playlist_id,playlist_name, artist_id, artist_name;
+
+GO
+CREATE OR ALTER VIEW vw_tracks AS
+SELECT
+    playlist_id,
+    playlist_name,
+    track_id,
+    track_name,
+    artist_id,
+    artist_name,
+    nationality,
+    playlist_type,
+    is_african_nationality,
+    genre_name
+FROM Playlist_Track_Facts
+;
+
+
+GO
+CREATE OR ALTER VIEW vw_all_playlist_nationality_distribution AS
+SELECT
+    playlist_id,
+    playlist_name,
+    nationality,
+    COUNT(*) AS track_count,
+    playlist_type
+FROM Playlist_Track_Facts
+where is_african_nationality= 'African'
+GROUP BY playlist_id, nationality,playlist_name,playlist_type 
+;
+
+
+
+GO
+CREATE OR ALTER VIEW vw_all_playlist_genre_distribution AS
+With african_genres as (select genre_id,genre_name from genres where genre_name in
+ (('afrobeats'),('afropop'),('afro r&b'),('afrobeat'),('afropiano'),('afro soul'),('afroswing'),
+ ('azonto'),('alté'),('afro adura'),('ghanaian hip hop'),('amapiano'),
+('gqom'),('rap'),('french r&b'),('pop urbaine'),('asakaa'),('hiplife'),('highlife'),
+('gospel'),('bongo piano'),('private school piano'),('bacardi'),('3 step'),('ndombolo'),
+('rumba congolaise'),('afro house'),('bikutsi'),('gnawa'),('kizomba'),('sufi'),('tribal house'),
+('afro tech'),('ethiopian jazz'),('coupé décalé'),('traditional music'),('nigerian drill'),
+('bongo flava'),('singeli'),('gengetone'),('gospel r&b'),('fújì'),('rap ivoire'),('kuduro'),
+('african gospel'),('alternative r&b'),('maskandi'),('moroccan pop'),('raï'),('moroccan rap'),
+('moroccan chaabi'),('mahraganat'),('christian alternative rock'),('lo-fi'),('lo-fi beats'),('gospel'),
+'bongo','rumba congolaise','singeli','ndombolo','hiplife','nigerian drill','jazz'))
+SELECT
+    playlist_id,
+    Playlist_name,
+    ag.genre_name,
+    COUNT(distinct(track_id)) AS track_count,
+    CAST(COUNT(track_id) AS FLOAT)
+      / SUM(COUNT(track_id)) OVER (PARTITION BY playlist_id) AS proportion,
+      playlist_type
+FROM Playlist_Track_Facts a
+join african_genres ag on ag.genre_name= a.genre_name
+GROUP BY playlist_id,playlist_name, ag.genre_name,playlist_type;
+
+
+
+GO
+CREATE OR ALTER VIEW vw_all_playlist_artist_exposure AS
+SELECT
+    playlist_id,
+    playlist_name,
+    artist_id,
+    artist_name,
+    COUNT(distinct(track_id)) AS track_count,
+    CAST(COUNT(*) AS FLOAT)
+      / SUM(COUNT(*)) OVER (PARTITION BY playlist_id) AS proportion,
+      playlist_type
+FROM Playlist_Track_Facts
+GROUP BY playlist_id,playlist_name, artist_id, artist_name,playlist_type;
+
+GO
+EXEC sp_refresh_playlist_track_facts;
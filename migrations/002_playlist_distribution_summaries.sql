@@ -0,0 +1,303 @@
+-- Migration 002: per-playlist distribution summaries.
+-- Creates the three summary tables, extends sp_refresh_playlist_track_facts to maintain
+-- them for changed playlists only, and points the distribution views at them. Safe to re-run.
+use Spotify_data;
+
+GO
+IF OBJECT_ID('dbo.Playlist_Nationality_Summary') IS NULL
+BEGIN
+    CREATE TABLE Playlist_Nationality_Summary (
+        playlist_type          VARCHAR (11)   NOT NULL,
+        playlist_id            INT            NOT NULL,
+        playlist_name          VARCHAR (500)  NULL,
+        nationality            VARCHAR (50)   NULL,
+        is_african_nationality VARCHAR (11)   NOT NULL,
+        track_count            INT            NOT NULL
+    );
+    CREATE UNIQUE CLUSTERED INDEX CIX_Playlist_Nationality_Summary
+        ON Playlist_Nationality_Summary (playlist_type, playlist_id, nationality, is_african_nationality);
+END;
+
+IF OBJECT_ID('dbo.Playlist_Genre_Summary') IS NULL
+BEGIN
+    CREATE TABLE Playlist_Genre_Summary (
+        playlist_type VARCHAR (11)  NOT NULL,
+        playlist_id   INT           NOT NULL,
+        playlist_name VARCHAR (500) NULL,
+        genre_name    VARCHAR (50)  NOT NULL,
+        release_date  DATE          NULL,
+        track_count   INT           NOT NULL,
+        proportion    FLOAT         NOT NULL
+    );
+    CREATE UNIQUE CLUSTERED INDEX CIX_Playlist_Genre_Summary
+        ON Playlist_Genre_Summary (playlist_type, playlist_id, genre_name);
+END;
+
+IF OBJECT_ID('dbo.Playlist_Artist_Summary') IS NULL
+BEGIN
+    CREATE TABLE Playlist_Artist_Summary (
+        playlist_type VARCHAR (11)   NOT NULL,
+        playlist_id   INT            NOT NULL,
+        playlist_name VARCHAR (500)  NULL,
+        artist_id     INT            NOT NULL,
+        artist_name   NVARCHAR (255) NOT NULL,
+        track_count   INT            NOT NULL,
+        proportion    FLOAT          NOT NULL
+    );
+    CREATE UNIQUE CLUSTERED INDEX CIX_Playlist_Artist_Summary
+        ON Playlist_Artist_Summary (playlist_type, playlist_id, artist_id);
+END;
+
+GO
+-- Rebuilds the facts and summaries of the given playlists, plus every playlist holding one of
+-- the given tracks or a track by one of the given artists (comma-separated IDs). With no
+-- list at all, everything is rebuilt.
+CREATE OR ALTER PROCEDURE sp_refresh_playlist_track_facts
+    @playlist_ids NVARCHAR(MAX) = NULL,
+    @track_ids    NVARCHAR(MAX) = NULL,
+    @artist_ids   NVARCHAR(MAX) = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @full BIT = CASE
+        WHEN @playlist_ids IS NULL AND @track_ids IS NULL AND @artist_ids IS NULL THEN 1 ELSE 0
+    END;
+
+    CREATE TABLE #affected (playlist_id INT PRIMARY KEY);
+    IF @full = 1
+        INSERT INTO #affected SELECT playlist_id FROM playlists;
+    ELSE
+        INSERT INTO #affected
+        SELECT CAST(value AS INT) FROM STRING_SPLIT(@playlist_ids, ',')
+        UNION
+        SELECT pt.playlist_id
+        FROM playlist_tracks pt
+        JOIN STRING_SPLIT(@track_ids, ',') changed ON pt.track_id = CAST(changed.value AS INT)
+        UNION
+        SELECT pt.playlist_id
+        FROM playlist_tracks pt
+        JOIN artist_tracks at ON at.track_id = pt.track_id
+        JOIN STRING_SPLIT(@artist_ids, ',') changed ON at.artist_id = CAST(changed.value AS INT);
+
+    BEGIN TRANSACTION;
+
+    IF @full = 1
+    BEGIN
+        TRUNCATE TABLE Playlist_Track_Facts;
+        TRUNCATE TABLE Playlist_Nationality_Summary;
+        TRUNCATE TABLE Playlist_Genre_Summary;
+        TRUNCATE TABLE Playlist_Artist_Summary;
+    END
+    ELSE
+    BEGIN
+        DELETE f FROM Playlist_Track_Facts f JOIN #affected af ON af.playlist_id = f.playlist_id;
+        DELETE s FROM Playlist_Nationality_Summary s JOIN #affected af ON af.playlist_id = s.playlist_id;
+        DELETE s FROM Playlist_Genre_Summary s JOIN #affected af ON af.playlist_id = s.playlist_id;
+        DELETE s FROM Playlist_Artist_Summary s JOIN #affected af ON af.playlist_id = s.playlist_id;
+    END;
+
+    INSERT INTO Playlist_Track_Facts (
+        playlist_id, playlist_name, playlist_type, track_id, track_name, release_date,
+        artist_id, artist_name, nationality, is_african_nationality, genre_name
+    )
+    SELECT
+        p.playlist_id,
+        p.playlist_name,
+        p.playlist_type,
+        t.track_id,
+        t.track_name,
+        t.release_date,
+        a.artist_id,
+        a.artist_name,
+        n.nationality,
+        CASE 
+            WHEN n.country_code IN (
+                'DZ','AO','BJ','BW','BF','BI','CM','CV','CF','TD','KM','CG','CD','CI','DJ','EG','GQ','ER','ET',
+                'GA','GM','GH','GN','GW','KE','LS','LR','LY','MG','MW','ML','MR','MU','MA','MZ','NA','NE','NG',
+                'RW','ST','SN','SC','SL','SO','ZA','SS','SD','TZ','TG','TN','UG','ZM','ZW'
+            ) THEN 'African'
+            ELSE 'non_African' 
+        END AS is_african_nationality,
+        g.genre_name
+    FROM vw_all_playlists p
+    JOIN #affected af ON af.playlist_id = p.playlist_id
+    JOIN playlist_tracks pt ON pt.playlist_id = p.playlist_id
+    JOIN tracks t ON t.track_id = pt.track_id
+    JOIN artist_tracks at ON at.track_id = t.track_id
+    JOIN artists a ON a.artist_id = at.artist_id
+    LEFT JOIN artist_nationalities an ON an.artist_id = a.artist_id
+    LEFT JOIN nationalities n ON n.nationality_id = an.nationality_id
+    LEFT JOIN tracks_genre tg ON tg.track_id = t.track_id
+    LEFT JOIN genres g ON g.genre_id = tg.genre_id;
+
+    INSERT INTO Playlist_Nationality_Summary (
+        playlist_type, playlist_id, playlist_name, nationality, is_african_nationality, track_count
+    )
+    SELECT f.playlist_type, f.playlist_id, f.playlist_name, f.nationality, f.is_african_nationality, COUNT(*)
+    FROM Playlist_Track_Facts f
+    JOIN #affected af ON af.playlist_id = f.playlist_id
+    GROUP BY f.playlist_type, f.playlist_id, f.playlist_name, f.nationality, f.is_african_nationality;
+
+    WITH african_genres AS (
+        SELECT genre_id, genre_name FROM genres WHERE genre_name IN
+        (('afrobeats'),('afropop'),('afro r&b'),('afrobeat'),('afropiano'),('afro soul'),('afroswing'),
+        ('azonto'),('alté'),('afro adura'),('ghanaian hip hop'),('amapiano'),
+        ('gqom'),('rap'),('french r&b'),('pop urbaine'),('asakaa'),('hiplife'),('highlife'),
+        ('gospel'),('bongo piano'),('private school piano'),('bacardi'),('3 step'),('ndombolo'),
+        ('rumba congolaise'),('afro house'),('bikutsi'),('gnawa'),('kizomba'),('sufi'),('tribal house'),
+        ('afro tech'),('ethiopian jazz'),('coupé décalé'),('traditional music'),('nigerian drill'),
+        ('bongo flava'),('singeli'),('gengetone'),('gospel r&b'),('fújì'),('rap ivoire'),('kuduro'),
+        ('african gospel'),('alternative r&b'),('maskandi'),('moroccan pop'),('raï'),('moroccan rap'),
+        ('moroccan chaabi'),('mahraganat'),('christian alternative rock'),('lo-fi'),('lo-fi beats'),('gospel'),
+        'bongo','rumba congolaise','singeli','ndombolo','hiplife','nigerian drill','jazz')
+    )
+    INSERT INTO Playlist_Genre_Summary (
+        playlist_type, playlist_id, playlist_name, genre_name, release_date, track_count, proportion
+    )
+    SELECT
+        f.playlist_type,
+        f.playlist_id,
+        f.playlist_name,
+        ag.genre_name,
+        MAX(f.release_date),
+        COUNT(DISTINCT f.track_id),
+        CAST(COUNT(f.track_id) AS FLOAT) / SUM(COUNT(f.track_id)) OVER (PARTITION BY f.playlist_id)
+    FROM Playlist_Track_Facts f
+    JOIN #affected af ON af.playlist_id = f.playlist_id
+    JOIN african_genres ag ON ag.genre_name = f.genre_name
+    GROUP BY f.playlist_type, f.playlist_id, f.playlist_name, ag.genre_name;
+
+    INSERT INTO Playlist_Artist_Summary (
+        playlist_type, playlist_id, playlist_name, artist_id, artist_name, track_count, proportion
+    )
+    SELECT
+        f.playlist_type,
+        f.playlist_id,
+        f.playlist_name,
+        f.artist_id,
+        f.artist_name,
+        COUNT(DISTINCT f.track_id),
+        CAST(COUNT(*) AS FLOAT) / SUM(COUNT(*)) OVER (PARTITION BY f.playlist_id)
+    FROM Playlist_Track_Facts f
+    JOIN #affected af ON af.playlist_id = f.playlist_id
+    GROUP BY f.playlist_type, f.playlist_id, f.playlist_name, f.artist_id, f.artist_name;
+
+    COMMIT TRANSACTION;
+END;
+
+
+GO
+CREATE OR ALTER VIEW vw_playlist_track_facts AS
+SELECT
+    playlist_id,
+    playlist_name,
+    track_id,
+    track_name,
+    artist_id,
+    artist_name,
+    nationality,
+    release_date,
+    is_african_nationality,
+    genre_name
+FROM Playlist_Track_Facts
+WHERE playlist_type = 'User'
+;
+
+
+GO
+CREATE OR ALTER VIEW vw_playlist_nationality_distribution AS
+SELECT
+    playlist_id,
+    playlist_name,
+    nationality,
+    track_count
+FROM Playlist_Nationality_Summary
+WHERE playlist_type = 'User'
+;
+
+
+GO
+CREATE OR ALTER VIEW vw_playlist_genre_distribution AS
+SELECT
+    playlist_id,
+    Playlist_name,
+    genre_name,
+    release_date,
+    track_count,
+    proportion
+FROM Playlist_Genre_Summary
+WHERE playlist_type = 'User'
+;
+
+
+GO
+CREATE OR ALTER VIEW vw_playlist_artist_exposure AS
+SELECT
+    playlist_id,
+    playlist_name,
+    artist_id,
+    artist_name,
+    track_count,
+    proportion
+FROM Playlist_Artist_Summary
+WHERE playlist_type = 'User'
+;
+
+GO
+CREATE OR ALTER VIEW vw_tracks AS
+SELECT
+    playlist_id,
+    playlist_name,
+    track_id,
+    track_name,
+    artist_id,
+    artist_name,
+    nationality,
+    playlist_type,
+    is_african_nationality,
+    genre_name
+FROM Playlist_Track_Facts
+;
+
+
+GO
+CREATE OR ALTER VIEW vw_all_playlist_nationality_distribution AS
+SELECT
+    playlist_id,
+    playlist_name,
+    nationality,
+    track_count,
+    playlist_type
+FROM Playlist_Nationality_Summary
+where is_african_nationality= 'African'
+;
+
+
+GO
+CREATE OR ALTER VIEW vw_all_playlist_genre_distribution AS
+SELECT
+    playlist_id,
+    Playlist_name,
+    genre_name,
+    track_count,
+    proportion,
+    playlist_type
+FROM Playlist_Genre_Summary
+;
+
+
+GO
+CREATE OR ALTER VIEW vw_all_playlist_artist_exposure AS
+SELECT
+    playlist_id,
+    playlist_name,
+    artist_id,
+    artist_name,
+    track_count,
+    proportion,
+    playlist_type
+FROM Playlist_Artist_Summary
+;
+
+GO
+EXEC sp_refresh_playlist_track_facts;
@@ -0,0 +1,74 @@
+-- Migration 003: unique natural keys and reverse junction indexes.
+-- Stops with the offending keys if a dimension already holds duplicates; resolve those
+-- and re-run. Safe to re-run. benchmarks/bench_query_plans.py measures the effect.
+use Spotify_data;
+
+GO
+IF EXISTS (SELECT spotify_album_id FROM Albums WHERE spotify_album_id IS NOT NULL GROUP BY spotify_album_id HAVING COUNT(*) > 1)
+BEGIN
+    SELECT spotify_album_id, COUNT(*) AS copies FROM Albums WHERE spotify_album_id IS NOT NULL GROUP BY spotify_album_id HAVING COUNT(*) > 1;
+    RAISERROR('Duplicate Albums.spotify_album_id values; deduplicate them before adding UQ_Albums_spotify_album_id', 16, 1);
+    SET NOEXEC ON;
+END;
+
+IF EXISTS (SELECT canonical_track_id FROM Tracks WHERE canonical_track_id IS NOT NULL GROUP BY canonical_track_id HAVING COUNT(*) > 1)
+BEGIN
+    SELECT canonical_track_id, COUNT(*) AS copies FROM Tracks WHERE canonical_track_id IS NOT NULL GROUP BY canonical_track_id HAVING COUNT(*) > 1;
+    RAISERROR('Duplicate Tracks.canonical_track_id values; deduplicate them before adding UQ_Tracks_canonical_track_id', 16, 1);
+    SET NOEXEC ON;
+END;
+
+IF EXISTS (SELECT Spotify_Playlist_ID FROM Playlists WHERE Spotify_Playlist_ID IS NOT NULL GROUP BY Spotify_Playlist_ID HAVING COUNT(*) > 1)
+BEGIN
+    SELECT Spotify_Playlist_ID, COUNT(*) AS copies FROM Playlists WHERE Spotify_Playlist_ID IS NOT NULL GROUP BY Spotify_Playlist_ID HAVING COUNT(*) > 1;
+    RAISERROR('Duplicate Playlists.Spotify_Playlist_ID values; deduplicate them before adding UQ_Playlists_Spotify_Playlist_ID', 16, 1);
+    SET NOEXEC ON;
+END;
+
+IF EXISTS (SELECT Genre_Name FROM Genres WHERE Genre_Name IS NOT NULL GROUP BY Genre_Name HAVING COUNT(*) > 1)
+BEGIN
+    SELECT Genre_Name, COUNT(*) AS copies FROM Genres WHERE Genre_Name IS NOT NULL GROUP BY Genre_Name HAVING COUNT(*) > 1;
+    RAISERROR('Duplicate Genres.Genre_Name values; deduplicate them before adding UQ_Genres_Genre_Name', 16, 1);
+    SET NOEXEC ON;
+END;
+
+IF EXISTS (SELECT Country_Name FROM Nationalities WHERE Country_Name IS NOT NULL GROUP BY Country_Name HAVING COUNT(*) > 1)
+BEGIN
+    SELECT Country_Name, COUNT(*) AS copies FROM Nationalities WHERE Country_Name IS NOT NULL GROUP BY Country_Name HAVING COUNT(*) > 1;
+    RAISERROR('Duplicate Nationalities.Country_Name values; deduplicate them before adding UQ_Nationalities_Country_Name', 16, 1);
+    SET NOEXEC ON;
+END;
+
+IF EXISTS (SELECT Country_Code FROM Nationalities WHERE Country_Code IS NOT NULL GROUP BY Country_Code HAVING COUNT(*) > 1)
+BEGIN
+    SELECT Country_Code, COUNT(*) AS copies FROM Nationalities WHERE Country_Code IS NOT NULL GROUP BY Country_Code HAVING COUNT(*) > 1;
+    RAISERROR('Duplicate Nationalities.Country_Code values; deduplicate them before adding UQ_Nationalities_Country_Code', 16, 1);
+    SET NOEXEC ON;
+END;
+
+-- NOEXEC from a failed check above skips everything up to the final SET NOEXEC OFF
+GO
+IF OBJECT_ID('dbo.UQ_Albums_spotify_album_id') IS NULL
+    ALTER TABLE Albums ADD CONSTRAINT UQ_Albums_spotify_album_id UNIQUE (spotify_album_id);
+IF OBJECT_ID('dbo.UQ_Tracks_canonical_track_id') IS NULL
+    ALTER TABLE Tracks ADD CONSTRAINT UQ_Tracks_canonical_track_id UNIQUE (canonical_track_id);
+IF OBJECT_ID('dbo.UQ_Playlists_Spotify_Playlist_ID') IS NULL
+    ALTER TABLE Playlists ADD CONSTRAINT UQ_Playlists_Spotify_Playlist_ID UNIQUE (Spotify_Playlist_ID);
+IF OBJECT_ID('dbo.UQ_Genres_Genre_Name') IS NULL
+    ALTER TABLE Genres ADD CONSTRAINT UQ_Genres_Genre_Name UNIQUE (Genre_Name);
+IF OBJECT_ID('dbo.UQ_Nationalities_Country_Name') IS NULL
+    ALTER TABLE Nationalities ADD CONSTRAINT UQ_Nationalities_Country_Name UNIQUE (Country_Name);
+IF OBJECT_ID('dbo.UQ_Nationalities_Country_Code') IS NULL
+    ALTER TABLE Nationalities ADD CONSTRAINT UQ_Nationalities_Country_Code UNIQUE (Country_Code);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Nationalities_Nationality' AND object_id = OBJECT_ID('dbo.Nationalities'))
+    CREATE NONCLUSTERED INDEX IX_Nationalities_Nationality ON Nationalities (Nationality);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Artist_Tracks_Track_ID' AND object_id = OBJECT_ID('dbo.Artist_Tracks'))
+    CREATE NONCLUSTERED INDEX IX_Artist_Tracks_Track_ID ON Artist_Tracks (Track_ID);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tracks_Genre_GENRE_ID' AND object_id = OBJECT_ID('dbo.Tracks_Genre'))
+    CREATE NONCLUSTERED INDEX IX_Tracks_Genre_GENRE_ID ON Tracks_Genre (GENRE_ID);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Playlist_Tracks_Track_ID' AND object_id = OBJECT_ID('dbo.Playlist_Tracks'))
+    CREATE NONCLUSTERED INDEX IX_Playlist_Tracks_Track_ID ON Playlist_Tracks (Track_ID);
+
+GO
+SET NOEXEC OFF;
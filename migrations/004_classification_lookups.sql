@@ -0,0 +1,183 @@
+-- Migration 004: country-region and genre-family lookups.
+-- Creates and seeds Country_Regions and Genre_Families, classifies the facts through them
+-- and rebuilds the facts and summaries. Seeding only adds missing rows, so re-running keeps
+-- any reclassification made since. Safe to re-run.
+use Spotify_data;
+
+GO
+IF OBJECT_ID('dbo.Country_Regions') IS NULL
+    CREATE TABLE Country_Regions (
+        Country_Code VARCHAR (50) NOT NULL PRIMARY KEY,
+        Region_Name  VARCHAR (50) NOT NULL,
+        Is_African   BIT          NOT NULL
+    );
+
+IF OBJECT_ID('dbo.Genre_Families') IS NULL
+    CREATE TABLE Genre_Families (
+        Genre_Name  VARCHAR (50) NOT NULL PRIMARY KEY,
+        Family_Name VARCHAR (50) NOT NULL,
+        Is_African  BIT          NOT NULL
+    );
+
+GO
+-- Namibia is 'NAM' in the nationality source ('NA' would be read back as a missing value)
+MERGE Country_Regions AS target
+USING (VALUES
+    ('DZ', 'Africa', 1), ('AO', 'Africa', 1), ('BJ', 'Africa', 1), ('BW', 'Africa', 1), ('BF', 'Africa', 1), ('BI', 'Africa', 1),
+    ('CM', 'Africa', 1), ('CV', 'Africa', 1), ('CF', 'Africa', 1), ('TD', 'Africa', 1), ('KM', 'Africa', 1), ('CG', 'Africa', 1),
+    ('CD', 'Africa', 1), ('CI', 'Africa', 1), ('DJ', 'Africa', 1), ('EG', 'Africa', 1), ('GQ', 'Africa', 1), ('ER', 'Africa', 1),
+    ('SZ', 'Africa', 1), ('ET', 'Africa', 1), ('GA', 'Africa', 1), ('GM', 'Africa', 1), ('GH', 'Africa', 1), ('GN', 'Africa', 1),
+    ('GW', 'Africa', 1), ('KE', 'Africa', 1), ('LS', 'Africa', 1), ('LR', 'Africa', 1), ('LY', 'Africa', 1), ('MG', 'Africa', 1),
+    ('MW', 'Africa', 1), ('ML', 'Africa', 1), ('MR', 'Africa', 1), ('MU', 'Africa', 1), ('MA', 'Africa', 1), ('MZ', 'Africa', 1),
+    ('NAM', 'Africa', 1), ('NE', 'Africa', 1), ('NG', 'Africa', 1), ('RW', 'Africa', 1), ('ST', 'Africa', 1), ('SN', 'Africa', 1),
+    ('SC', 'Africa', 1), ('SL', 'Africa', 1), ('SO', 'Africa', 1), ('ZA', 'Africa', 1), ('SS', 'Africa', 1), ('SD', 'Africa', 1),
+    ('TZ', 'Africa', 1), ('TG', 'Africa', 1), ('TN', 'Africa', 1), ('UG', 'Africa', 1), ('ZM', 'Africa', 1), ('ZW', 'Africa', 1)
+) AS source (Country_Code, Region_Name, Is_African)
+ON target.Country_Code = source.Country_Code
+WHEN NOT MATCHED THEN INSERT (Country_Code, Region_Name, Is_African)
+    VALUES (source.Country_Code, source.Region_Name, source.Is_African);
+
+MERGE Genre_Families AS target
+USING (VALUES
+    ('afrobeats', 'African', 1), ('afropop', 'African', 1), ('afro r&b', 'African', 1), ('afrobeat', 'African', 1),
+    ('afropiano', 'African', 1), ('afro soul', 'African', 1), ('afroswing', 'African', 1), ('azonto', 'African', 1),
+    ('alté', 'African', 1), ('afro adura', 'African', 1), ('ghanaian hip hop', 'African', 1), ('amapiano', 'African', 1),
+    ('gqom', 'African', 1), ('rap', 'African', 1), ('french r&b', 'African', 1), ('pop urbaine', 'African', 1),
+    ('asakaa', 'African', 1), ('hiplife', 'African', 1), ('highlife', 'African', 1), ('gospel', 'African', 1),
+    ('bongo piano', 'African', 1), ('private school piano', 'African', 1), ('bacardi', 'African', 1), ('3 step', 'African', 1),
+    ('ndombolo', 'African', 1), ('rumba congolaise', 'African', 1), ('afro house', 'African', 1), ('bikutsi', 'African', 1),
+    ('gnawa', 'African', 1), ('kizomba', 'African', 1), ('sufi', 'African', 1), ('tribal house', 'African', 1),
+    ('afro tech', 'African', 1), ('ethiopian jazz', 'African', 1), ('coupé décalé', 'African', 1), ('traditional music', 'African', 1),
+    ('nigerian drill', 'African', 1), ('bongo flava', 'African', 1), ('singeli', 'African', 1), ('gengetone', 'African', 1),
+    ('gospel r&b', 'African', 1), ('fújì', 'African', 1), ('rap ivoire', 'African', 1), ('kuduro', 'African', 1),
+    ('african gospel', 'African', 1), ('alternative r&b', 'African', 1), ('maskandi', 'African', 1), ('moroccan pop', 'African', 1),
+    ('raï', 'African', 1), ('moroccan rap', 'African', 1), ('moroccan chaabi', 'African', 1), ('mahraganat', 'African', 1),
+    ('christian alternative rock', 'African', 1), ('lo-fi', 'African', 1), ('lo-fi beats', 'African', 1), ('bongo', 'African', 1),
+    ('jazz', 'African', 1)
+) AS source (Genre_Name, Family_Name, Is_African)
+ON target.Genre_Name = source.Genre_Name
+WHEN NOT MATCHED THEN INSERT (Genre_Name, Family_Name, Is_African)
+    VALUES (source.Genre_Name, source.Family_Name, source.Is_African);
+
+
+GO
+-- Rebuilds the facts and summaries of the given playlists, plus every playlist holding one of
+-- the given tracks or a track by one of the given artists (comma-separated IDs). With no
+-- list at all, everything is rebuilt.
+CREATE OR ALTER PROCEDURE sp_refresh_playlist_track_facts
+    @playlist_ids NVARCHAR(MAX) = NULL,
+    @track_ids    NVARCHAR(MAX) = NULL,
+    @artist_ids   NVARCHAR(MAX) = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @full BIT = CASE
+        WHEN @playlist_ids IS NULL AND @track_ids IS NULL AND @artist_ids IS NULL THEN 1 ELSE 0
+    END;
+
+    CREATE TABLE #affected (playlist_id INT PRIMARY KEY);
+    IF @full = 1
+        INSERT INTO #affected SELECT playlist_id FROM playlists;
+    ELSE
+        INSERT INTO #affected
+        SELECT CAST(value AS INT) FROM STRING_SPLIT(@playlist_ids, ',')
+        UNION
+        SELECT pt.playlist_id
+        FROM playlist_tracks pt
+        JOIN STRING_SPLIT(@track_ids, ',') changed ON pt.track_id = CAST(changed.value AS INT)
+        UNION
+        SELECT pt.playlist_id
+        FROM playlist_tracks pt
+        JOIN artist_tracks at ON at.track_id = pt.track_id
+        JOIN STRING_SPLIT(@artist_ids, ',') changed ON at.artist_id = CAST(changed.value AS INT);
+
+    BEGIN TRANSACTION;
+
+    IF @full = 1
+    BEGIN
+        TRUNCATE TABLE Playlist_Track_Facts;
+        TRUNCATE TABLE Playlist_Nationality_Summary;
+        TRUNCATE TABLE Playlist_Genre_Summary;
+        TRUNCATE TABLE Playlist_Artist_Summary;
+    END
+    ELSE
+    BEGIN
+        DELETE f FROM Playlist_Track_Facts f JOIN #affected af ON af.playlist_id = f.playlist_id;
+        DELETE s FROM Playlist_Nationality_Summary s JOIN #affected af ON af.playlist_id = s.playlist_id;
+        DELETE s FROM Playlist_Genre_Summary s JOIN #affected af ON af.playlist_id = s.playlist_id;
+        DELETE s FROM Playlist_Artist_Summary s JOIN #affected af ON af.playlist_id = s.playlist_id;
+    END;
+
+    INSERT INTO Playlist_Track_Facts (
+        playlist_id, playlist_name, playlist_type, track_id, track_name, release_date,
+        artist_id, artist_name, nationality, is_african_nationality, genre_name
+    )
+    SELECT
+        p.playlist_id,
+        p.playlist_name,
+        p.playlist_type,
+        t.track_id,
+        t.track_name,
+        t.release_date,
+        a.artist_id,
+        a.artist_name,
+        n.nationality,
+        CASE WHEN cr.Is_African = 1 THEN 'African' ELSE 'non_African' END AS is_african_nationality,
+        g.genre_name
+    FROM vw_all_playlists p
+    JOIN #affected af ON af.playlist_id = p.playlist_id
+    JOIN playlist_tracks pt ON pt.playlist_id = p.playlist_id
+    JOIN tracks t ON t.track_id = pt.track_id
+    JOIN artist_tracks at ON at.track_id = t.track_id
+    JOIN artists a ON a.artist_id = at.artist_id
+    LEFT JOIN artist_nationalities an ON an.artist_id = a.artist_id
+    LEFT JOIN nationalities n ON n.nationality_id = an.nationality_id
+    LEFT JOIN country_regions cr ON cr.country_code = n.country_code
+    LEFT JOIN tracks_genre tg ON tg.track_id = t.track_id
+    LEFT JOIN genres g ON g.genre_id = tg.genre_id;
+
+    INSERT INTO Playlist_Nationality_Summary (
+        playlist_type, playlist_id, playlist_name, nationality, is_african_nationality, track_count
+    )
+    SELECT f.playlist_type, f.playlist_id, f.playlist_name, f.nationality, f.is_african_nationality, COUNT(*)
+    FROM Playlist_Track_Facts f
+    JOIN #affected af ON af.playlist_id = f.playlist_id
+    GROUP BY f.playlist_type, f.playlist_id, f.playlist_name, f.nationality, f.is_african_nationality;
+
+    INSERT INTO Playlist_Genre_Summary (
+        playlist_type, playlist_id, playlist_name, genre_name, release_date, track_count, proportion
+    )
+    SELECT
+        f.playlist_type,
+        f.playlist_id,
+        f.playlist_name,
+        f.genre_name,
+        MAX(f.release_date),
+        COUNT(DISTINCT f.track_id),
+        CAST(COUNT(f.track_id) AS FLOAT) / SUM(COUNT(f.track_id)) OVER (PARTITION BY f.playlist_id)
+    FROM Playlist_Track_Facts f
+    JOIN #affected af ON af.playlist_id = f.playlist_id
+    JOIN genre_families gf ON gf.genre_name = f.genre_name AND gf.is_african = 1
+    GROUP BY f.playlist_type, f.playlist_id, f.playlist_name, f.genre_name;
+
+    INSERT INTO Playlist_Artist_Summary (
+        playlist_type, playlist_id, playlist_name, artist_id, artist_name, track_count, proportion
+    )
+    SELECT
+        f.playlist_type,
+        f.playlist_id,
+        f.playlist_name,
+        f.artist_id,
+        f.artist_name,
+        COUNT(DISTINCT f.track_id),
+        CAST(COUNT(*) AS FLOAT) / SUM(COUNT(*)) OVER (PARTITION BY f.playlist_id)
+    FROM Playlist_Track_Facts f
+    JOIN #affected af ON af.playlist_id = f.playlist_id
+    GROUP BY f.playlist_type, f.playlist_id, f.playlist_name, f.artist_id, f.artist_name;
+
+    COMMIT TRANSACTION;
+END;
+
+
+GO
+EXEC sp_refresh_playlist_track_facts;
@@ -0,0 +1,66 @@
+-- Migration 005: user-curated analysis views leave out playlists with no owner again.
+-- The facts class a NULL owner as 'User' (as vw_all_playlists always has), but
+-- vw_user_curated_playlists, which these views replaced, never included such playlists.
+-- Safe to re-run.
+use Spotify_data;
+
+GO
+CREATE OR ALTER VIEW vw_playlist_track_facts AS
+SELECT
+    playlist_id,
+    playlist_name,
+    track_id,
+    track_name,
+    artist_id,
+    artist_name,
+    nationality,
+    release_date,
+    is_african_nationality,
+    genre_name
+FROM Playlist_Track_Facts
+WHERE playlist_type = 'User'
+    AND playlist_id IN (SELECT playlist_id FROM vw_user_curated_playlists)
+;
+
+
+GO
+CREATE OR ALTER VIEW vw_playlist_nationality_distribution AS
+SELECT
+    playlist_id,
+    playlist_name,
+    nationality,
+    track_count
+FROM Playlist_Nationality_Summary
+WHERE playlist_type = 'User'
+    AND playlist_id IN (SELECT playlist_id FROM vw_user_curated_playlists)
+;
+
+
+GO
+CREATE OR ALTER VIEW vw_playlist_genre_distribution AS
+SELECT
+    playlist_id,
+    Playlist_name,
+    genre_name,
+    release_date,
+    track_count,
+    proportion
+FROM Playlist_Genre_Summary
+WHERE playlist_type = 'User'
+    AND playlist_id IN (SELECT playlist_id FROM vw_user_curated_playlists)
+;
+
+
+GO
+CREATE OR ALTER VIEW vw_playlist_artist_exposure AS
+SELECT
+    playlist_id,
+    playlist_name,
+    artist_id,
+    artist_name,
+    track_count,
+    proportion
+FROM Playlist_Artist_Summary
+WHERE playlist_type = 'User'
+    AND playlist_id IN (SELECT playlist_id FROM vw_user_curated_playlists)
+;
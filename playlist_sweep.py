@@ -0,0 +1,58 @@
+import asyncio
+
+
+async def sweep_keywords(client, keywords, search_page, page_size=50, max_offset=1000):
+    """Search every keyword at every offset at once and return the playlists deduped on ID.
+
+    `search_page(client, keyword, limit=, offset=)` returns the parsed playlists
+    of one results page. All offset pages of all keywords are requested
+    together (the client's rate limiter sets the pace). As with the sequential
+    loop, a keyword stops at its first empty page: requests for later offsets
+    are cancelled and whatever they returned is discarded.
+    """
+    offsets = range(0, max_offset, page_size)
+    empty_at = {word: max_offset for word in keywords}
+    # playlist ID -> ((keyword index, offset, position), playlist); the smallest key wins
+    merged = {}
+
+    async def fetch(word, offset):
+        return word, offset, await search_page(client, word, limit=page_size, offset=offset)
+
+    tasks = {}
+    for word in keywords:
+        print(f"\nSearching for playlists with '{word}'...")
+        for offset in offsets:
+            tasks[asyncio.create_task(fetch(word, offset))] = (word, offset)
+
+    try:
+        for finished in asyncio.as_completed(list(tasks)):
+            try:
+                word, offset, playlists = await finished
+            except asyncio.CancelledError:
+                continue
+
+            if not playlists:
+                empty_at[word] = min(empty_at[word], offset)
+                for task, (w, o) in tasks.items():
+                    if w == word and o > offset:
+                        task.cancel()
+                continue
+
+            if offset > empty_at[word]:
+                continue
+            rank = keywords.index(word)
+            for position, playlist in enumerate(playlists):
+                key = (rank, offset, position)
+                current = merged.get(playlist["id"])
+                if current is None or key < current[0]:
+                    merged[playlist["id"]] = (key, playlist)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    # Pages past a keyword's first empty page may have landed before it did
+    results = [
+        (key, playlist) for key, playlist in merged.values()
+        if key[1] < empty_at[keywords[key[0]]]
+    ]
+    return [playlist for _, playlist in sorted(results, key=lambda r: r[0])]
@@ -0,0 +1,152 @@
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+
+
+# Statuses worth retrying: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after_header(headers):
+    """The Retry-After value from any header mapping, whatever case the server sent it in."""
+    for name, value in (headers or {}).items():
+        if name.lower() == "retry-after":
+            return value
+    return None
+
+
+class RateLimiter:
+    """Adaptive token bucket shared by every worker that talks to the same API.
+
+    `rate` tokens are added per second up to `burst`; each request takes one.
+    A 429 halves the rate (never below `min_rate`) and pauses every caller for
+    the Retry-After period; the other 429s of that window, answered to requests
+    already in flight, do not halve it again. Each success then adds
+    `increase` back, up to `max_rate`. Throttled and retried requests are
+    counted in `stats`. `clock` is the monotonic time source, replaceable in tests.
+    """
+
+    def __init__(self, rate=10.0, burst=10, min_rate=0.5, max_rate=None,
+                 increase=0.1, max_retries=5, backoff_base=0.5, backoff_cap=30.0, clock=time.monotonic):
+        self.rate = float(rate)
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = float(max_rate if max_rate is not None else rate)
+        self.increase = increase
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.stats = Counter()
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._slowed_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how many seconds the caller must wait before using it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            self.stats["requests"] += 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._paused_until - now)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def throttled(self, retry_after=None):
+        with self._lock:
+            self.stats["throttled"] += 1
+            now = self._clock()
+            if now >= self._slowed_until:
+                self.rate = max(self.min_rate, self.rate / 2)
+                # Without a Retry-After, the window is the time to the next token at the new rate
+                self._slowed_until = now + (retry_after or 1 / self.rate)
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+    def succeeded(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def backoff(self, attempt, retry_after=None):
+        """Jittered delay before retry number `attempt` (0-based)."""
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _should_retry(self, error, attempt, transient):
+        status = getattr(error, "http_status", None)
+        if attempt >= self.max_retries:
+            return None
+        if status not in RETRY_STATUSES and not isinstance(error, transient):
+            return None
+
+        retry_after = parse_retry_after(retry_after_header(getattr(error, "headers", None)))
+        if status == 429:
+            self.throttled(retry_after)
+        with self._lock:
+            self.stats["retried"] += 1
+        return self.backoff(attempt, retry_after)
+
+    def call(self, fn, *args, transient=(), **kwargs):
+        """Run `fn` under the rate limit, retrying throttled and transient failures."""
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._should_retry(e, attempt, transient)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self.succeeded()
+            return result
+
+    async def call_async(self, request, transient=()):
+        """Await `request()` under the rate limit, retrying throttled and transient failures."""
+        attempt = 0
+        while True:
+            await self.acquire_async()
+            try:
+                result = await request()
+            except Exception as e:
+                delay = self._should_retry(e, attempt, transient)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self.succeeded()
+            return result
@@ -0,0 +1,89 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+
+class SnapshotStore:
+    """Last crawled snapshot_id and track list of each playlist, kept in SQLite.
+
+    Spotify changes a playlist's snapshot_id whenever its tracks change, so a
+    matching snapshot means the stored track list is still current.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS playlists (
+                playlist_id TEXT PRIMARY KEY,
+                snapshot_id TEXT NOT NULL,
+                tracks TEXT NOT NULL,
+                crawled_at REAL NOT NULL
+            )
+        """)
+        self._db.commit()
+
+    def snapshot_id(self, playlist_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT snapshot_id FROM playlists WHERE playlist_id = ?", (playlist_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def tracks(self, playlist_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT tracks FROM playlists WHERE playlist_id = ?", (playlist_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def save(self, playlist_id, snapshot_id, tracks):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO playlists (playlist_id, snapshot_id, tracks, crawled_at) "
+                "VALUES (?, ?, ?, ?)",
+                (playlist_id, snapshot_id, json.dumps(tracks), time.time())
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def track_key(track):
+    # Local files have no track ID, but always have a URI
+    return track.get("track_id") or track.get("track_uri")
+
+
+def diff_tracks(old_tracks, new_tracks):
+    """Return (added, removed) between two versions of a playlist.
+
+    Playlists can hold the same track more than once, so occurrences are
+    counted rather than compared as sets.
+    """
+    old_counts = Counter(track_key(t) for t in old_tracks)
+    new_counts = Counter(track_key(t) for t in new_tracks)
+
+    added = []
+    seen = Counter()
+    for track in new_tracks:
+        key = track_key(track)
+        seen[key] += 1
+        if seen[key] > old_counts[key]:
+            added.append(track)
+
+    removed = []
+    seen = Counter()
+    for track in old_tracks:
+        key = track_key(track)
+        seen[key] += 1
+        if seen[key] > new_counts[key]:
+            removed.append(track)
+
+    return added, removed
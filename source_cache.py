@@ -0,0 +1,80 @@
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+
+
+DATA_DIR = Path(os.getenv("LOAD_DATA_DIR", Path(__file__).resolve().parent / "datasets"))
+CACHE_DIR = Path(os.getenv("LOAD_CACHE_DIR", ".spotify_cache/sources"))
+
+# Workbook and column types for every loader input. Text columns are read as
+# text so IDs and years are never turned into numbers; everything else is cast
+# to a nullable type once, when the cache is built.
+SOURCES = {
+    "tracks": ("Spotify_Tracks.xlsx", {
+        "Spotify_Track_ID": str, "Track_Name": str, "Spotify_Artist_ID": str,
+        "Artist_Name": str, "Spotify_Album_ID": str, "Album_Name": str,
+        "Release_Date": str, "Spotify_Track_Url": str, "Spotify_Track_Uri": str,
+        "Playlist_Name": str, "Playlist_ID_1": str, "Genre_Name": str
+    }),
+    "playlists": ("Playlists.xlsx", {
+        "Spotify_Playlist_ID": str, "Playlist_Name": str, "Playlist_Owner": str,
+        "Number_Of_Tracks": "Int64", "Spotify_Playlist_Url": str,
+        "Number_Of_Followers": "Int64", "Is_Public": "boolean"
+    }),
+    "artists": ("Artists.xlsx", {"Artist_Name": str}),
+    "artist_nationalities": ("Artist_Nationalities_final.xlsx", {"Artist_Name": str, "Nationality": str}),
+    "countries": ("World_Countries_Nationalities_Codes.xlsx", {
+        "Country_Name": str, "Nationality": str, "Country_Code": str
+    })
+}
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_workbook(path, dtypes):
+    text = [column for column, dtype in dtypes.items() if dtype is str]
+    df = pd.read_excel(path, dtype={column: str for column in text})
+    for column, dtype in dtypes.items():
+        if dtype is not str and column in df.columns:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def read_source(name, data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    """One loader input as a DataFrame, parsed from Excel only when the workbook changes.
+
+    The parsed frame is stored as Feather under the workbook's content hash,
+    so later runs memory-map the columnar copy instead of running openpyxl,
+    and editing the workbook simply misses the cache.
+    """
+    filename, dtypes = SOURCES[name]
+    path = Path(data_dir) / filename
+    cache_dir = Path(cache_dir)
+    cached = cache_dir / f"{path.stem}-{file_hash(path)[:16]}.feather"
+
+    if cached.exists():
+        return pd.read_feather(cached)
+
+    df = read_workbook(path, dtypes)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    partial = cached.with_suffix(".tmp")
+    df.reset_index(drop=True).to_feather(partial)
+    os.replace(partial, cached)
+
+    # Copies of older versions of this workbook can never be hit again
+    for stale in cache_dir.glob(f"{path.stem}-*.feather"):
+        if stale != cached:
+            stale.unlink()
+    return df
+
+
+def load_sources(names=None, data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    return {name: read_source(name, data_dir, cache_dir) for name in (names or SOURCES)}
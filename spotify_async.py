@@ -0,0 +1,122 @@
+import asyncio
+import os
+
+import aiohttp
+from multidict import CIMultiDict
+from spotipy.exceptions import SpotifyException
+
+from rate_limit import RateLimiter
+
+
+API_BASE = os.getenv("SPOTIFY_API_BASE", "https://api.spotify.com/v1/")
+
+# Connection-level failures that are worth retrying like a 5xx
+TRANSIENT_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+
+def open_session(max_connections=20):
+    """HTTP session with a keep-alive connection pool that several clients can share."""
+    connector = aiohttp.TCPConnector(limit=max_connections, keepalive_timeout=60)
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=30)
+    )
+
+
+class AsyncSpotify:
+    """asyncio client for the Spotify Web API endpoints the crawlers use.
+
+    Authentication is delegated to a spotipy auth manager (or a fixed `token`),
+    so the same credentials work for the sync and async paths. Pass `session`
+    to share one connection pool between clients with different credentials,
+    and `limiter` to share one request budget and its 429 handling.
+    """
+
+    def __init__(self, auth_manager=None, token=None, session=None,
+                 base_url=API_BASE, limiter=None, max_connections=20):
+        self.auth_manager = auth_manager
+        # A fixed bearer token (e.g. for a local stub server) skips the auth manager
+        self.token = token or os.getenv("SPOTIFY_ACCESS_TOKEN")
+        self.base_url = base_url.rstrip("/") + "/"
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.max_connections = max_connections
+        self._session = session
+        self._owns_session = session is None
+        self._token_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        if self._session is None:
+            self._session = open_session(self.max_connections)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _access_token(self):
+        if self.token:
+            return self.token
+        # spotipy may refresh the token over blocking HTTP, so keep it off the event loop
+        async with self._token_lock:
+            return await asyncio.to_thread(self.auth_manager.get_access_token, as_dict=False)
+
+    async def _get(self, url, params=None):
+        if not url.startswith("http"):
+            url = self.base_url + url
+        if params:
+            params = {k: v for k, v in params.items() if v is not None}
+
+        async def request():
+            headers = {"Authorization": f"Bearer {await self._access_token()}"}
+            async with self._session.get(url, params=params, headers=headers) as response:
+                if response.status >= 400:
+                    try:
+                        msg = (await response.json())["error"]["message"]
+                    except Exception:
+                        msg = await response.text()
+                    raise SpotifyException(
+                        response.status, -1, f"{response.url}:\n {msg}",
+                        # Keep the case-insensitive lookup: a server may send retry-after in lowercase
+                        reason=response.reason, headers=CIMultiDict(response.headers)
+                    )
+                return await response.json()
+
+        # 429s and transient failures are retried here, so callers only see final errors
+        return await self.limiter.call_async(request, transient=TRANSIENT_ERRORS)
+
+    async def playlist_items(self, playlist_id, fields=None, limit=100, offset=0,
+                             market=None, additional_types=("track", "episode")):
+        return await self._get(f"playlists/{playlist_id}/tracks", {
+            "fields": fields,
+            "limit": limit,
+            "offset": offset,
+            "market": market,
+            "additional_types": ",".join(additional_types)
+        })
+
+    async def playlist(self, playlist_id, fields=None, market=None):
+        return await self._get(f"playlists/{playlist_id}", {
+            "fields": fields,
+            "market": market
+        })
+
+    async def next(self, result):
+        if result["next"]:
+            return await self._get(result["next"])
+        return None
+
+    async def artists(self, artists):
+        return await self._get("artists", {"ids": ",".join(artists)})
+
+    async def search(self, q, limit=10, offset=0, type="track", market=None):
+        return await self._get("search", {
+            "q": q,
+            "limit": limit,
+            "offset": offset,
+            "type": type,
+            "market": market
+        })
@@ -1,8 +1,12 @@
 import os
+import asyncio
 from dotenv import load_dotenv
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 import pandas as pd
+from spotify_async import AsyncSpotify
+from rate_limit import RateLimiter
+from playlist_sweep import sweep_keywords
 
 # Load environment variables
 load_dotenv()
@@ -17,9 +21,12 @@ sp = spotipy.Spotify(auth_manager=SpotifyOAuth(client_id=CLIENT_ID,
                                                redirect_uri=REDIRECT_URI,
                                                scope=scope))
 
+# Shared request budget; backs off on 429s and retries with jitter
+limiter = RateLimiter()
+
 # Function to search playlists by keyword
-def search_playlists(keyword, limit=50, offset=0):
-    results = sp.search(q=keyword, type='playlist', limit=limit, offset=offset)
+async def search_playlists_async(client, keyword, limit=50, offset=0):
+    results = await client.search(q=keyword, type='playlist', limit=limit, offset=offset)
     playlists = []
     for playlist in results['playlists']['items']:
         if playlist and 'name' in playlist:  # ✅ Check for valid playlist object
@@ -36,21 +43,24 @@ def search_playlists(keyword, limit=50, offset=0):
     return playlists
 
 
+def search_playlists(keyword, limit=50, offset=0):
+    async def run():
+        async with AsyncSpotify(sp.auth_manager, limiter=limiter) as client:
+            return await search_playlists_async(client, keyword, limit=limit, offset=offset)
+    return asyncio.run(run())
+
+
 # Collect playlists for multiple keywords
 keywords = ["Africa"]
-all_playlists = []
-
-for word in keywords:
-    print(f"\nSearching for playlists with '{word}'...")
-    offset = 0
-    while True:
-        playlists = search_playlists(word, limit=50, offset=offset)
-        if not playlists:
-            break
-        all_playlists.extend(playlists)
-        offset += 50  # Go to next batch
-        if offset >= 1000:  # Stop after 1000 per keyword (API practical limit)
-            break
+
+
+async def sweep():
+    # All 20 offset pages of every keyword go out at once, merged on playlist ID
+    async with AsyncSpotify(sp.auth_manager, limiter=limiter) as client:
+        return await sweep_keywords(client, keywords, search_playlists_async,
+                                    page_size=50, max_offset=1000)  # 1000 per keyword (API practical limit)
+
+all_playlists = asyncio.run(sweep())
 
 # Convert to DataFrame
 df = pd.DataFrame(all_playlists).drop_duplicates(subset=["url"])
@@ -59,5 +69,6 @@ df = pd.DataFrame(all_playlists).drop_duplicates(subset=["url"])
 excel_file = "spotify_playlists.xlsx"
 df.to_excel(excel_file, index=False)
 print(f"\nExported {len(df)} playlists to {excel_file}")
+print(f"Rate limiter: {limiter.stats['throttled']} throttled, {limiter.stats['retried']} retried")
 
 
@@ -0,0 +1,257 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from spotify_async import AsyncSpotify
+
+
+def request_key(path, query):
+    """Normalised `path?query` used to match a request to its recorded response."""
+    pairs = sorted((k, str(v)) for k, v in query if v is not None)
+    return path.strip("/") + ("?" + "&".join(f"{k}={v}" for k, v in pairs) if pairs else "")
+
+
+# Recording
+
+
+class RecordingSpotify(AsyncSpotify):
+    """AsyncSpotify that saves every response it receives as a fixture file."""
+
+    def __init__(self, fixture_dir, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fixture_dir = fixture_dir
+        os.makedirs(fixture_dir, exist_ok=True)
+
+    async def _get(self, url, params=None):
+        body = await super()._get(url, params)
+
+        full_url = url if url.startswith("http") else self.base_url + url
+        parts = urlsplit(full_url)
+        path = parts.path[len(urlsplit(self.base_url).path):]
+        query = parse_qsl(parts.query) + list((params or {}).items())
+        key = request_key(path, query)
+
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json"
+        with open(os.path.join(self.fixture_dir, name), "w", encoding="utf-8") as f:
+            json.dump({"key": key, "base_url": self.base_url, "body": body}, f)
+        return body
+
+
+# Synthetic data
+
+
+class SyntheticLibrary:
+    """Deterministic fake playlists, artists and search results for the stub server."""
+
+    def __init__(self, playlists=57, tracks_per_playlist=100, artists=300,
+                 search_results=730, seed=0):
+        rng = random.Random(seed)
+        self.artists = {
+            f"ar{i:05d}": {
+                "id": f"ar{i:05d}",
+                "name": f"Artist {i}",
+                "genres": rng.sample(["afrobeats", "afropop", "amapiano", "highlife", "gqom",
+                                      "bongo flava", "pop", "rap", "r&b", "dancehall"],
+                                     rng.randint(0, 3))
+            }
+            for i in range(artists)
+        }
+        artist_ids = list(self.artists)
+
+        self.playlists = {}
+        for p in range(playlists):
+            playlist_id = f"pl{p:05d}"
+            items = []
+            for t in range(tracks_per_playlist):
+                track_artists = rng.sample(artist_ids, rng.randint(1, 3))
+                album_id = f"al{rng.randint(0, 2000):05d}"
+                track_id = f"tr{rng.randint(0, 20000):06d}"
+                items.append({"track": {
+                    "id": track_id,
+                    "name": f"Track {track_id}",
+                    "artists": [{"id": a, "name": self.artists[a]["name"]} for a in track_artists],
+                    "album": {"id": album_id, "name": f"Album {album_id}",
+                              "release_date": f"{rng.randint(1970, 2025)}-01-01"},
+                    "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+                    "uri": f"spotify:track:{track_id}"
+                }})
+            self.playlists[playlist_id] = {"snapshot_id": f"snap-{playlist_id}-1", "items": items}
+
+        self.search_results = [
+            {
+                "id": f"sp{i:05d}",
+                "name": f"Search Playlist {i}",
+                "owner": {"display_name": "Spotify" if i % 11 == 0 else f"user{i}"},
+                "tracks": {"total": rng.randint(10, 300)},
+                "external_urls": {"spotify": f"https://open.spotify.com/playlist/sp{i:05d}"},
+                "followers": {"total": rng.randint(0, 100000)},
+                "public": True
+            }
+            for i in range(search_results)
+        ]
+
+    def respond(self, path, query, base_url):
+        parts = path.strip("/").split("/")
+        if parts[0] == "playlists" and len(parts) == 3 and parts[2] == "tracks":
+            playlist = self.playlists.get(parts[1])
+            if playlist is None:
+                return None
+            offset = int(query.get("offset", 0))
+            limit = min(int(query.get("limit", 100)), 100)
+            items = playlist["items"][offset:offset + limit]
+            next_url = None
+            if offset + limit < len(playlist["items"]):
+                next_url = f"{base_url}playlists/{parts[1]}/tracks?offset={offset + limit}&limit={limit}"
+            return {"items": items, "next": next_url}
+        if parts[0] == "playlists" and len(parts) == 2 and parts[1] in self.playlists:
+            return {"id": parts[1], "snapshot_id": self.playlists[parts[1]]["snapshot_id"]}
+        if parts == ["artists"]:
+            ids = query.get("ids", "").split(",")
+            return {"artists": [self.artists.get(a) for a in ids]}
+        if parts == ["search"] and query.get("type") == "playlist":
+            offset = int(query.get("offset", 0))
+            limit = int(query.get("limit", 10))
+            return {"playlists": {"items": self.search_results[offset:offset + limit]}}
+        return None
+
+
+# Stub server
+
+
+class StubSpotifyServer:
+    """Local HTTP stand-in for the Spotify Web API.
+
+    Serves recorded fixtures first and synthetic data for anything not
+    recorded. `latency` adds a fixed delay per request and every
+    `throttle_every`-th request is answered with a 429 and `Retry-After`,
+    so crawlers can be benchmarked and regression-tested without network.
+    """
+
+    def __init__(self, fixture_dir=None, library=None, latency=0.0,
+                 throttle_every=0, retry_after=1, host="127.0.0.1", port=0):
+        self.library = library
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._fixtures = {}
+        if fixture_dir:
+            for name in os.listdir(fixture_dir):
+                if name.endswith(".json"):
+                    with open(os.path.join(fixture_dir, name), encoding="utf-8") as f:
+                        fixture = json.load(f)
+                    self._fixtures[fixture["key"]] = fixture
+
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                    throttle = stub.throttle_every and stub.requests % stub.throttle_every == 0
+                    if throttle:
+                        stub.throttled += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                if throttle:
+                    return self._send(429, {"error": {"status": 429, "message": "API rate limit exceeded"}},
+                                      {"Retry-After": str(stub.retry_after)})
+
+                parts = urlsplit(self.path)
+                path = parts.path[len("/v1/"):] if parts.path.startswith("/v1/") else parts.path
+                query = parse_qsl(parts.query)
+                body = stub._lookup(path, query)
+                if body is None:
+                    return self._send(404, {"error": {"status": 404, "message": "Not found"}})
+                self._send(200, body)
+
+            def _send(self, status, body, headers=None):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def _lookup(self, path, query):
+        fixture = self._fixtures.get(request_key(path, query))
+        if fixture is not None:
+            # Recorded `next` links point at Spotify; send the client back here instead
+            text = json.dumps(fixture["body"]).replace(fixture["base_url"], self.base_url)
+            return json.loads(text)
+        if self.library is not None:
+            return self.library.respond(path, dict(query), self.base_url)
+        return None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded or synthetic Spotify API responses")
+    parser.add_argument("--fixtures", default=None, help="directory written by RecordingSpotify")
+    parser.add_argument("--synthetic", action="store_true", help="serve synthetic data for unrecorded requests")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--throttle-every", type=int, default=0, help="answer every Nth request with a 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = StubSpotifyServer(
+        fixture_dir=args.fixtures,
+        library=SyntheticLibrary() if args.synthetic else None,
+        latency=args.latency,
+        throttle_every=args.throttle_every,
+        retry_after=args.retry_after,
+        port=args.port
+    )
+    print(f"Serving on {server.base_url} "
+          f"(set SPOTIFY_API_BASE={server.base_url} SPOTIFY_ACCESS_TOKEN=stub)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
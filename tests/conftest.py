@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# --------------------------------------------------
+# Ensure project root, dashboard and benchmarks are on path
+# --------------------------------------------------
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+sys.path.append(str(ROOT_DIR / "Masters_dashboard"))
+sys.path.append(str(ROOT_DIR / "benchmarks"))
+
+
+@pytest.fixture
+def embedded(tmp_path):
+    """A pooled connection to a fresh embedded (DuckDB) database with the full schema."""
+    pytest.importorskip("duckdb")
+    import db
+    from embedded_backend import ensure_schema
+
+    pool = db.ConnectionPool({**db.load_config(), "backend": "duckdb", "path": str(tmp_path / "load.duckdb")})
+    conn = pool.connection()
+    ensure_schema(conn)
+    yield conn
+    conn.close()
+    pool.close()
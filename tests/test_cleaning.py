@@ -0,0 +1,187 @@
+import datetime
+import random
+import re
+
+import pandas as pd
+import pytest
+
+from bench_cleaning import synthetic_nationalities, synthetic_tracks
+from cleaning import explode_genres, explode_nationalities, normalize_release_date
+
+
+SEEDS = range(20)
+
+
+# The baseline Data_Load_Script.py cleaning, step for step, as the reference
+
+
+def baseline_release_date(dates):
+    dates = dates.replace(r'^\s*$', None, regex=True).where(pd.notnull(dates), None)
+    dates = pd.to_datetime(dates, format='%Y-%m-%d', errors='coerce').dt.date
+    dates = dates.astype(str).str.strip()
+    dates = dates.replace(r'^\s*$', None, regex=True)
+
+    def normalize_release_date(val):
+        if val is None:
+            return None
+        val = str(val).strip()
+        if len(val) == 4:
+            return f"{val}-01-01"
+        elif len(val) == 7:
+            return f"{val}-01"
+        return val
+
+    dates = dates.apply(normalize_release_date)
+    dates = pd.to_datetime(dates, errors='coerce').dt.date
+    return dates.where(pd.notnull(dates), None)
+
+
+def baseline_genres(df, genre_col="Genre_Name", delimiter=","):
+    df = df.copy()
+    df[genre_col] = (
+        df[genre_col].astype(str).replace('nan', '')
+        .str.split(delimiter).apply(lambda x: [item.strip() for item in x if item.strip()])
+    )
+    df[genre_col] = df[genre_col].apply(lambda genres: [genre.lower() for genre in genres])
+    df = df.explode(genre_col)
+    return df[df[genre_col] != ''].reset_index(drop=True)
+
+
+def baseline_nationalities(df):
+    df = df.copy().astype(object)
+    df = df.replace(r'^\s*$', None, regex=True)
+    df = df.where(pd.notnull(df), None)
+    df["Artist_Name"] = df["Artist_Name"].str.strip().str.title()
+    # astype(str) on pandas 2 turned a missing nationality into the text 'None'; map(str) does on any version
+    df["Nationality"] = df["Nationality"].map(str)
+    df["Nationality"] = df["Nationality"].str.split("/").apply(lambda x: [item.strip() for item in x if item.strip()])
+    return df.explode("Nationality").reset_index(drop=True)
+
+
+# The behaviour changes cleaning.py makes on purpose
+
+SPOTIFY_DATE = re.compile(r"(\d{4})(?:-(\d{2}))?(?:-(\d{2}))?(?: 00:00:00)?")
+
+
+def documented_release_date_changes(dates, expected):
+    """The baseline's strict first parse turned YYYY and YYYY-MM, padded or timed text into NULL
+    before its own padding step could run; those are now padded and parsed."""
+    expected = expected.copy()
+    for label, text in dates.items():
+        match = SPOTIFY_DATE.fullmatch(str(text).strip()) if isinstance(text, str) else None
+        if expected[label] is None and match:
+            year, month, day = (int(part or 1) for part in match.groups())
+            try:
+                expected[label] = datetime.date(year, month, day)
+            except ValueError:
+                pass
+    return expected
+
+
+def documented_nationality_changes(expected):
+    # A missing nationality is now missing, not the text 'None'; neither matches a Nationalities row
+    expected = expected.copy()
+    expected["Nationality"] = expected["Nationality"].replace("None", None)
+    return expected
+
+
+def same(left, right):
+    if isinstance(left, pd.Series):
+        left, right = left.to_frame(), right.to_frame()
+    left = left.reset_index(drop=True).astype(object).where(pd.notnull(left.reset_index(drop=True)), None)
+    right = right.reset_index(drop=True).astype(object).where(pd.notnull(right.reset_index(drop=True)), None)
+    return left.equals(right)
+
+
+def random_release_date(rng):
+    """A release date string in one of the shapes Spotify and Excel produce, and its expected date."""
+    year, month, day = rng.randint(1900, 2030), rng.randint(1, 12), rng.randint(1, 28)
+    text, expected = rng.choice([
+        (f"{year}", datetime.date(year, 1, 1)),
+        (f"{year}-{month:02d}", datetime.date(year, month, 1)),
+        (f"{year}-{month:02d}-{day:02d}", datetime.date(year, month, day)),
+        (f"{year}-{month:02d}-{day:02d} 00:00:00", datetime.date(year, month, day)),
+        (f"{year}-{month:02d}-30" if month == 2 else "not a date", None),
+        (f"{year}-13", None),
+        ("", None),
+        (None, None)
+    ])
+    if text and rng.random() < 0.2:
+        text = f" {text} "
+    return text, expected
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_release_dates_match_the_baseline_except_documented_changes(seed):
+    rng = random.Random(seed)
+    dates = pd.concat([
+        synthetic_tracks(2000, seed)["Release_Date"],
+        pd.Series([random_release_date(rng)[0] for _ in range(500)], dtype=object)
+    ], ignore_index=True)
+
+    expected = documented_release_date_changes(dates, baseline_release_date(dates))
+
+    assert same(expected, normalize_release_date(dates))
+
+
+def test_partial_release_dates_were_null_in_the_baseline():
+    dates = pd.Series(["2019", "2019-05", "2019-05-03", pd.Timestamp("2019-05-03")], dtype=object)
+
+    assert baseline_release_date(dates).tolist() == [
+        None, None, datetime.date(2019, 5, 3), datetime.date(2019, 5, 3)
+    ]
+    assert normalize_release_date(dates).tolist() == [
+        datetime.date(2019, 1, 1), datetime.date(2019, 5, 1), datetime.date(2019, 5, 3), datetime.date(2019, 5, 3)
+    ]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_release_dates_are_padded_dates_or_none(seed):
+    rng = random.Random(seed)
+    cases = [random_release_date(rng) for _ in range(500)]
+    index = rng.sample(range(10000), len(cases))
+    dates = pd.Series([text for text, _ in cases], index=index, name="Release_Date", dtype=object)
+
+    result = normalize_release_date(dates)
+
+    assert result.name == "Release_Date"
+    assert result.index.equals(dates.index)
+    assert result.tolist() == [expected for _, expected in cases]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_genres_match_the_baseline(seed):
+    tracks = synthetic_tracks(2000, seed)
+    assert same(baseline_genres(tracks), explode_genres(tracks))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_genres_are_one_row_per_stripped_lowercased_item(seed):
+    tracks = synthetic_tracks(500, seed)
+    exploded = explode_genres(tracks)
+
+    expected = []
+    for track_id, genres in zip(tracks["Canonical_Track_ID"], tracks["Genre_Name"]):
+        items = [g.strip().lower() for g in genres.split(",") if g.strip()]
+        expected.extend((track_id, g) for g in items or [None])
+    actual = [
+        (track_id, None if pd.isna(genre) else genre)
+        for track_id, genre in zip(exploded["Canonical_Track_ID"], exploded["Genre_Name"])
+    ]
+    assert actual == expected
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_nationalities_match_the_baseline_except_documented_changes(seed):
+    artists = synthetic_nationalities(2000, seed)
+    expected = documented_nationality_changes(baseline_nationalities(artists))
+    assert same(expected, explode_nationalities(artists))
+
+
+def test_missing_nationality_is_missing_not_the_text_none():
+    artists = pd.DataFrame({"Artist_Name": [" burna boy ", "tems"], "Nationality": ["Nigerian/ ", "  "]})
+    result = explode_nationalities(artists)
+
+    assert result["Artist_Name"].tolist() == ["Burna Boy", "Tems"]
+    assert result["Nationality"].iloc[0] == "Nigerian"
+    assert pd.isna(result["Nationality"].iloc[1])
@@ -0,0 +1,55 @@
+import json
+
+from crawl_checkpoint import CrawlCheckpoint
+
+
+def track(n):
+    return {"id": f"t{n}", "name": f"Track {n}"}
+
+
+def test_a_restarted_crawl_resumes_from_the_journal(tmp_path):
+    path = tmp_path / "crawl" / "journal.jsonl"
+    checkpoint = CrawlCheckpoint(str(path))
+    checkpoint.record_page("p1", [track(1), track(2)], "https://api/p1?offset=2")
+    checkpoint.record_artists([{"id": "a1", "genres": ["afrobeats"]}, None, {"name": "no id"}])
+    checkpoint.record_page("p2", [track(3)], None)
+    checkpoint.record_page("p1", [track(4)], "https://api/p1?offset=3")
+    # Interrupted here: the process dies without closing the journal
+    checkpoint._file.flush()
+
+    resumed = CrawlCheckpoint(str(path))
+
+    assert resumed.cursors == {"p1": "https://api/p1?offset=3", "p2": None}
+    assert list(resumed.artists) == ["a1"]
+    assert len(resumed.page_offsets["p1"]) == 2
+    assert list(resumed.read_pages("p1")) == [[track(1), track(2)], [track(4)]]
+    assert list(resumed.read_pages("p2")) == [[track(3)]]
+    assert list(resumed.read_pages("unknown")) == []
+    checkpoint.close()
+    resumed.close()
+
+
+def test_a_truncated_last_line_is_dropped_and_appending_continues(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    checkpoint = CrawlCheckpoint(str(path))
+    checkpoint.record_page("p1", [track(1)], "https://api/p1?offset=1")
+    checkpoint.close()
+    good_size = path.stat().st_size
+    line = json.dumps({"kind": "page", "playlist_id": "p1", "tracks": [track(2)], "next": None})
+    with open(path, "ab") as f:
+        f.write(line[: len(line) // 2].encode("utf-8"))
+
+    resumed = CrawlCheckpoint(str(path))
+
+    assert path.stat().st_size == good_size
+    assert resumed.cursors == {"p1": "https://api/p1?offset=1"}
+    resumed.record_page("p1", [track(2)], None)
+    resumed.close()
+
+    lines = path.read_bytes().splitlines()
+    assert [json.loads(l)["tracks"] for l in lines] == [[track(1)], [track(2)]]
+    again = CrawlCheckpoint(str(path))
+    assert again.cursors == {"p1": None}
+    assert list(again.read_pages("p1")) == [[track(1)], [track(2)]]
+    again.discard()
+    assert not path.exists()
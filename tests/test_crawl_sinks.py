@@ -0,0 +1,71 @@
+import asyncio
+import contextlib
+import io
+import os
+
+import pytest
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("aiohttp")
+pytest.importorskip("spotipy")
+pytest.importorskip("dotenv")
+
+# The crawler builds its spotipy auth managers at import; the stub never checks them
+os.environ.setdefault("CLIENT_ID", "stub")
+os.environ.setdefault("CLIENT_SECRET", "stub")
+os.environ.setdefault("SPOTIPY_REDIRECT_URI", "http://127.0.0.1:8888/callback")
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import Spotify_Track_API as crawler
+import artist_cache
+from artist_cache import ArtistCache
+from crawl_sinks import SINKS, TRACK_FIELDS, export_excel
+from rate_limit import RateLimiter
+from spotify_async import AsyncSpotify, open_session
+from spotify_stub import StubSpotifyServer, SyntheticLibrary
+
+
+async def crawl_to_sink(base_url, playlist_ids, sink):
+    async with open_session(4) as session:
+        client = AsyncSpotify(token="stub", base_url=base_url, session=session,
+                              limiter=RateLimiter(rate=1000, burst=1000, max_rate=1000))
+        clients = {True: client, False: client}
+        tracks = await crawler.crawl_playlists_async(clients, playlist_ids, workers=2, sink=sink)
+        artists = await crawler.fetch_artists_async(client, sorted(sink.artist_ids))
+        sink.write_artists(artists.values())
+        sink.close()
+        return tracks
+
+
+@pytest.mark.parametrize("format", sorted(SINKS))
+def test_crawl_streams_every_page_to_the_sink(format, tmp_path, monkeypatch):
+    monkeypatch.setattr(artist_cache, "_artist_cache", ArtistCache(":memory:"))
+    library = SyntheticLibrary(playlists=3, tracks_per_playlist=150, artists=40)
+    playlist_ids = {f"Playlist {i}": {"id": f"pl{i:05d}", "is_public": True} for i in range(3)}
+    sink = SINKS[format](str(tmp_path / "tracks"))
+
+    with StubSpotifyServer(library=library) as stub, contextlib.redirect_stdout(io.StringIO()):
+        returned = asyncio.run(crawl_to_sink(stub.base_url, playlist_ids, sink))
+
+    assert returned == []
+    assert sink.rows == 450
+    for name, info in playlist_ids.items():
+        path = tmp_path / "tracks" / f"playlist_id={info['id']}" / f"part-0.{format}"
+        table = SINKS[format].read(str(path))
+        assert table.column_names == TRACK_FIELDS
+        assert table.num_rows == 150
+        assert set(table.column("playlist_name").to_pylist()) == {name}
+        expected = [item["track"]["id"] for item in library.playlists[info["id"]]["items"]]
+        assert table.column("track_id").to_pylist() == expected
+
+    pytest.importorskip("openpyxl")
+    import pandas as pd
+
+    excel_file = tmp_path / "tracks.xlsx"
+    rows = export_excel(str(tmp_path / "tracks"), str(excel_file), SINKS[format],
+                        playlist_ids=[info["id"] for info in playlist_ids.values()])
+    workbook = pd.read_excel(excel_file)
+    assert rows == 450
+    assert workbook.columns.tolist() == TRACK_FIELDS
+    assert workbook["playlist_name"].unique().tolist() == list(playlist_ids)
+    assert workbook["genres"].notna().all()
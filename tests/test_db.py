@@ -0,0 +1,118 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import db
+
+
+class FlakyCursor(sqlite3.Cursor):
+    def execute(self, sql, *args):
+        failures = self.connection.failures
+        if failures[0]:
+            failures[0] -= 1
+            # SQLSTATE 08S01: the link to the server dropped mid-statement
+            raise sqlite3.OperationalError("08S01", "Communication link failure")
+        return super().execute(sql, *args)
+
+
+class FlakyConnection(sqlite3.Connection):
+    def cursor(self, factory=FlakyCursor):
+        return super().cursor(factory)
+
+
+class FlakyPool(db.ConnectionPool):
+    """A sqlite pool whose next `failures[0]` statements fail with a transient error."""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.failures = [0]
+        self.opens = 0
+
+    def open(self):
+        self.opens += 1
+        raw = sqlite3.connect(self.config["path"], factory=FlakyConnection, check_same_thread=False)
+        raw.failures = self.failures
+        return raw
+
+
+def sqlite_config(tmp_path, **overrides):
+    return {**db.load_config(), "backend": "sqlite", "path": str(tmp_path / "pool.db"),
+            "pool_size": 2, "pool_timeout": 5, "retries": 3, **overrides}
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "backoff", lambda attempt: 0)
+    pool = FlakyPool(sqlite_config(tmp_path))
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE Artists (Artist_ID INTEGER, Artist_Name TEXT)")
+        conn.execute("INSERT INTO Artists VALUES (1, 'Tems')")
+    yield pool
+    pool.close()
+
+
+def test_a_full_pool_waits_at_most_the_pool_timeout(tmp_path):
+    pool = db.ConnectionPool(sqlite_config(tmp_path, pool_size=1, pool_timeout=0.05))
+    held = pool.connection()
+
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError, match="DB_POOL_SIZE=1"):
+        pool.connection()
+    assert time.perf_counter() - started < 1
+
+    threading.Timer(0.05, held.close).start()
+    conn = pool.connection(timeout=5)
+    assert conn.execute("SELECT 1").fetchone() == (1,)
+    conn.close()
+    pool.close()
+
+
+def test_a_clean_session_reconnects_and_keeps_its_settings(pool):
+    conn = pool.connection()
+    conn.isolation_level = None
+    cursor = conn.cursor()
+    cursor.arraysize = 7
+    pool.failures[0] = 2
+
+    assert cursor.execute("SELECT Artist_Name FROM Artists").fetchall() == [("Tems",)]
+    # One fresh connection per failed attempt
+    assert pool.opens == 3
+    assert conn._raw.isolation_level is None
+    assert cursor._cursor.arraysize == 7
+    conn.close()
+
+
+@pytest.mark.parametrize("statement", [
+    "BEGIN",
+    # Without autocommit the first write opens a transaction
+    "INSERT INTO Artists VALUES (2, 'Wizkid')"
+])
+def test_a_session_with_an_open_transaction_is_not_reconnected(pool, statement):
+    conn = pool.connection()
+    conn.execute(statement)
+    pool.failures[0] = 1
+
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("SELECT COUNT(*) FROM Artists")
+    assert pool.opens == 1
+
+    conn.rollback()
+    pool.failures[0] = 1
+    assert conn.execute("SELECT COUNT(*) FROM Artists").fetchone() == (1,)
+    assert pool.opens == 2
+    conn.close()
+
+
+def test_writes_and_other_errors_are_not_retried(pool):
+    conn = pool.connection()
+    conn.isolation_level = None
+    pool.failures[0] = 1
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("INSERT INTO Artists VALUES (2, 'Wizkid')")
+
+    with pytest.raises(sqlite3.OperationalError, match="no such table"):
+        conn.execute("SELECT * FROM Nope")
+    assert pool.opens == 1
+    conn.close()
@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+from load_dag import Stage, run_stages, select_stages
+
+
+def diamond():
+    return [
+        Stage("artists", None),
+        Stage("tracks", None),
+        Stage("artist_tracks", None, depends_on=["artists", "tracks"]),
+        Stage("facts", None, depends_on=["artist_tracks"]),
+        Stage("countries", None)
+    ]
+
+
+def recording(fail=()):
+    finished = []
+    lock = threading.Lock()
+
+    def execute(stage):
+        if stage.name in fail:
+            raise RuntimeError(f"{stage.name} broke")
+        with lock:
+            finished.append(stage.name)
+        return stage.name.upper()
+
+    return finished, execute
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_every_stage_runs_after_its_dependencies(workers):
+    stages = diamond()
+    finished, execute = recording()
+
+    results = run_stages(stages, execute, workers=workers)
+
+    assert sorted(finished) == sorted(stage.name for stage in stages)
+    for stage in stages:
+        for dependency in stage.depends_on:
+            assert finished.index(dependency) < finished.index(stage.name)
+    assert {name: (status, result) for name, (status, _, result) in results.items()} == {
+        stage.name: ("ok", stage.name.upper()) for stage in stages
+    }
+
+
+def test_a_failure_skips_everything_downstream_only():
+    finished, execute = recording(fail={"tracks"})
+
+    results = run_stages(diamond(), execute, workers=2)
+
+    assert {name: status for name, (status, _, _) in results.items()} == {
+        "artists": "ok", "tracks": "failed", "artist_tracks": "skipped",
+        "facts": "skipped", "countries": "ok"
+    }
+    assert isinstance(results["tracks"][2], RuntimeError)
+    assert sorted(finished) == ["artists", "countries"]
+
+
+def test_a_dependency_cycle_is_refused():
+    stages = [Stage("a", None, depends_on=["b"]), Stage("b", None, depends_on=["a"])]
+    with pytest.raises(ValueError, match="cycle"):
+        run_stages(stages, lambda stage: None)
+
+
+def test_select_stages():
+    stages = diamond()
+
+    assert select_stages(stages) == stages
+    assert [s.name for s in select_stages(stages, ["facts"])] == ["facts"]
+    assert [s.name for s in select_stages(stages, ["facts"], with_dependencies=True)] == [
+        "artists", "tracks", "artist_tracks", "facts"
+    ]
+    with pytest.raises(KeyError, match="nope"):
+        select_stages(stages, ["nope"])
+
+
+def test_unselected_dependencies_are_assumed_loaded():
+    finished, execute = recording()
+    stages = select_stages(diamond(), ["artist_tracks", "facts"])
+
+    results = run_stages(stages, execute)
+
+    assert finished == ["artist_tracks", "facts"]
+    assert all(status == "ok" for status, _, _ in results.values())
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bulk_loader import RejectedRows
+from load_delta import KEY_SEPARATOR, row_hashes
+
+
+def test_row_hashes_with_a_missing_key_column():
+    df = pd.DataFrame({
+        "Artist_Name": ["Burna Boy", "Tems", None],
+        "Nationality": ["Nigerian", np.nan, "Ghanaian"]
+    })
+    hashes = row_hashes(df, ["Artist_Name", "Nationality"], ["Artist_Name", "Nationality"])
+
+    assert hashes["Natural_Key"].tolist() == [
+        f"Burna Boy{KEY_SEPARATOR}Nigerian", f"Tems{KEY_SEPARATOR}", f"{KEY_SEPARATOR}Ghanaian"
+    ]
+
+
+def test_row_hash_is_stable_for_equal_content():
+    df = pd.DataFrame({"Track_ID": [1, 2], "Track_Name": ["Ye", "Essence"], "Is_Single": [True, False]})
+    # The same rows read back with other dtypes, another index and in another order
+    again = pd.DataFrame({"Track_ID": ["2", "1"], "Track_Name": ["Essence", "Ye"], "Is_Single": [False, True]},
+                         index=[7, 3], dtype=object)
+    columns = ["Track_ID", "Track_Name", "Is_Single"]
+
+    first = row_hashes(df, ["Track_ID"], columns).set_index("Natural_Key")["Row_Hash"]
+    second = row_hashes(again, ["Track_ID"], columns).set_index("Natural_Key")["Row_Hash"]
+
+    assert first.to_dict() == second.to_dict()
+    assert first.nunique() == 2
+
+
+def test_row_hash_changes_when_a_non_key_column_changes():
+    df = pd.DataFrame({"Track_ID": [1, 2], "Track_Name": ["Ye", "Essence"], "Release_Date": ["2018", "2020"]})
+    changed = df.assign(Release_Date=["2018", "2021"])
+    columns = ["Track_ID", "Track_Name", "Release_Date"]
+
+    before = row_hashes(df, ["Track_ID"], columns)
+    after = row_hashes(changed, ["Track_ID"], columns)
+
+    assert after["Natural_Key"].tolist() == before["Natural_Key"].tolist()
+    assert (after["Row_Hash"] == before["Row_Hash"]).tolist() == [True, False]
+
+
+def test_null_and_empty_key_parts_are_the_same_key_but_not_the_same_content():
+    # Intended: a missing key part and an empty one name the same row (the loader
+    # blanks "" to NULL before it gets here, and Natural_Key is NOT NULL), while the
+    # content hash still tells them apart so a change between them is reloaded.
+    df = pd.DataFrame({"Artist_Name": ["Tems", "Tems", "Tems"], "Nationality": [None, np.nan, ""]}, dtype=object)
+
+    hashes = row_hashes(df, ["Artist_Name", "Nationality"], ["Artist_Name", "Nationality"])
+
+    assert hashes["Natural_Key"].tolist() == [f"Tems{KEY_SEPARATOR}"] * 3
+    assert hashes["Row_Hash"].iloc[0] == hashes["Row_Hash"].iloc[1]
+    assert hashes["Row_Hash"].iloc[0] != hashes["Row_Hash"].iloc[2]
+
+
+def load_artist_tracks(conn, pairs, delta, rejects_path):
+    from embedded_backend import EmbeddedLoader
+
+    loader = EmbeddedLoader(conn, rejects=RejectedRows(str(rejects_path)), delta=delta)
+    rows = pd.DataFrame(pairs, columns=["Artist_ID", "Track_ID"])
+    loader.insert("dbo.Artist_Tracks", ["Artist_ID", "Track_ID"], rows, delta_key=["Artist_ID", "Track_ID"])
+    loader.close()
+    return loader.stats["dbo.Artist_Tracks"]
+
+
+def test_delta_load_records_rows_already_in_the_table(embedded, tmp_path):
+    from embedded_backend import EmbeddedDeltaTracker
+
+    rejects_path = tmp_path / "rejected_rows.jsonl"
+    # A database loaded before delta mode existed: the rows are there, their hashes are not
+    load_artist_tracks(embedded, [(1, 1), (1, 2)], None, rejects_path)
+
+    delta = EmbeddedDeltaTracker()
+    delta.ensure_table(embedded)
+    stats = load_artist_tracks(embedded, [(1, 1), (1, 2), (2, 2)], delta, rejects_path)
+
+    assert (stats["rows"], stats["present"], stats["errors"]) == (1, 2, 0)
+    assert not rejects_path.exists()
+    # Only the row the table took counts as changed for the facts refresh
+    assert delta.loaded["dbo.Artist_Tracks"].values.tolist() == [[2, 2]]
+    assert embedded.execute("SELECT COUNT(*) FROM Load_Hashes").fetchone()[0] == 3
+
+    again = EmbeddedDeltaTracker()
+    stats = load_artist_tracks(embedded, [(1, 1), (1, 2), (2, 2)], again, rejects_path)
+
+    assert again.counts["dbo.Artist_Tracks"] == {"new": 0, "changed": 0, "unchanged": 3}
+    assert (stats["rows"], stats["present"], stats["errors"]) == (0, 0, 0)
+    assert again.loaded["dbo.Artist_Tracks"].empty
+
+
+def test_a_loader_closed_after_a_failure_keeps_nothing_uncommitted(embedded, tmp_path):
+    from embedded_backend import EmbeddedLoader
+
+    for commit, expected in [(False, 0), (True, 2)]:
+        loader = EmbeddedLoader(embedded, rejects=RejectedRows(str(tmp_path / "rejected_rows.jsonl")))
+        # Rows written below the commit batch size are still in the open transaction
+        loader._write_rows("dbo.Artist_Tracks", ["Artist_ID", "Track_ID"], [(1, 1), (1, 2)])
+        loader.close(commit=commit)
+
+        assert embedded.execute("SELECT COUNT(*) FROM Artist_Tracks").fetchone()[0] == expected
+
+
+def test_embedded_upsert_keys_ignore_case(embedded, tmp_path):
+    from embedded_backend import EmbeddedLoader
+
+    loader = EmbeddedLoader(embedded, rejects=RejectedRows(str(tmp_path / "rejected_rows.jsonl")))
+    first = loader.upsert("Artists", "Artist_Name", ["Artist_Name"],
+                          pd.DataFrame({"Artist_Name": ["Tems", "TEMS", "Wizkid", "tems"]}), id_column="Artist_ID")
+    again = loader.upsert("Artists", "Artist_Name", ["Artist_Name"],
+                          pd.DataFrame({"Artist_Name": ["tEmS"]}), id_column="Artist_ID")
+    loader.close()
+
+    assert sorted(first["Artist_Name"]) == ["Tems", "Wizkid"]
+    assert again["Artist_ID"].tolist() == first.set_index("Artist_Name").loc[["Tems"], "Artist_ID"].tolist()
+    assert embedded.execute("SELECT COUNT(*) FROM Artists").fetchone()[0] == 2
+    # The database refuses a case variant of a stored name by itself
+    with pytest.raises(Exception, match="(?i)duplicate key"):
+        embedded.execute("INSERT INTO Artists (Artist_Name) VALUES ('WIZKID')")
@@ -0,0 +1,124 @@
+import pytest
+
+from rate_limit import RateLimiter, parse_retry_after, retry_after_header
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class HTTPError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(status)
+        self.http_status = status
+        self.headers = headers
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_burst_is_free_then_requests_wait_for_tokens(clock):
+    limiter = RateLimiter(rate=10, burst=2, clock=clock)
+
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == pytest.approx(0.1)
+
+    clock.now += 1
+    assert limiter.reserve() == 0
+
+
+def test_throttle_halves_the_rate_once_per_retry_after_window(clock):
+    limiter = RateLimiter(rate=8, clock=clock)
+
+    for _ in range(5):
+        limiter.throttled(retry_after=2)
+    assert limiter.rate == 4
+    assert limiter.stats["throttled"] == 5
+
+    clock.now += 2
+    limiter.throttled(retry_after=2)
+    assert limiter.rate == 2
+
+
+def test_throttle_without_retry_after_uses_one_token_interval(clock):
+    limiter = RateLimiter(rate=8, clock=clock)
+
+    limiter.throttled()
+    limiter.throttled()
+    assert limiter.rate == 4
+
+    clock.now += 1 / 4
+    limiter.throttled()
+    assert limiter.rate == 2
+
+
+def test_throttle_never_goes_below_min_rate_and_successes_recover(clock):
+    limiter = RateLimiter(rate=1, min_rate=0.5, increase=0.25, clock=clock)
+
+    for _ in range(4):
+        limiter.throttled()
+        clock.now += 10
+    assert limiter.rate == 0.5
+
+    for _ in range(10):
+        limiter.succeeded()
+    assert limiter.rate == 1
+
+
+def test_retry_after_pauses_every_caller(clock):
+    limiter = RateLimiter(rate=10, burst=10, clock=clock)
+
+    limiter.throttled(retry_after=3)
+    assert limiter.reserve() == pytest.approx(3)
+
+    clock.now += 3
+    assert limiter.reserve() == 0
+
+
+@pytest.mark.parametrize("name", ["Retry-After", "retry-after", "RETRY-AFTER"])
+def test_retry_after_header_is_found_in_any_case(name, clock):
+    limiter = RateLimiter(rate=10, backoff_base=0, clock=clock)
+
+    delay = limiter._should_retry(HTTPError(429, {name: "7"}), 0, ())
+
+    assert retry_after_header({name: "7"}) == "7"
+    assert delay == 7
+    assert limiter.stats["throttled"] == 1
+
+
+def test_only_retryable_failures_are_retried(clock):
+    limiter = RateLimiter(max_retries=2, clock=clock)
+
+    assert limiter._should_retry(HTTPError(404), 0, ()) is None
+    assert limiter._should_retry(HTTPError(503), 2, ()) is None
+    assert limiter._should_retry(ConnectionError(), 0, (ConnectionError,)) is not None
+    assert limiter.stats["throttled"] == 0
+
+
+def test_call_retries_a_429_then_returns(clock, monkeypatch):
+    monkeypatch.setattr("rate_limit.time.sleep", lambda seconds: None)
+    limiter = RateLimiter(rate=10, clock=clock)
+    responses = [HTTPError(429, {"retry-after": "0"}), "ok"]
+
+    def request():
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    assert limiter.call(request) == "ok"
+    assert limiter.stats["retried"] == 1
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-1") == 0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
@@ -0,0 +1,105 @@
+import re
+
+import pytest
+
+from bulk_loader import RejectedRows
+
+
+FIXTURE = {
+    "Playlists (Playlist_ID, Spotify_Playlist_ID, Playlist_Name, Playlist_Owner)": [
+        (1, "sp1", "Afro Hits", "ada"), (2, "sp2", "Afro Mix", "Spotify"), (3, "sp3", "Chill", "ben")
+    ],
+    "Tracks (Track_ID, Canonical_Track_ID, Track_Name, Release_Date)": [
+        (1, "t1", "Essence", "2020-08-14"), (2, "t2", "Free Mind", "2022-01-01"),
+        (3, "t3", "Hotline Bling", "2015-07-31"), (4, "t4", "Ojuelegba", "2014-01-01")
+    ],
+    "Artists (Artist_ID, Artist_Name)": [(1, "Wizkid"), (2, "Tems"), (3, "Drake")],
+    "Nationalities (Nationality_ID, Nationality, Country_Name, Country_Code)": [
+        (1, "Nigerian", "Nigeria", "NG"), (2, "Canadian", "Canada", "CA")
+    ],
+    "Genres (Genre_ID, Genre_Name)": [(1, "afrobeats"), (2, "pop"), (3, "alté")],
+    "Artist_Tracks (Artist_ID, Track_ID)": [(1, 1), (2, 1), (2, 2), (3, 3), (1, 4)],
+    "Artist_Nationalities (Artist_ID, Nationality_ID)": [(1, 1), (2, 1), (3, 2)],
+    "Tracks_Genre (Track_ID, Genre_ID)": [(1, 1), (2, 3), (3, 2), (4, 1)],
+    "Playlist_Tracks (Playlist_ID, Track_ID)": [(1, 1), (1, 2), (2, 1), (2, 3), (3, 3)]
+}
+
+FACT_TABLES = ["Playlist_Track_Facts", "Playlist_Nationality_Summary", "Playlist_Genre_Summary",
+               "Playlist_Artist_Summary"]
+
+
+@pytest.fixture
+def facts_db(embedded, tmp_path):
+    from embedded_backend import EmbeddedLoader
+
+    for table, rows in FIXTURE.items():
+        placeholders = ", ".join(["?"] * len(rows[0]))
+        for row in rows:
+            embedded.execute(f"INSERT INTO {table} VALUES ({placeholders})", row)
+    loader = EmbeddedLoader(embedded, rejects=RejectedRows(str(tmp_path / "rejected_rows.jsonl")))
+    yield embedded, loader
+    loader.close()
+
+
+def snapshot(conn):
+    return {
+        table: sorted(conn.execute(f"SELECT * FROM {table}").fetchall(), key=repr)
+        for table in FACT_TABLES
+    }
+
+
+def test_the_embedded_refresh_runs_the_procedure_statements():
+    from embedded_backend import AZURE_SCHEMA_PATH, REFRESH_STATEMENTS
+
+    procedure = AZURE_SCHEMA_PATH.read_text(encoding="utf-8")
+    procedure = procedure[procedure.index("CREATE OR ALTER PROCEDURE sp_refresh_playlist_track_facts"):]
+    procedure = procedure[:procedure.index("COMMIT TRANSACTION;")]
+
+    assert [re.match(r"INSERT INTO (\w+)", s).group(1) for s in REFRESH_STATEMENTS] == FACT_TABLES
+    for statement in REFRESH_STATEMENTS:
+        tsql = statement.replace("affected", "#affected").replace("AS DOUBLE)", "AS FLOAT)")
+        assert tsql in procedure
+
+
+def test_full_refresh_builds_facts_and_summaries(facts_db):
+    from embedded_backend import refresh_playlist_track_facts
+
+    conn, loader = facts_db
+    refresh_playlist_track_facts(loader)
+
+    facts = snapshot(conn)
+    assert len(facts["Playlist_Track_Facts"]) == 7
+    assert conn.execute("""
+        SELECT playlist_type, nationality, is_african_nationality, track_count
+        FROM Playlist_Nationality_Summary WHERE playlist_id = 2 ORDER BY nationality
+    """).fetchall() == [("Algorithmic", "Canadian", "non_African", 1), ("Algorithmic", "Nigerian", "African", 2)]
+    # Only African genre families are summarised; pop is not one of them
+    assert conn.execute("""
+        SELECT playlist_id, genre_name, track_count, proportion
+        FROM Playlist_Genre_Summary ORDER BY playlist_id, genre_name
+    """).fetchall() == [(1, "afrobeats", 1, 2 / 3), (1, "alté", 1, 1 / 3), (2, "afrobeats", 1, 1.0)]
+    assert conn.execute("""
+        SELECT artist_name, track_count, proportion FROM Playlist_Artist_Summary WHERE playlist_id = 1 ORDER BY artist_name
+    """).fetchall() == [("Tems", 2, 2 / 3), ("Wizkid", 1, 1 / 3)]
+
+
+@pytest.mark.parametrize("change, ids", [
+    ("INSERT INTO Playlist_Tracks VALUES (3, 4)", {"playlist_ids": [3]}),
+    ("INSERT INTO Tracks_Genre VALUES (3, 1)", {"track_ids": [3]}),
+    ("INSERT INTO Artist_Nationalities VALUES (3, 1)", {"artist_ids": [3]}),
+    ("UPDATE Tracks SET Track_Name = 'Essence (Remix)' WHERE Track_ID = 1", {"track_ids": [1]})
+])
+def test_an_incremental_refresh_matches_a_full_rebuild(facts_db, change, ids):
+    from embedded_backend import refresh_playlist_track_facts
+
+    conn, loader = facts_db
+    refresh_playlist_track_facts(loader)
+    before = snapshot(conn)
+    conn.execute(change)
+
+    refresh_playlist_track_facts(loader, **{"playlist_ids": [], "track_ids": [], "artist_ids": [], **ids})
+    incremental = snapshot(conn)
+    refresh_playlist_track_facts(loader)
+
+    assert incremental == snapshot(conn)
+    assert incremental != before